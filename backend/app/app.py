@@ -8,16 +8,27 @@ import time
 import sys
 import os
 import functools
+import numpy as np
 
 # Add the backend directory to Python path for imports
 sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
 from game.player import player_manager
 from game.combat import combat_system
-from game.movement import check_ar_enemy_spawn, spawn_enemy
+from game.movement import check_ar_enemy_spawn, resolve_poi_spawn, create_legacy_enemy, spawn_enemy
 from game.enemies import enemy_manager
 from game.ar_spawning import ar_spawning_system
-from game.config import CHARACTERS, ENEMY_STATS, SKILLS, SPAWN_CONFIG, HEAL_COOLDOWN, HEAL_AMOUNT, CRIT_CHANCE, CRIT_MULTIPLIER, DODGE_CHANCE
+from game.prefetch import poi_prefetcher
+from game.spawn_tasks import spawn_task_queue
+from game.location_filter import location_filter, spread_times, to_server_times
+from game.enemy_index import enemy_index
+from game.world_enemies import world_enemies
+from game.reaper import idle_reaper
+from game.locks import player_locks
+from game.shared_state import shared_state
+import game.rate_limits  # registers the sqlite:// rate-limit storage
+from game.geo import path_distances
+from game.config import CHARACTERS, ENEMY_STATS, SKILLS, SPAWN_CONFIG, LOCATION_BATCH_CONFIG, RATE_LIMIT_CONFIG, HEAL_COOLDOWN, HEAL_AMOUNT, CRIT_CHANCE, CRIT_MULTIPLIER, DODGE_CHANCE
 
 def get_local_ip():
     s = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
@@ -37,12 +48,19 @@ CORS(app, resources={
 })
 
 # Rate limiting
+if shared_state.enabled and RATE_LIMIT_CONFIG["storage_uri"].startswith("memory://"):
+    # Per-process counters would let every worker allow the full limit
+    raise ValueError("Shared state needs shared rate-limit counters (set RATE_LIMIT_STORAGE_URI, e.g. sqlite:///data/rate_limits.sqlite)")
 limiter = Limiter(
     key_func=get_remote_address,
     app=app,
-    default_limits=["200 per day", "50 per hour"]
+    default_limits=["200 per day", "50 per hour"],
+    storage_uri=RATE_LIMIT_CONFIG["storage_uri"]
 )
 
+# Share players and combats with the other worker processes, if enabled
+shared_state.start(player_manager, combat_system)
+
 def validate_json_data(required_fields):
     """Decorator to validate JSON request data"""
     def decorator(f):
@@ -60,10 +78,26 @@ def validate_json_data(required_fields):
         return wrapper
     return decorator
 
+def lock_player(f):
+    """Decorator to run a request under the lock of its player_id, if it names one.
+    
+    With shared state the request also runs in a session that loads the
+    player from, and writes them back to, the store shared by all workers.
+    """
+    @functools.wraps(f)
+    def wrapper(*args, **kwargs):
+        data = request.get_json(silent=True) or request.args
+        player_id = data.get("player_id") if hasattr(data, "get") else None
+        if not player_id:
+            return f(*args, **kwargs)
+        with shared_state.session(player_id) if shared_state.enabled else player_locks.lock(player_id):
+            return f(*args, **kwargs)
+    return wrapper
+
 def get_or_create_player_id(request_data=None):
-    """Get player ID from request or create a new one"""
+    """Get player ID from request (JSON body, or query string for GET) or create a new one"""
     if request_data is None:
-        request_data = request.get_json() or {}
+        request_data = request.get_json(silent=True) or request.args
     
     player_id = request_data.get("player_id")
     
@@ -73,6 +107,65 @@ def get_or_create_player_id(request_data=None):
     
     return player_id
 
+def deliver_ar_results(player_id):
+    """Collect AR lookups finished in the background, starting combat for a resolved spawn"""
+    results = spawn_task_queue.pop_results(player_id)
+    # Spawns queued by /update-location or by check_ar_enemy_spawn
+    enemy = results.pop("spawn", None) or results.pop("ar_spawn", None)
+    # Dropped if the player is already fighting something else
+    if enemy and not combat_system.get_combat(player_id):
+        combat_system.start_combat(player_id, enemy)
+        results["spawn"] = enemy
+    return results
+
+# spawn_reason reported for each spawn_path of a resolved spawn
+SPAWN_REASONS = {
+    "world": "Shared world enemy nearby, engaged",
+    "ar_poi": "POI-based spawn successful",
+    "ar_heatmap": "Heatmap spawn successful",
+    "config": "No POI spawn nearby, config-based spawn successful"
+}
+
+def get_spawn_budget(data):
+    """Get the seconds an update may wait for a POI-based spawn (spawn_budget_ms, capped by config)"""
+    budget_ms = float(data.get("spawn_budget_ms", SPAWN_CONFIG["spawn_latency_budget_ms"]))
+    if budget_ms < 0:
+        raise ValueError("spawn_budget_ms must not be negative")
+    return min(budget_ms, SPAWN_CONFIG["max_spawn_latency_budget_ms"]) / 1000.0
+
+def resolve_within_budget(player_id, kind, budget, fn, *args):
+    """Run a lookup on a spawn worker, returning its result if it finishes within budget.
+    
+    A result finished in the background since the last call is served first.
+    Returns None if the lookup is still running (or the queue is full); a
+    lookup that failed raises its error.
+    """
+    result = spawn_task_queue.pop_result(player_id, kind)
+    if result:
+        return result
+    
+    job = spawn_task_queue.submit(player_id, kind, fn, *args)
+    if not job or not job.wait(budget):
+        return None
+    if job.error:
+        raise job.error
+    return spawn_task_queue.pop_result(player_id, kind) or job.result
+
+def resolve_test_spawn(lat, lon, player_level):
+    """Run a test AR spawn and build its response (runs on a spawn worker)"""
+    enemy = ar_spawning_system.find_best_spawn_location(lat, lon, player_level)
+    
+    if enemy:
+        return {
+            "success": True,
+            "enemy": enemy,
+            "message": f"Enemy spawned at {enemy.get('location', {}).get('poi_name', 'Unknown location')}"
+        }
+    return {
+        "success": False,
+        "message": "No suitable spawn location found"
+    }
+
 @app.route("/")
 def index():
     return render_template("index.html")
@@ -111,6 +204,7 @@ def get_game_constants():
 @app.route("/select-character", methods=["POST"])
 @limiter.limit("10 per minute")
 @validate_json_data(["character"])
+@lock_player
 def select_character():
     try:
         data = request.get_json()
@@ -139,112 +233,288 @@ def select_character():
         print(f"❌ Exception in select-character: {e}")
         return jsonify({"error": "Internal server error"}), 500
 
+def filtered_fix_result(player_id):
+    """Build the update result for a fix the location filter treated as GPS noise"""
+    return {
+        "spawn": False,
+        "distance_traveled": 0,
+        "spawn_reason": "Within GPS noise, update ignored",
+        "spawn_path": None,
+        "filtered": True,
+        "ar_results": deliver_ar_results(player_id)
+    }
+
+def process_location_fix(player_id, player, lat, lon, spawn_budget, distance_traveled=None, timestamp=None):
+    """Move a player to a GPS fix and run the spawn checks, returning the update result.
+    
+    distance_traveled may be precomputed by the caller; otherwise it is
+    measured from the player's last location.
+    """
+    from game.spawn import calculate_distance, should_spawn_enemy, check_area_limits
+    
+    # Warm POI tiles along the player's heading
+    poi_prefetcher.observe(player_id, lat, lon, timestamp)
+    
+    # Calculate distance moved
+    last_location = player.get('last_location')
+    should_spawn = False
+    spawn_reason = ""
+    
+    if last_location:
+        if distance_traveled is None:
+            distance_traveled = calculate_distance(
+                last_location['lat'], last_location['lon'],
+                lat, lon
+            )
+        
+        print(f"📏 Distance traveled: {distance_traveled}m")
+        
+        # Check if should spawn based on config distance
+        if distance_traveled >= SPAWN_CONFIG["spawn_distance"]:
+            should_spawn = should_spawn_enemy(SPAWN_CONFIG["spawn_probability"])
+            if not should_spawn:
+                spawn_reason = "Probability check failed"
+        else:
+            spawn_reason = f"Distance threshold not met ({SPAWN_CONFIG['spawn_distance']}m required)"
+    else:
+        # First location update, don't spawn immediately
+        distance_traveled = 0
+        should_spawn = False
+        spawn_reason = "First location update"
+    
+    # Update player's last location
+    player['last_location'] = {'lat': lat, 'lon': lon}
+    player_manager.mark_dirty(player_id)
+    
+    # Deliver POI lookups resolved in the background since the last update
+    ar_results = deliver_ar_results(player_id)
+    if "spawn" in ar_results:
+        enemy = ar_results.pop("spawn")
+        print(f"✅ POI-based enemy delivered: {enemy['type']}")
+        return {
+            "spawn": True,
+            "enemy": enemy["type"],
+            "enemy_stats": enemy,
+            "ar_location": enemy.get("location"),
+            "distance_traveled": distance_traveled,
+            "spawn_reason": "POI-based spawn resolved",
+            "spawn_path": "ar_poi_deferred",
+            "ar_results": ar_results
+        }
+    
+    if should_spawn and not combat_system.get_combat(player_id):
+        print("🎯 Attempting to spawn enemy...")
+        # Get the live enemies around the player to check area limits
+        existing_enemies = enemy_index.query(lat, lon, SPAWN_CONFIG["area_radius"])
+        
+        # Check area limits and cooldowns
+        player_location = {'lat': lat, 'lon': lon}
+        can_spawn, reason = check_area_limits(player_location, existing_enemies, SPAWN_CONFIG)
+        
+        if can_spawn:
+            if ar_spawning_system.heatmap_covers(lat, lon):
+                # Precomputed tile: one lookup and a draw, no need to leave the request thread
+                enemy = resolve_poi_spawn(lat, lon, player["level"], player_id)
+                spawn_path = {"world": "world", "ar_poi": "ar_heatmap"}.get(enemy.get("spawn_source"), "config")
+                spawn_reason = SPAWN_REASONS[spawn_path]
+            else:
+                # Resolve the spawn at a nearby POI off the request thread, waiting up to the budget
+                job = spawn_task_queue.submit(player_id, "spawn", resolve_poi_spawn, lat, lon, player["level"], player_id)
+                
+                if job and job.wait(spawn_budget) and not job.error:
+                    enemy = spawn_task_queue.pop_result(player_id, "spawn") or job.result
+                    spawn_path = {"world": "world", "ar_poi": "ar_poi"}.get(enemy.get("spawn_source"), "config")
+                    spawn_reason = SPAWN_REASONS[spawn_path]
+                else:
+                    # Over budget: answer with a legacy spawn, the POI lookup keeps warming the cache
+                    if job:
+                        spawn_task_queue.detach(job)
+                    enemy = create_legacy_enemy(player_location)
+                    spawn_path = "legacy_fallback"
+                    spawn_reason = "POI-based spawn not resolved within budget, legacy spawn used" if job else "Spawn queue full, legacy spawn used"
+            
+            combat_system.start_combat(player_id, enemy)
+            
+            print(f"✅ Enemy spawned: {enemy['type']} ({spawn_path})")
+            return {
+                "spawn": True,
+                "enemy": enemy["type"],
+                "enemy_stats": enemy,
+                "ar_location": enemy.get("location"),
+                "distance_traveled": distance_traveled,
+                "spawn_reason": spawn_reason,
+                "spawn_path": spawn_path,
+                "ar_results": ar_results
+            }
+        else:
+            print(f"❌ Spawn blocked: {reason}")
+            return {
+                "spawn": False,
+                "distance_traveled": distance_traveled,
+                "spawn_reason": reason,
+                "spawn_path": None,
+                "config_used": SPAWN_CONFIG,
+                "ar_results": ar_results
+            }
+    else:
+        combat = combat_system.get_combat(player_id)
+        if combat:
+            spawn_reason = "Player already in combat"
+        return {
+            "spawn": False,
+            "distance_traveled": distance_traveled,
+            "spawn_reason": spawn_reason or f"Distance threshold not met ({SPAWN_CONFIG['spawn_distance']}m required)",
+            "spawn_path": None,
+            "config_used": SPAWN_CONFIG,
+            "ar_results": ar_results
+        }
+
 @app.route("/update-location", methods=["POST"])
 @validate_json_data(["lat", "lon", "player_id"])
+@lock_player
 def update_location():
+    """Move a player to a GPS fix and maybe spawn an enemy (response fields in AR_SPAWNING_GUIDE.md)"""
     try:
         data = request.get_json()
         lat = data["lat"]
         lon = data["lon"]
         player_id = data["player_id"]
+        spawn_budget = get_spawn_budget(data)
         
         print(f"📍 Location update: player_id={player_id}, lat={lat}, lon={lon}")
         
-        from game.config import SPAWN_CONFIG, ENEMY_STATS
-        from game.spawn import calculate_distance, should_spawn_enemy, get_enemy_type_by_weight, check_area_limits, spawn_enemy
-        
         player = player_manager.get_player(player_id)
         if not player:
             print(f"❌ Player not found: {player_id}")
             return jsonify({"error": "Player not found"}), 400
         
-        # Calculate distance moved
-        last_location = player.get('last_location')
-        distance_traveled = 0
-        should_spawn = False
-        spawn_reason = ""
+        # Drop GPS jitter before any spawn logic runs
+        accepted, lat, lon = location_filter.filter(player_id, lat, lon, data.get("accuracy"))
+        if not accepted:
+            return jsonify(filtered_fix_result(player_id))
         
-        if last_location:
-            distance_traveled = calculate_distance(
-                last_location['lat'], last_location['lon'],
-                lat, lon
-            )
-            
-            print(f"📏 Distance traveled: {distance_traveled}m")
-            
-            # Check if should spawn based on config distance
-            if distance_traveled >= SPAWN_CONFIG["spawn_distance"]:
-                should_spawn = should_spawn_enemy(SPAWN_CONFIG["spawn_probability"])
-                if not should_spawn:
-                    spawn_reason = "Probability check failed"
-            else:
-                spawn_reason = f"Distance threshold not met ({SPAWN_CONFIG['spawn_distance']}m required)"
-        else:
-            # First location update, don't spawn immediately
-            should_spawn = False
-            spawn_reason = "First location update"
-        
-        # Update player's last location
-        player['last_location'] = {'lat': lat, 'lon': lon}
-        
-        if should_spawn and not combat_system.get_combat(player_id):
-            print("🎯 Attempting to spawn enemy...")
-            # Get all existing enemies in combat to check area limits
-            existing_enemies = []
-            for combat_id, combat_data in combat_system.active_combats.items():
-                if combat_data.get('player_id') == player_id:
-                    enemy = combat_data.get('enemy')
-                    if enemy:
-                        existing_enemies.append(enemy)
-            
-            # Check area limits and cooldowns
-            player_location = {'lat': lat, 'lon': lon}
-            can_spawn, reason = check_area_limits(player_location, existing_enemies, SPAWN_CONFIG)
-            
-            if can_spawn:
-                # Get enemy type based on weights from config
-                enemy_type = get_enemy_type_by_weight(SPAWN_CONFIG["enemy_weights"])
-                enemy = spawn_enemy(enemy_type, player_location)
-                combat_system.start_combat(player_id, enemy)
-                
-                print(f"✅ Enemy spawned: {enemy_type}")
-                return jsonify({
-                    "spawn": True,
-                    "enemy": enemy_type,
-                    "enemy_stats": enemy,
-                    "distance_traveled": distance_traveled,
-                    "spawn_reason": "Config-based spawn successful"
-                })
-            else:
-                print(f"❌ Spawn blocked: {reason}")
-                return jsonify({
-                    "spawn": False,
-                    "distance_traveled": distance_traveled,
-                    "spawn_reason": reason,
-                    "config_used": SPAWN_CONFIG
-                })
-        else:
-            combat = combat_system.get_combat(player_id)
-            if combat:
-                spawn_reason = "Player already in combat"
+        return jsonify(process_location_fix(player_id, player, lat, lon, spawn_budget))
+        
+    except ValueError as e:
+        print(f"❌ ValueError in update-location: {e}")
+        return jsonify({"error": str(e)}), 400
+    except Exception as e:
+        print(f"❌ Unexpected error in update-location: {e}")
+        import traceback
+        traceback.print_exc()
+        return jsonify({"error": "Internal server error"}), 500
+
+@app.route("/update-location-batch", methods=["POST"])
+@limiter.limit("30 per minute")
+@validate_json_data(["fixes", "player_id"])
+@lock_player
+def update_location_batch():
+    """Process buffered GPS fixes in time order and return every resulting event"""
+    try:
+        data = request.get_json()
+        player_id = data["player_id"]
+        fixes = data["fixes"]
+        spawn_budget = get_spawn_budget(data)
+        
+        if not isinstance(fixes, list) or not fixes:
+            raise ValueError("fixes must be a non-empty list")
+        if len(fixes) > LOCATION_BATCH_CONFIG["max_fixes"]:
+            raise ValueError(f"At most {LOCATION_BATCH_CONFIG['max_fixes']} fixes per batch")
+        
+        player = player_manager.get_player(player_id)
+        if not player:
+            print(f"❌ Player not found: {player_id}")
+            return jsonify({"error": "Player not found"}), 400
+        
+        try:
+            lats = np.array([fix["lat"] for fix in fixes], dtype=float)
+            lons = np.array([fix["lon"] for fix in fixes], dtype=float)
+            timestamps = [fix.get("timestamp") for fix in fixes]
+            accuracies = [fix.get("accuracy") for fix in fixes]
+        except (KeyError, TypeError):
+            raise ValueError("Each fix needs numeric lat and lon")
+        
+        # Fixes buffered offline can arrive out of order
+        order = np.arange(len(fixes))
+        received_at = time.time()
+        # Without timestamps, keep the order sent and assume the usual fix rate, so the filter sees the walk's real pace
+        fix_times = spread_times(len(fixes), received_at, LOCATION_BATCH_CONFIG["assumed_fix_interval"])
+        if all(timestamp is not None for timestamp in timestamps):
+            try:
+                timestamps = [float(timestamp) for timestamp in timestamps]
+            except (TypeError, ValueError):
+                raise ValueError("Fix timestamps must be numeric")
+            # The filter and prefetcher run on server seconds; responses echo the client's timestamps
+            fix_times = to_server_times(timestamps, received_at)
+            order = np.argsort(fix_times, kind='stable')
+            timestamps = [timestamps[i] for i in order]
+            fix_times = [fix_times[i] for i in order]
+        
+        print(f"📍 Location batch: player_id={player_id}, fixes={len(fixes)}")
+        
+        # Drop GPS jitter before any spawn logic runs, keeping the smoothed positions
+        kept = []
+        for position, index in enumerate(order):
+            accepted, lat, lon = location_filter.filter(player_id, lats[index], lons[index],
+                                                        accuracies[index], fix_times[position])
+            if accepted:
+                kept.append((position, lat, lon))
+        fixes_filtered = len(fixes) - len(kept)
+        if not kept:
+            result = filtered_fix_result(player_id)
             return jsonify({
+                "fixes_processed": 0,
+                "fixes_filtered": fixes_filtered,
+                "distance_traveled": 0,
+                "cumulative_distance": [],
+                "events": [dict(result, fix_index=len(fixes) - 1, timestamp=timestamps[-1])] if result["ar_results"] else [],
                 "spawn": False,
-                "distance_traveled": distance_traveled,
-                "spawn_reason": spawn_reason or f"Distance threshold not met ({SPAWN_CONFIG['spawn_distance']}m required)",
-                "config_used": SPAWN_CONFIG
+                "in_combat": combat_system.get_combat(player_id) is not None
             })
+        positions = [position for position, _, _ in kept]
+        lats = np.array([lat for _, lat, _ in kept])
+        lons = np.array([lon for _, _, lon in kept])
+        
+        # Segment lengths for the whole trajectory, starting from the last known location
+        last_location = player.get('last_location')
+        if last_location:
+            distances = path_distances(np.concatenate(([last_location['lat']], lats)),
+                                       np.concatenate(([last_location['lon']], lons)))
+        else:
+            distances = np.concatenate(([0.0], path_distances(lats, lons)))
+        cumulative_distance = np.cumsum(distances)
+        
+        events = []
+        for index, position in enumerate(positions):
+            distance_traveled = float(distances[index]) if last_location or index > 0 else None
+            result = process_location_fix(player_id, player, float(lats[index]), float(lons[index]),
+                                          spawn_budget, distance_traveled, fix_times[position])
+            if result["spawn"] or result["ar_results"]:
+                result.pop("config_used", None)
+                events.append(dict(result, fix_index=position, timestamp=timestamps[position]))
+        
+        return jsonify({
+            "fixes_processed": len(lats),
+            "fixes_filtered": fixes_filtered,
+            "distance_traveled": float(cumulative_distance[-1]),
+            "cumulative_distance": [round(float(distance), 2) for distance in cumulative_distance],
+            "events": events,
+            "spawn": any(event["spawn"] for event in events),
+            "in_combat": combat_system.get_combat(player_id) is not None
+        })
         
     except ValueError as e:
-        print(f"❌ ValueError in update-location: {e}")
+        print(f"❌ ValueError in update-location-batch: {e}")
         return jsonify({"error": str(e)}), 400
     except Exception as e:
-        print(f"❌ Unexpected error in update-location: {e}")
+        print(f"❌ Unexpected error in update-location-batch: {e}")
         import traceback
         traceback.print_exc()
         return jsonify({"error": "Internal server error"}), 500
 
 @app.route("/player-attack", methods=["POST"])
 @limiter.limit("30 per minute")
+@lock_player
 def player_attack():
     try:
         player_id = get_or_create_player_id()
@@ -268,6 +538,7 @@ def player_attack():
 @app.route("/use-skill", methods=["POST"])
 @limiter.limit("20 per minute")
 @validate_json_data(["skill_name"])
+@lock_player
 def use_skill():
     try:
         data = request.get_json()
@@ -283,6 +554,7 @@ def use_skill():
         
         # Use skill
         result = combat_system.use_skill(player, skill_name, enemy)
+        player_manager.mark_dirty(player_id)
         
         # Handle escape skill
         if result.get("escaped"):
@@ -318,6 +590,7 @@ def use_skill():
                 final_damage = combat_system.apply_buffs_to_defense(player, enemy_attack_result["damage"])
                 player["current_hp"] -= final_damage
                 player["current_hp"] = max(0, player["current_hp"])
+                player_manager.mark_dirty(player_id)
                 
                 result["combat_messages"].append(f"👹 Enemy counter-attacks for {final_damage} damage!")
             else:
@@ -341,6 +614,7 @@ def use_skill():
 @app.route("/combat-turn", methods=["POST"])
 @limiter.limit("20 per minute")
 @validate_json_data(["player_id", "action"])
+@lock_player
 def combat_turn():
     try:
         data = request.get_json()
@@ -394,6 +668,7 @@ def combat_turn():
             
         else:
             return jsonify({"error": "Invalid action"}), 400
+        player_manager.mark_dirty(player_id)
         
         # Handle escape
         if result.get("escaped"):
@@ -431,6 +706,7 @@ def combat_turn():
                 final_damage = combat_system.apply_buffs_to_defense(player, enemy_attack_result["damage"])
                 player["current_hp"] -= final_damage
                 player["current_hp"] = max(0, player["current_hp"])
+                player_manager.mark_dirty(player_id)
                 
                 result["combat_messages"].append(f"👹 Enemy hits for {final_damage} damage!")
             else:
@@ -453,6 +729,7 @@ def combat_turn():
 
 @app.route("/heal", methods=["POST"])
 @limiter.limit("10 per minute")
+@lock_player
 def heal():
     try:
         player_id = get_or_create_player_id()
@@ -470,6 +747,7 @@ def heal():
 @app.route("/spawn-enemy", methods=["POST"])
 @limiter.limit("5 per minute")
 @validate_json_data(["enemy_type"])
+@lock_player
 def spawn_enemy_route():
     try:
         data = request.get_json()
@@ -500,6 +778,7 @@ def spawn_enemy_route():
 
 @app.route("/get-skills", methods=["GET"])
 @limiter.limit("30 per minute")
+@lock_player
 def get_skills():
     try:
         player_id = get_or_create_player_id()
@@ -559,6 +838,7 @@ def get_skills():
 @app.route("/upgrade-skill", methods=["POST"])
 @limiter.limit("10 per minute")
 @validate_json_data(["skill_name"])
+@lock_player
 def upgrade_skill():
     try:
         data = request.get_json()
@@ -578,6 +858,7 @@ def upgrade_skill():
 @app.route("/level-up-reward", methods=["POST"])
 @limiter.limit("10 per minute")
 @validate_json_data(["reward_type"])
+@lock_player
 def level_up_reward():
     try:
         data = request.get_json()
@@ -596,8 +877,13 @@ def level_up_reward():
 
 @app.route("/ar-spawn-info", methods=["GET"])
 @limiter.limit("30 per minute")
+@lock_player
 def ar_spawn_info():
-    """Get information about AR spawn locations near player"""
+    """Get information about AR spawn locations near player.
+    
+    Answers 200 when the lookup finishes within spawn_budget_ms, otherwise
+    202 with "pending": true; call again for the result.
+    """
     try:
         player_id = get_or_create_player_id()
         player = player_manager.get_player(player_id)
@@ -609,12 +895,56 @@ def ar_spawn_info():
         if not last_location:
             return jsonify({"error": "No location data available"}), 400
         
-        spawn_info = ar_spawning_system.get_spawn_info(last_location[0], last_location[1])
-        return jsonify(spawn_info)
+        if shared_state.enabled:
+            # The next poll may reach another worker, which would never see a background result
+            return jsonify(ar_spawning_system.get_spawn_info(last_location['lat'], last_location['lon']))
+        
+        # Answer like before when the lookup is quick, otherwise let the client poll for it
+        spawn_info = resolve_within_budget(
+            player_id, "spawn_info", get_spawn_budget(request.args), ar_spawning_system.get_spawn_info,
+            last_location['lat'], last_location['lon']
+        )
+        if spawn_info:
+            return jsonify(spawn_info)
+        return jsonify({
+            "pending": True,
+            "message": "Spawn info is resolving, delivered on next /player-status, /update-location or /ar-spawn-info"
+        }), 202
         
     except Exception as e:
         return jsonify({"error": "Internal server error"}), 500
 
+@app.route("/world-enemies", methods=["GET"])
+@limiter.limit("30 per minute")
+def get_world_enemies():
+    """List the shared world enemies near a location"""
+    try:
+        lat = float(request.args["lat"])
+        lon = float(request.args["lon"])
+        radius = min(float(request.args.get("radius", world_enemies.discovery_radius)), world_enemies.discovery_radius)
+
+        # Not a player session, so catch up on enemies other workers registered
+        if shared_state.enabled:
+            shared_state.sync_world_enemies()
+
+        now = time.time()
+        enemies = [
+            {
+                "world_enemy_id": enemy["world_enemy_id"],
+                "type": enemy["type"],
+                "name": enemy.get("name"),
+                "location": enemy.get("location"),
+                "expires_in": round(enemy["expires_at"] - now, 1)
+            }
+            for enemy in world_enemies.find_nearby(lat, lon, radius)
+        ]
+        return jsonify({"enemies": enemies, "count": len(enemies), "radius": radius})
+
+    except (KeyError, ValueError):
+        return jsonify({"error": "lat and lon query parameters are required"}), 400
+    except Exception as e:
+        return jsonify({"error": "Internal server error"}), 500
+
 @app.route("/set-ar-api-keys", methods=["POST"])
 @limiter.limit("5 per minute")
 @validate_json_data([])
@@ -640,26 +970,55 @@ def set_ar_api_keys():
 @app.route("/test-ar-spawn", methods=["POST"])
 @limiter.limit("10 per minute")
 def test_ar_spawn():
-    """Test AR spawning at a specific location"""
+    """Test AR spawning at a specific location.
+    
+    Answers 200 when the test finishes within spawn_budget_ms, otherwise
+    202 with "pending": true; call again for the result.
+    """
     try:
         data = request.get_json()
         lat = float(data.get("lat", 0))
         lon = float(data.get("lon", 0))
         player_level = int(data.get("player_level", 1))
+        player_id = get_or_create_player_id(data)
         
-        enemy = ar_spawning_system.find_best_spawn_location(lat, lon, player_level)
+        if shared_state.enabled:
+            # The next poll may reach another worker, which would never see a background result
+            return jsonify(resolve_test_spawn(lat, lon, player_level))
         
-        if enemy:
-            return jsonify({
-                "success": True,
-                "enemy": enemy,
-                "message": f"Enemy spawned at {enemy.get('location', {}).get('poi_name', 'Unknown location')}"
-            })
-        else:
-            return jsonify({
-                "success": False,
-                "message": "No suitable spawn location found"
-            })
+        # Answer like before when the test is quick, otherwise let the client poll for it
+        result = resolve_within_budget(
+            player_id, "test_spawn", get_spawn_budget(data), resolve_test_spawn, lat, lon, player_level
+        )
+        if result:
+            return jsonify(result)
+        return jsonify({
+            "pending": True,
+            "player_id": player_id,
+            "message": "AR spawn test is resolving, repeat the request with this player_id for the result"
+        }), 202
+        
+    except Exception as e:
+        return jsonify({"error": "Internal server error"}), 500
+
+@app.route("/server-stats", methods=["GET"])
+@limiter.limit("30 per minute")
+def server_stats():
+    """Serve runtime statistics for server subsystems"""
+    try:
+        return jsonify({
+            "poi_cache": ar_spawning_system.poi_cache.stats(),
+            "poi_providers": ar_spawning_system.http_sessions.stats(),
+            "poi_prefetch": poi_prefetcher.stats(),
+            "spawn_tasks": spawn_task_queue.stats(),
+            "location_filter": location_filter.stats(),
+            "enemy_index": enemy_index.stats(),
+            "world_enemies": world_enemies.stats(),
+            "player_storage": player_manager.writer.stats(),
+            "reaper": idle_reaper.stats(),
+            "player_locks": player_locks.stats(),
+            "shared_state": shared_state.stats()
+        })
         
     except Exception as e:
         return jsonify({"error": "Internal server error"}), 500
@@ -678,7 +1037,7 @@ def test_assets():
 def leaderboard():
     try:
         # Get all players and sort by total kills
-        all_players = list(player_manager.players.values())
+        all_players = player_manager.all_players()
         
         # Calculate total kills for each player
         leaderboard_data = []
@@ -689,7 +1048,7 @@ def leaderboard():
                 "character_class": player["character_class"],
                 "level": player["level"],
                 "total_kills": total_kills,
-                "kills_by_type": player["kills"],
+                "kills_by_type": dict(player["kills"]),
                 "total_xp": player["xp"]
             })
         
@@ -707,6 +1066,7 @@ def leaderboard():
 
 @app.route("/player-status", methods=["GET"])
 @limiter.limit("60 per minute")
+@lock_player
 def player_status():
     try:
         player_id = get_or_create_player_id()
@@ -715,6 +1075,7 @@ def player_status():
         if not player:
             return jsonify({"error": "Player not found"}), 400
         
+        ar_results = deliver_ar_results(player_id)
         combat = combat_system.get_combat(player_id)
         active_buffs = player_manager.get_active_buffs(player_id)
         
@@ -726,12 +1087,13 @@ def player_status():
             "xp": player["xp"],
             "current_hp": player["current_hp"],
             "max_hp": player["max_hp"],
-            "kills": player["kills"],
+            "kills": dict(player["kills"]),
             "in_combat": combat is not None,
             "skill_points": player["skill_points"],
             "pending_level_up": player["pending_level_up"],
             "active_buffs": active_buffs,
-            "skill_levels": player["skill_levels"]
+            "skill_levels": player["skill_levels"],
+            "ar_results": ar_results
         }
         
         if combat:
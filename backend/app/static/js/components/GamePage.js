@@ -1083,6 +1083,7 @@ class GamePage {
                 body: JSON.stringify({
                     lat: position.coords.latitude,
                     lon: position.coords.longitude,
+                    accuracy: position.coords.accuracy,
                     player_id: this.gameState.playerId
                 })
             });
@@ -1117,16 +1118,23 @@ class GamePage {
                 return;
             }
             
+            if (data.filtered) {
+                // Fix was within GPS noise, the server kept the previous location
+                return;
+            }
+            
             if (data.spawn) {
-                console.log('Enemy spawned from location config!', data);
+                // spawn_path tells where the enemy came from: ar_poi, ar_heatmap, world, config, legacy_fallback or ar_poi_deferred
+                console.log(`Enemy spawned (${data.spawn_path})!`, data);
                 this.gameState.enemy = data.enemy_stats;
                 this.gameState.inCombat = true;
                 this.showEnemy(data.enemy_stats);
-                this.showMessage(`Enemy encountered: ${data.enemy}!`, 'success');
+                const place = data.ar_location && data.ar_location.poi_name;
+                this.showMessage(place ? `Enemy encountered at ${place}: ${data.enemy}!` : `Enemy encountered: ${data.enemy}!`, 'success');
                 this.spawnEnemy(data.enemy, data.enemy_stats);
             } else {
-                console.log('No enemy spawned based on config, distance traveled:', data.distance_traveled);
-                // Don't spawn locally - let config control everything
+                console.log('No enemy spawned:', data.spawn_reason, 'distance traveled:', data.distance_traveled);
+                // Don't spawn locally - let the server control everything
             }
         } catch (error) {
             console.error('Error updating location:', error);
@@ -0,0 +1,71 @@
+"""Benchmark the shared distance functions in game.geo.
+
+Times the scalar functions per pair against the original per-module
+haversine copy, one point against many with a Python loop versus
+haversine_many, and a pairwise distance matrix. Also reports how far
+equirectangular drifts from haversine at spawn-radius distances.
+
+    python -m benchmarks.geodesy [--sizes 10,100,1000,10000] [--pairwise 1000]
+"""
+import argparse
+import math
+import os
+import random
+import sys
+
+import numpy as np
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+from benchmarks.common import best_time, format_time
+from game.geo import equirectangular, haversine, haversine_many, haversine_pairwise
+
+LAT, LON = 37.7749, -122.4194
+
+def calculate_distance(lat1: float, lon1: float, lat2: float, lon2: float) -> float:
+    """The haversine copy the game modules used before game.geo"""
+    R = 6371000  # Earth's radius in meters
+    phi1, phi2 = math.radians(lat1), math.radians(lat2)
+    dphi = math.radians(lat2 - lat1)
+    dl = math.radians(lon2 - lon1)
+    a = math.sin(dphi/2)**2 + math.cos(phi1)*math.cos(phi2)*math.sin(dl/2)**2
+    return 2*R*math.atan2(math.sqrt(a), math.sqrt(1-a))
+
+def random_points(n: int, spread: float = 0.01, seed: int = 0):
+    """n coordinates scattered within about a kilometre of the reference point"""
+    rnd = random.Random(seed)
+    return ([LAT + rnd.uniform(-spread, spread) for _ in range(n)],
+            [LON + rnd.uniform(-spread, spread) for _ in range(n)])
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark GPS distance functions")
+    parser.add_argument("--sizes", default="10,100,1000,10000", help="Point counts for one-to-many, comma separated")
+    parser.add_argument("--pairwise", type=int, default=1000, help="Points per side of the pairwise matrix")
+    args = parser.parse_args(argv)
+
+    lats, lons = random_points(1)
+    pair = (LAT, LON, lats[0], lons[0])
+    print("Per pair:")
+    for name, fn in (("original", calculate_distance), ("haversine", haversine), ("equirectangular", equirectangular)):
+        print(f"  {name:>16} {format_time(best_time(lambda: fn(*pair))):>10}")
+
+    print(f"\n{'points':>7} {'loop':>11} {'haversine_many':>15} {'speedup':>8}")
+    for n in (int(size) for size in args.sizes.split(",")):
+        lats, lons = random_points(n, seed=n)
+        lat_array, lon_array = np.array(lats), np.array(lons)
+        loop = best_time(lambda: [calculate_distance(LAT, LON, lat, lon) for lat, lon in zip(lats, lons)])
+        many = best_time(lambda: haversine_many(LAT, LON, lat_array, lon_array))
+        print(f"{n:>7} {format_time(loop):>11} {format_time(many):>15} {loop / many:>7.1f}x")
+
+    lats, lons = random_points(args.pairwise, seed=1)
+    other_lats, other_lons = random_points(args.pairwise, seed=2)
+    pairwise = best_time(lambda: haversine_pairwise(lats, lons, other_lats, other_lons), repeat=3)
+    print(f"\nPairwise {args.pairwise}x{args.pairwise}: {format_time(pairwise)}")
+
+    # Accuracy of the planar approximation against haversine within ~1.4 km
+    lats, lons = random_points(10000, seed=3)
+    errors = [abs(equirectangular(LAT, LON, lat, lon) - haversine(LAT, LON, lat, lon)) for lat, lon in zip(lats, lons)]
+    print(f"equirectangular vs haversine: max error {max(errors) * 1000:.3f} mm over {len(errors)} points")
+
+if __name__ == "__main__":
+    main()
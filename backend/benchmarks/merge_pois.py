@@ -0,0 +1,58 @@
+"""Benchmark merging POI lists from several providers.
+
+Compares the grid-hash merge (ARSpawningSystem._merge_poi_sources) with the
+original dedupe, which checked every POI against everything merged so far.
+
+    python -m benchmarks.merge_pois [--sizes 100,1000,3000]
+"""
+import argparse
+import os
+import sys
+from typing import Dict, Any, List
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+from benchmarks.common import best_time, format_time, random_pois
+from game.ar_spawning import ar_spawning_system
+
+def merge_quadratic(poi_lists: List[List[Dict[str, Any]]]) -> List[Dict[str, Any]]:
+    """The original merge from get_all_nearby_pois: first list as-is, then any()-dedupe"""
+    all_pois = list(poi_lists[0])
+    for pois in poi_lists[1:]:
+        for poi in pois:
+            if not any(ar_spawning_system._is_same_location(poi, existing) for existing in all_pois):
+                all_pois.append(poi)
+    return all_pois
+
+def source_lists(n: int) -> List[List[Dict[str, Any]]]:
+    """Three provider lists of n POIs each, with a share of duplicates across them"""
+    osm = random_pois(n, source='osm', seed=1)
+    google = random_pois(n, source='google', seed=2)
+    foursquare = random_pois(n, source='foursquare', seed=3)
+    # Every fourth POI of the later sources is a near-duplicate of an OSM POI
+    for pois in (google, foursquare):
+        for i in range(0, n, 4):
+            pois[i]['lat'] = osm[i]['lat'] + 0.00002
+            pois[i]['lon'] = osm[i]['lon'] - 0.00002
+    return [osm, google, foursquare]
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark merging POI provider results")
+    parser.add_argument("--sizes", default="100,1000,3000", help="POIs per source, comma separated")
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args(argv)
+
+    print(f"{'N/source':>9} {'quadratic':>11} {'grid':>11} {'speedup':>8}  merged")
+    for n in (int(size) for size in args.sizes.split(",")):
+        lists = source_lists(n)
+        old_count = len(merge_quadratic(lists))
+        new_count = len(ar_spawning_system._merge_poi_sources(lists))
+        if old_count != new_count:
+            print(f"  merged counts differ at N={n}: quadratic {old_count}, grid {new_count}")
+
+        old = best_time(lambda: merge_quadratic(lists), repeat=args.repeat, number=1)
+        new = best_time(lambda: ar_spawning_system._merge_poi_sources(lists), repeat=args.repeat)
+        print(f"{n:>9} {format_time(old):>11} {format_time(new):>11} {old / new:>7.0f}x  {new_count}")
+
+if __name__ == "__main__":
+    main()
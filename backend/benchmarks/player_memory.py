@@ -0,0 +1,75 @@
+"""Benchmark the memory held per player record.
+
+Builds the same population of players as the original dicts and as slotted
+Player records, and measures each with tracemalloc. Ids are 36-character
+UUID strings like the ones the frontend generates.
+
+    python -m benchmarks.player_memory [--players 100000]
+"""
+import argparse
+import gc
+import os
+import sys
+import time
+import tracemalloc
+import uuid
+from typing import Dict, Any
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+from game.config import CHARACTERS
+from game.player import Player
+
+def player_dict(player_id: str, character_class: str) -> Dict[str, Any]:
+    """The player dict PlayerManager.create_player built before Player"""
+    character_stats = CHARACTERS[character_class]
+    return {
+        "id": player_id,
+        "character": character_stats,
+        "character_class": character_class,
+        "current_hp": character_stats["hp"],
+        "max_hp": character_stats["hp"],
+        "xp": 0,
+        "level": 1,
+        "skill_points": 0,
+        "kills": {"class1": 0, "class2": 0, "class3": 0},
+        "last_location": None,
+        "distance_since_last_spawn": 0,
+        "last_spawn_time": None,
+        "last_heal": 0,
+        "skill_cooldowns": {},
+        "skill_levels": {},
+        "active_buffs": {},
+        "pending_level_up": False,
+        "created_at": time.time()
+    }
+
+def measure(build, ids, classes) -> float:
+    """Bytes allocated per player while building a registry keyed by id"""
+    gc.collect()
+    tracemalloc.start()
+    before = tracemalloc.get_traced_memory()[0]
+    registry = {player_id: build(player_id, character_class) for player_id, character_class in zip(ids, classes)}
+    after = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    del registry
+    return (after - before) / len(ids)
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark memory per player record")
+    parser.add_argument("--players", type=int, default=100000)
+    args = parser.parse_args(argv)
+
+    # Ids exist before the players are created, so they are not counted against either layout
+    ids = [str(uuid.uuid4()) for _ in range(args.players)]
+    names = sorted(CHARACTERS)
+    classes = [names[i % len(names)] for i in range(args.players)]
+
+    as_dict = measure(player_dict, ids, classes)
+    as_player = measure(lambda player_id, character_class: Player(player_id, character_class, CHARACTERS[character_class]),
+                        ids, classes)
+    print(f"{args.players} players: dict {as_dict:.0f} bytes/player, Player {as_player:.0f} bytes/player "
+          f"({as_dict / as_player:.1f}x smaller)")
+
+if __name__ == "__main__":
+    main()
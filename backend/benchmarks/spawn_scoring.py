@@ -0,0 +1,94 @@
+"""Benchmark choosing a spawn location from nearby POIs.
+
+Compares the vectorized find_best_spawn_location with the original scalar
+path (score each POI, sort, roll the top 5 one by one), and checks both
+spawn at each POI with the same frequency.
+
+    python -m benchmarks.spawn_scoring [--sizes 20,200,2000] [--trials 20000]
+"""
+import argparse
+import os
+import random
+import sys
+from collections import Counter
+from typing import Dict, Any, Optional
+
+import numpy as np
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+from benchmarks.common import best_time, format_time, random_pois
+from game.ar_spawning import ar_spawning_system
+
+LAT, LON = 37.7749, -122.4194
+
+def find_best_spawn_location_scalar(player_level: int = 1) -> Optional[Dict[str, Any]]:
+    """The original scalar find_best_spawn_location"""
+    pois = ar_spawning_system.get_all_nearby_pois(LAT, LON, ar_spawning_system.spawn_radius)
+    if not pois:
+        return None
+
+    pois_with_probability = []
+    for poi in pois:
+        prob = ar_spawning_system.calculate_spawn_probability(poi, player_level)
+        pois_with_probability.append((poi, prob))
+
+    pois_with_probability.sort(key=lambda x: x[1], reverse=True)
+
+    for poi, prob in pois_with_probability[:5]:
+        enemy = ar_spawning_system._roll_enemy_at_poi(poi, prob, player_level)
+        if enemy:
+            return enemy
+    return None
+
+def find_best_spawn_location_vectorized(player_level: int = 1) -> Optional[Dict[str, Any]]:
+    return ar_spawning_system.find_best_spawn_location(LAT, LON, player_level)
+
+def spawn_frequencies(find, trials: int) -> Counter:
+    """Count spawns per POI name (None for no spawn) over many trials"""
+    counts = Counter()
+    for _ in range(trials):
+        enemy = find()
+        counts[enemy['location']['poi_name'] if enemy else None] += 1
+    return counts
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark spawn location scoring")
+    parser.add_argument("--sizes", default="20,200,2000", help="Nearby POI counts, comma separated")
+    parser.add_argument("--trials", type=int, default=20000, help="Trials for the frequency comparison (0 to skip)")
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args(argv)
+
+    ar_spawning_system.rng = np.random.default_rng(args.seed)
+    random.seed(args.seed)
+    # Serve a fixed POI list in place of the providers and bypass any heatmap
+    ar_spawning_system.heatmap = None
+
+    print(f"{'POIs':>6} {'scalar':>11} {'vectorized':>11} {'speedup':>8}")
+    for n in (int(size) for size in args.sizes.split(",")):
+        pois = [ar_spawning_system._ingest_poi(poi) for poi in random_pois(n, source='google', seed=n)]
+        ar_spawning_system.get_all_nearby_pois = lambda lat, lon, radius=200: pois
+
+        old = best_time(find_best_spawn_location_scalar)
+        new = best_time(find_best_spawn_location_vectorized)
+        print(f"{n:>6} {format_time(old):>11} {format_time(new):>11} {old / new:>7.1f}x")
+
+    if args.trials:
+        # Low ratings keep the top candidates' chances below 1, so later candidates get spawns too
+        pois = random_pois(20, source='google', seed=args.seed)
+        for poi in pois:
+            poi['rating'] = round(poi['rating'] / 5, 2)
+            ar_spawning_system._ingest_poi(poi)
+        ar_spawning_system.get_all_nearby_pois = lambda lat, lon, radius=200: pois
+
+        old = spawn_frequencies(find_best_spawn_location_scalar, args.trials)
+        new = spawn_frequencies(find_best_spawn_location_vectorized, args.trials)
+        print(f"\nSpawn frequencies over {args.trials} trials at 20 POIs:")
+        print(f"{'POI':>16} {'scalar':>8} {'vectorized':>11}")
+        for name in sorted(set(old) | set(new), key=lambda name: -(old[name] + new[name])):
+            print(f"{str(name):>16} {old[name] / args.trials:>8.3f} {new[name] / args.trials:>11.3f}")
+        largest = max(abs(old[name] - new[name]) for name in set(old) | set(new)) / args.trials
+        print(f"largest difference {largest:.3f} (binomial noise is about {2 / np.sqrt(args.trials):.3f})")
+
+if __name__ == "__main__":
+    main()
@@ -1,9 +1,35 @@
-import requests
 import math
-import random
+import os
 import time
+from concurrent.futures import ThreadPoolExecutor, wait
+import numpy as np
 from typing import Dict, Any, List, Optional, Tuple
-from game.config import ENEMY_STATS
+from game.config import ENEMY_STATS, HEATMAP_CONFIG, POI_PROVIDER_CONFIG
+from game.geo import haversine
+from game.heatmap import SpawnHeatmap
+from game.http_sessions import HTTPSessionPool
+from game.poi_cache import TilePOICache
+from game.poi_index import POIIndex, node_to_poi
+from game.poi_profile import classify_poi, get_profile
+from game.pseudo_pois import PseudoPOIGenerator
+from game.sampler import get_sampler
+from game.tiles import in_bounds
+
+def top_candidates(probabilities: np.ndarray, count: int) -> np.ndarray:
+    """Get the indexes of the count highest probabilities, best first and ties in index order.
+    
+    Same result as a stable argsort, but linear in the number of POIs.
+    """
+    count = min(count, len(probabilities))
+    if count <= 0:
+        return np.empty(0, dtype=np.intp)
+    
+    # argpartition picks arbitrary members of a tie, so fill the last places by index instead
+    threshold = np.partition(probabilities, len(probabilities) - count)[len(probabilities) - count]
+    above = np.flatnonzero(probabilities > threshold)
+    tied = np.flatnonzero(probabilities == threshold)[:count - len(above)]
+    top = np.concatenate((above, tied))
+    return top[np.lexsort((top, -probabilities[top]))]
 
 class ARSpawningSystem:
     def __init__(self):
@@ -11,13 +37,40 @@ class ARSpawningSystem:
         self.google_places_api_key = None  # Get from Google Cloud Console
         self.foursquare_api_key = None      # Get from Foursquare Developer Portal
         
-        # Cache for POI data to reduce API calls
-        self.poi_cache = {}
-        self.cache_expiry = 3600  # 1 hour cache
+        # Tile-keyed cache for POI data to reduce API calls
+        self.poi_cache = TilePOICache()
+        
+        # Providers are queried in parallel; results arriving after the budget are dropped
+        self.poi_fetch_budget = POI_PROVIDER_CONFIG["fetch_budget"]
+        self.provider_executor = ThreadPoolExecutor(
+            max_workers=POI_PROVIDER_CONFIG["max_workers"],
+            thread_name_prefix="poi-provider"
+        )
+        
+        # Random generator for batched spawn rolls
+        self.rng = np.random.default_rng()
+        
+        # Pooled keep-alive sessions, one per provider
+        self.http_sessions = HTTPSessionPool()
+        
+        # Local OpenStreetMap index used instead of the Overpass endpoint when configured
+        self.poi_index = None
+        index_path = POI_PROVIDER_CONFIG["providers"]["osm"].get("index_path")
+        if index_path:
+            self.set_poi_index(index_path)
+        
+        # Deterministic per-tile POIs used when no provider returns anything
+        self.pseudo_pois = PseudoPOIGenerator()
+        
+        # Precomputed spawn probabilities per tile, used instead of live POI lookups when loaded
+        self.heatmap = None
+        if HEATMAP_CONFIG["path"]:
+            self.set_heatmap(HEATMAP_CONFIG["path"])
         
         # Spawn configuration
         self.spawn_radius = 100  # meters
         self.max_pois_per_request = 20
+        self.max_spawn_candidates = 5  # best POIs rolled per spawn attempt
         self.poi_types_for_spawning = [
             'tourist_attraction', 'park', 'museum', 'art_gallery',
             'restaurant', 'cafe', 'store', 'shopping_mall',
@@ -29,121 +82,105 @@ class ARSpawningSystem:
         if not self.google_places_api_key:
             return []
         
-        cache_key = f"google_{lat}_{lon}_{radius}"
-        if cache_key in self.poi_cache:
-            cached_data, timestamp = self.poi_cache[cache_key]
-            if time.time() - timestamp < self.cache_expiry:
-                return cached_data
+        try:
+            pois = self.poi_cache.get_pois('google', lat, lon, radius, self._fetch_google_tile)
+            return pois[:self.max_pois_per_request]
+            
+        except Exception as e:
+            print(f"Google Places API error: {e}")
+            return []
+    
+    def _fetch_google_tile(self, bounds: Dict[str, float]) -> List[Dict[str, Any]]:
+        """Fetch all Google Places POIs inside a tile"""
+        center_lat, center_lon, radius = self._tile_search_circle(bounds)
         
-        url = "https://maps.googleapis.com/maps/api/place/nearbysearch/json"
         params = {
-            'location': f"{lat},{lon}",
+            'location': f"{center_lat},{center_lon}",
             'radius': radius,
             'type': 'point_of_interest',
             'key': self.google_places_api_key
         }
         
-        try:
-            response = requests.get(url, params=params, timeout=10)
-            response.raise_for_status()
-            data = response.json()
-            
-            pois = []
-            for place in data.get('results', []):
-                poi = {
-                    'name': place.get('name', 'Unknown'),
-                    'lat': place['geometry']['location']['lat'],
-                    'lon': place['geometry']['location']['lng'],
-                    'types': place.get('types', []),
-                    'rating': place.get('rating', 0),
-                    'place_id': place.get('place_id', ''),
-                    'source': 'google'
-                }
-                pois.append(poi)
-            
-            # Cache the results
-            self.poi_cache[cache_key] = (pois, time.time())
-            return pois[:self.max_pois_per_request]
-            
-        except Exception as e:
-            print(f"Google Places API error: {e}")
-            return []
+        response = self.http_sessions.get('google', params=params)
+        data = response.json()
+        
+        pois = []
+        for place in data.get('results', []):
+            poi = {
+                'name': place.get('name', 'Unknown'),
+                'lat': place['geometry']['location']['lat'],
+                'lon': place['geometry']['location']['lng'],
+                'types': place.get('types', []),
+                'rating': place.get('rating', 0),
+                'place_id': place.get('place_id', ''),
+                'source': 'google'
+            }
+            pois.append(poi)
+        
+        return [self._ingest_poi(poi) for poi in pois if in_bounds(poi['lat'], poi['lon'], bounds)]
     
     def get_nearby_pois_foursquare(self, lat: float, lon: float, radius: int = 200) -> List[Dict[str, Any]]:
         """Get nearby Points of Interest using Foursquare API"""
         if not self.foursquare_api_key:
             return []
         
-        cache_key = f"foursquare_{lat}_{lon}_{radius}"
-        if cache_key in self.poi_cache:
-            cached_data, timestamp = self.poi_cache[cache_key]
-            if time.time() - timestamp < self.cache_expiry:
-                return cached_data
+        try:
+            pois = self.poi_cache.get_pois('foursquare', lat, lon, radius, self._fetch_foursquare_tile)
+            return pois[:self.max_pois_per_request]
+            
+        except Exception as e:
+            print(f"Foursquare API error: {e}")
+            return []
+    
+    def _fetch_foursquare_tile(self, bounds: Dict[str, float]) -> List[Dict[str, Any]]:
+        """Fetch all Foursquare POIs inside a tile"""
+        center_lat, center_lon, radius = self._tile_search_circle(bounds)
         
-        url = "https://api.foursquare.com/v3/places/search"
         headers = {
             'Authorization': f'{self.foursquare_api_key}',
             'accept': 'application/json'
         }
         params = {
-            'll': f"{lat},{lon}",
+            'll': f"{center_lat},{center_lon}",
             'radius': radius,
-            'limit': self.max_pois_per_request,
+            'limit': 50,  # Foursquare maximum page size
             'fields': 'name,geocodes,location,rating,categories'
         }
         
+        response = self.http_sessions.get('foursquare', params=params, headers=headers)
+        data = response.json()
+        
+        pois = []
+        for place in data.get('results', []):
+            poi = {
+                'name': place.get('name', 'Unknown'),
+                'lat': place['geocodes']['main']['latitude'],
+                'lon': place['geocodes']['main']['longitude'],
+                'types': [cat.get('name', '') for cat in place.get('categories', [])],
+                'rating': place.get('rating', 0),
+                'place_id': place.get('fsq_id', ''),
+                'source': 'foursquare'
+            }
+            pois.append(poi)
+        
+        return [self._ingest_poi(poi) for poi in pois if in_bounds(poi['lat'], poi['lon'], bounds)]
+    
+    def get_nearby_pois_osm(self, lat: float, lon: float, radius: int = 200) -> List[Dict[str, Any]]:
+        """Get nearby Points of Interest using OpenStreetMap (Overpass API) - Free option"""
         try:
-            response = requests.get(url, headers=headers, params=params, timeout=10)
-            response.raise_for_status()
-            data = response.json()
-            
-            pois = []
-            for place in data.get('results', []):
-                poi = {
-                    'name': place.get('name', 'Unknown'),
-                    'lat': place['geocodes']['main']['latitude'],
-                    'lon': place['geocodes']['main']['longitude'],
-                    'types': [cat.get('name', '') for cat in place.get('categories', [])],
-                    'rating': place.get('rating', 0),
-                    'place_id': place.get('fsq_id', ''),
-                    'source': 'foursquare'
-                }
-                pois.append(poi)
-            
-            # Cache the results
-            self.poi_cache[cache_key] = (pois, time.time())
-            return pois
+            pois = self.poi_cache.get_pois('osm', lat, lon, radius, self._fetch_osm_tile)
+            return pois[:self.max_pois_per_request]
             
         except Exception as e:
-            print(f"Foursquare API error: {e}")
+            print(f"OpenStreetMap API error: {e}")
             return []
     
-    def get_nearby_pois_osm(self, lat: float, lon: float, radius: int = 200) -> List[Dict[str, Any]]:
-        """Get nearby Points of Interest using OpenStreetMap (Overpass API) - Free option"""
-        cache_key = f"osm_{lat}_{lon}_{radius}"
-        if cache_key in self.poi_cache:
-            cached_data, timestamp = self.poi_cache[cache_key]
-            if time.time() - timestamp < self.cache_expiry:
-                return cached_data
-        
-        # Calculate bounding box
-        def deg2rad(deg):
-            return deg * math.pi / 180
-        
-        def get_bounding_box(lat, lon, radius_meters):
-            lat_delta = radius_meters / 111320  # 1 degree latitude ≈ 111.32 km
-            lon_delta = radius_meters / (111320 * math.cos(deg2rad(lat)))
-            return {
-                'south': lat - lat_delta,
-                'north': lat + lat_delta,
-                'west': lon - lon_delta,
-                'east': lon + lon_delta
-            }
-        
-        bbox = get_bounding_box(lat, lon, radius)
+    def _fetch_osm_tile(self, bbox: Dict[str, float]) -> List[Dict[str, Any]]:
+        """Fetch all OpenStreetMap POIs inside a tile"""
+        if self.poi_index:
+            return [self._ingest_poi(poi) for poi in self.poi_index.query_bbox(bbox)]
         
         # Overpass QL query for POIs
-        overpass_url = "https://overpass-api.de/api/interpreter"
         overpass_query = f"""
         [out:json][timeout:25];
         (
@@ -156,59 +193,140 @@ class ARSpawningSystem:
         out geom;
         """
         
-        try:
-            response = requests.get(overpass_url, params={'data': overpass_query}, timeout=15)
-            response.raise_for_status()
-            data = response.json()
-            
-            pois = []
-            for element in data.get('elements', []):
-                if element['type'] == 'node':
-                    tags = element.get('tags', {})
-                    poi = {
-                        'name': tags.get('name', 'Unknown Location'),
-                        'lat': element['lat'],
-                        'lon': element['lon'],
-                        'types': [key for key in tags.keys() if key in ['tourism', 'amenity', 'shop', 'leisure', 'historic']],
-                        'rating': 0,  # OSM doesn't provide ratings
-                        'place_id': str(element['id']),
-                        'source': 'osm',
-                        'tags': tags
-                    }
-                    pois.append(poi)
-            
-            # Cache the results
-            self.poi_cache[cache_key] = (pois, time.time())
-            return pois[:self.max_pois_per_request]
-            
-        except Exception as e:
-            print(f"OpenStreetMap API error: {e}")
+        response = self.http_sessions.get('osm', params={'data': overpass_query})
+        data = response.json()
+        
+        pois = []
+        for element in data.get('elements', []):
+            if element['type'] == 'node':
+                poi = node_to_poi(element['id'], element['lat'], element['lon'], element.get('tags', {}))
+                pois.append(poi)
+        
+        return [self._ingest_poi(poi) for poi in pois if in_bounds(poi['lat'], poi['lon'], bbox)]
+    
+    def get_nearby_pois_procedural(self, lat: float, lon: float, radius: int = 200) -> List[Dict[str, Any]]:
+        """Get nearby pseudo-POIs generated from the world seed - works without network"""
+        if not self.pseudo_pois.enabled:
             return []
+        
+        pois = self.poi_cache.get_pois('procedural', lat, lon, radius, self._fetch_procedural_tile)
+        return pois[:self.max_pois_per_request]
+    
+    def _fetch_procedural_tile(self, bounds: Dict[str, float]) -> List[Dict[str, Any]]:
+        """Generate all pseudo-POIs inside a tile"""
+        return [self._ingest_poi(poi) for poi in self.pseudo_pois.bounds_pois(bounds, self.poi_cache.zoom)]
+    
+    def _tile_fetchers(self) -> List[Tuple[str, Any]]:
+        """Get (source, fetch_tile) for every provider currently enabled"""
+        fetchers = [('osm', self._fetch_osm_tile)]
+        if self.google_places_api_key:
+            fetchers.append(('google', self._fetch_google_tile))
+        if self.foursquare_api_key:
+            fetchers.append(('foursquare', self._fetch_foursquare_tile))
+        return fetchers
+    
+    def is_tile_cached(self, x: int, y: int) -> bool:
+        """Check if a tile is cached for every enabled provider"""
+        return all(self.poi_cache.is_cached(source, x, y) for source, _ in self._tile_fetchers())
+    
+    def warm_tile(self, x: int, y: int):
+        """Fetch a tile from every enabled provider into the cache"""
+        for source, fetch_tile in self._tile_fetchers():
+            try:
+                self.poi_cache.get_tile(source, x, y, fetch_tile)
+            except Exception as e:
+                print(f"POI prefetch error ({source} {x}/{y}): {e}")
+    
+    def _ingest_poi(self, poi: Dict[str, Any]) -> Dict[str, Any]:
+        """Attach the precomputed spawn profile to a freshly fetched POI"""
+        poi['profile'] = classify_poi(poi)
+        return poi
+    
+    def _tile_search_circle(self, bounds: Dict[str, float]) -> Tuple[float, float, int]:
+        """Get the (lat, lon, radius) search circle enclosing a tile"""
+        center_lat = (bounds['south'] + bounds['north']) / 2
+        center_lon = (bounds['west'] + bounds['east']) / 2
+        radius = self._calculate_distance(center_lat, center_lon, bounds['north'], bounds['east'])
+        return center_lat, center_lon, int(math.ceil(radius))
     
     def get_all_nearby_pois(self, lat: float, lon: float, radius: int = 200) -> List[Dict[str, Any]]:
-        """Get POIs from all available sources"""
-        all_pois = []
+        """Get POIs from all available sources, queried in parallel within the fetch budget"""
+        # OSM first (free), then Google Places and Foursquare if API keys are available
+        providers = [('osm', self.get_nearby_pois_osm)]
+        if self.google_places_api_key:
+            providers.append(('google', self.get_nearby_pois_google))
+        if self.foursquare_api_key:
+            providers.append(('foursquare', self.get_nearby_pois_foursquare))
         
-        # Try OSM first (free)
-        osm_pois = self.get_nearby_pois_osm(lat, lon, radius)
-        all_pois.extend(osm_pois)
+        futures = {
+            self.provider_executor.submit(fetch, lat, lon, radius): source
+            for source, fetch in providers
+        }
+        done, late = wait(futures, timeout=self.poi_fetch_budget)
         
-        # Try Google Places if API key is available
-        if self.google_places_api_key:
-            google_pois = self.get_nearby_pois_google(lat, lon, radius)
-            # Remove duplicates based on location
-            for poi in google_pois:
-                if not any(self._is_same_location(poi, existing) for existing in all_pois):
-                    all_pois.append(poi)
+        # Late providers keep running and still fill the cache for the next lookup
+        if late:
+            print(f"POI providers missed the {self.poi_fetch_budget}s budget: {sorted(futures[f] for f in late)}")
         
-        # Try Foursquare if API key is available
-        if self.foursquare_api_key:
-            foursquare_pois = self.get_nearby_pois_foursquare(lat, lon, radius)
-            for poi in foursquare_pois:
-                if not any(self._is_same_location(poi, existing) for existing in all_pois):
-                    all_pois.append(poi)
+        results = {futures[future]: future.result() for future in done}
         
-        return all_pois
+        merged = self._merge_poi_sources([results.get(source, []) for source, _ in providers])
+        
+        # No provider configured or reachable: fall back to pseudo-POIs so spawning keeps working
+        if not merged:
+            merged = self.get_nearby_pois_procedural(lat, lon, radius)
+        
+        return merged
+    
+    def _merge_poi_sources(self, poi_lists: List[List[Dict[str, Any]]], threshold: float = 0.0001) -> List[Dict[str, Any]]:
+        """Merge POI lists in priority order, folding duplicates into the first source's POI.
+        
+        POIs are bucketed into a grid of threshold-sized cells, so each POI is
+        only compared against POIs in its own and the eight neighbouring cells.
+        """
+        merged = []
+        grid = {}  # (lat_cell, lon_cell) -> indexes into merged
+        copied = set()  # merged indexes already copied, cached POIs are never mutated
+        
+        for list_index, pois in enumerate(poi_lists):
+            for poi in pois:
+                lat_cell = math.floor(poi['lat'] / threshold)
+                lon_cell = math.floor(poi['lon'] / threshold)
+                
+                # The first (highest priority) source is kept as-is
+                match = None
+                if list_index > 0:
+                    for d_lat in (-1, 0, 1):
+                        for d_lon in (-1, 0, 1):
+                            for index in grid.get((lat_cell + d_lat, lon_cell + d_lon), ()):
+                                if self._is_same_location(poi, merged[index], threshold):
+                                    match = index
+                                    break
+                            if match is not None:
+                                break
+                        if match is not None:
+                            break
+                
+                if match is None:
+                    grid.setdefault((lat_cell, lon_cell), []).append(len(merged))
+                    merged.append(poi)
+                    continue
+                
+                if match not in copied:
+                    merged[match] = dict(merged[match])
+                    copied.add(match)
+                self._merge_poi_attributes(merged[match], poi)
+        
+        return merged
+    
+    def _merge_poi_attributes(self, target: Dict[str, Any], other: Dict[str, Any]):
+        """Fill in attributes from a duplicate POI found by another source"""
+        target['sources'] = target.get('sources', [target['source']]) + [other['source']]
+        target['types'] = list(target.get('types', [])) + [t for t in other.get('types', []) if t not in target.get('types', [])]
+        target['rating'] = max(target.get('rating', 0) or 0, other.get('rating', 0) or 0)
+        if target.get('name', '').startswith('Unknown') and other.get('name'):
+            target['name'] = other['name']
+        target['profile'] = classify_poi(target)
     
     def _is_same_location(self, poi1: Dict, poi2: Dict, threshold: float = 0.0001) -> bool:
         """Check if two POIs are essentially the same location"""
@@ -218,50 +336,33 @@ class ARSpawningSystem:
     
     def calculate_spawn_probability(self, poi: Dict[str, Any], player_level: int = 1) -> float:
         """Calculate spawn probability based on POI characteristics"""
+        profile = get_profile(poi)
         base_probability = 0.3  # 30% base chance
         
-        # Adjust based on POI type
-        poi_types = poi.get('types', [])
-        type_bonus = 0
-        
-        if any('tourism' in str(t).lower() or 'attraction' in str(t).lower() for t in poi_types):
-            type_bonus += 0.3  # Tourist attractions are great spawn points
-        elif any('park' in str(t).lower() or 'leisure' in str(t).lower() for t in poi_types):
-            type_bonus += 0.2  # Parks are good spawn points
-        elif any('restaurant' in str(t).lower() or 'shop' in str(t).lower() for t in poi_types):
-            type_bonus += 0.1  # Commercial areas are okay
-        
-        # Adjust based on rating (if available)
-        rating = poi.get('rating', 0)
-        rating_bonus = min(rating / 5.0 * 0.2, 0.2)  # Max 20% bonus for 5-star places
-        
         # Adjust based on player level (higher level = more spawns)
         level_bonus = min(player_level * 0.05, 0.3)  # Max 30% bonus
         
-        # Time of day bonus (daytime = more spawns)
-        current_hour = time.localtime().tm_hour
-        time_bonus = 0.1 if 8 <= current_hour <= 20 else -0.1
-        
-        total_probability = base_probability + type_bonus + rating_bonus + level_bonus + time_bonus
+        total_probability = base_probability + profile.type_bonus + profile.rating_bonus + level_bonus + self._time_bonus()
         return max(0.1, min(1.0, total_probability))  # Clamp between 10% and 100%
     
+    def is_daytime(self) -> bool:
+        """Check if it is currently daytime (8:00 - 20:59 local time)"""
+        return 8 <= time.localtime().tm_hour <= 20
+    
+    def _time_bonus(self, daytime: Optional[bool] = None) -> float:
+        """Time of day bonus (daytime = more spawns)"""
+        if daytime is None:
+            daytime = self.is_daytime()
+        return 0.1 if daytime else -0.1
+    
     def select_enemy_type_for_poi(self, poi: Dict[str, Any], player_level: int = 1) -> str:
         """Select appropriate enemy type based on POI characteristics"""
-        poi_types = poi.get('types', [])
-        
+        return get_sampler(self.enemy_weights_for_poi(poi, player_level)).draw(self.rng)
+    
+    def enemy_weights_for_poi(self, poi: Dict[str, Any], player_level: int = 1) -> List[int]:
+        """Get the (class1, class2, class3) enemy weights at a POI for a player level"""
         # Determine enemy type based on location
-        if any('tourism' in str(t).lower() or 'museum' in str(t).lower() for t in poi_types):
-            # Tourist areas - more variety, including rare enemies
-            weights = [60, 30, 10]  # More class3 (dragons) in tourist areas
-        elif any('park' in str(t).lower() or 'leisure' in str(t).lower() for t in poi_types):
-            # Parks - balanced spawn
-            weights = [70, 25, 5]
-        elif any('restaurant' in str(t).lower() or 'shop' in str(t).lower() for t in poi_types):
-            # Commercial areas - more common enemies
-            weights = [80, 18, 2]
-        else:
-            # Default weights
-            weights = [70, 25, 5]
+        weights = get_profile(poi).enemy_weights
         
         # Adjust weights based on player level
         if player_level >= 5:
@@ -269,16 +370,24 @@ class ARSpawningSystem:
         elif player_level >= 10:
             weights = [40, 35, 25]  # Even more challenging
         
-        return random.choices(["class1", "class2", "class3"], weights=weights)[0]
+        return list(weights)
     
     def spawn_enemy_at_poi(self, poi: Dict[str, Any], player_level: int = 1) -> Optional[Dict[str, Any]]:
         """Spawn an enemy at a specific POI location"""
         spawn_chance = self.calculate_spawn_probability(poi, player_level)
-        
-        if random.random() > spawn_chance:
+        return self._roll_enemy_at_poi(poi, spawn_chance, player_level)
+    
+    def _roll_enemy_at_poi(self, poi: Dict[str, Any], spawn_chance: float, player_level: int) -> Optional[Dict[str, Any]]:
+        """Spawn an enemy at a POI with an already calculated spawn chance"""
+        if self.rng.random() > spawn_chance:
             return None
         
-        enemy_type = self.select_enemy_type_for_poi(poi, player_level)
+        return self._create_enemy_at_poi(poi, player_level)
+    
+    def _create_enemy_at_poi(self, poi: Dict[str, Any], player_level: int, enemy_type: Optional[str] = None) -> Dict[str, Any]:
+        """Create an enemy at a POI whose spawn roll succeeded"""
+        if enemy_type is None:
+            enemy_type = self.select_enemy_type_for_poi(poi, player_level)
         enemy_stats = ENEMY_STATS[enemy_type]
         
         enemy = {
@@ -301,26 +410,49 @@ class ARSpawningSystem:
     
     def find_best_spawn_location(self, player_lat: float, player_lon: float, player_level: int = 1) -> Optional[Dict[str, Any]]:
         """Find the best POI to spawn an enemy near the player"""
+        if self.heatmap_covers(player_lat, player_lon):
+            return self.spawn_from_heatmap(player_lat, player_lon, player_level)
+        
         pois = self.get_all_nearby_pois(player_lat, player_lon, self.spawn_radius)
         
         if not pois:
             return None
         
-        # Sort POIs by spawn probability
-        pois_with_probability = []
-        for poi in pois:
-            prob = self.calculate_spawn_probability(poi, player_level)
-            pois_with_probability.append((poi, prob))
+        probabilities = self.calculate_spawn_probabilities(pois, player_level)
         
-        pois_with_probability.sort(key=lambda x: x[1], reverse=True)
+        # Try to spawn at the top 5 locations, best first
+        top = top_candidates(probabilities, self.max_spawn_candidates)
         
-        # Try to spawn at the best locations first
-        for poi, prob in pois_with_probability[:5]:  # Try top 5 locations
-            enemy = self.spawn_enemy_at_poi(poi, player_level)
-            if enemy:
-                return enemy
+        # Roll every candidate at once and spawn at the best one that succeeded
+        successes = np.flatnonzero(self.rng.random(len(top)) <= probabilities[top])
+        if not successes.size:
+            return None
         
-        return None
+        return self._create_enemy_at_poi(pois[top[successes[0]]], player_level)
+    
+    def calculate_spawn_probabilities(self, pois: List[Dict[str, Any]], player_level: int = 1,
+                                      daytime: Optional[bool] = None) -> np.ndarray:
+        """Calculate spawn probability for many POIs at once (same formula as calculate_spawn_probability)"""
+        profiles = [get_profile(poi) for poi in pois]
+        poi_bonus = np.fromiter((p.type_bonus + p.rating_bonus for p in profiles), dtype=float, count=len(profiles))
+        
+        base_probability = 0.3
+        level_bonus = min(player_level * 0.05, 0.3)
+        return np.clip(base_probability + poi_bonus + level_bonus + self._time_bonus(daytime), 0.1, 1.0)
+    
+    def heatmap_covers(self, lat: float, lon: float) -> bool:
+        """Check if a precomputed heatmap covers a location"""
+        return self.heatmap is not None and self.heatmap.covers(lat, lon, self.spawn_radius)
+    
+    def spawn_from_heatmap(self, player_lat: float, player_lon: float, player_level: int = 1) -> Optional[Dict[str, Any]]:
+        """Spawn with one heatmap lookup and a random draw instead of fetching POIs"""
+        rolled = self.heatmap.roll(player_lat, player_lon, self.spawn_radius, self.max_pois_per_request,
+                                   self.max_spawn_candidates, player_level, self.is_daytime(), self.rng)
+        if not rolled:
+            return None
+        
+        poi, enemy_type = rolled
+        return self._create_enemy_at_poi(poi, player_level, enemy_type)
     
     def set_api_keys(self, google_api_key: str = None, foursquare_api_key: str = None):
         """Set API keys for external services"""
@@ -329,6 +461,33 @@ class ARSpawningSystem:
         if foursquare_api_key:
             self.foursquare_api_key = foursquare_api_key
     
+    def set_poi_index(self, db_path: str) -> bool:
+        """Answer OpenStreetMap lookups from a local POI index, returning False if it is missing.
+        
+        Without the index the Overpass API stays in use.
+        """
+        if not os.path.exists(db_path):
+            print(f"⚠️ POI index not found: {db_path}, using the Overpass API")
+            return False
+        self.poi_index = POIIndex(db_path)
+        self.poi_cache.clear()
+        return True
+    
+    def set_heatmap(self, path: str) -> bool:
+        """Answer spawns on covered tiles from a precomputed heatmap, returning False if it can't be loaded.
+        
+        Without the heatmap every spawn uses live POI lookups.
+        """
+        if not os.path.exists(path):
+            print(f"⚠️ Spawn heatmap not found: {path}, using live POI lookups")
+            return False
+        try:
+            self.heatmap = SpawnHeatmap.load(path)
+        except (OSError, ValueError) as e:
+            print(f"⚠️ Spawn heatmap {path} could not be loaded ({e}), using live POI lookups")
+            return False
+        return True
+    
     def get_spawn_info(self, player_lat: float, player_lon: float) -> Dict[str, Any]:
         """Get information about potential spawn locations for debugging"""
         pois = self.get_all_nearby_pois(player_lat, player_lon, self.spawn_radius)
@@ -361,12 +520,7 @@ class ARSpawningSystem:
     
     def _calculate_distance(self, lat1: float, lon1: float, lat2: float, lon2: float) -> float:
         """Calculate distance between two points in meters"""
-        R = 6371000  # Earth's radius in meters
-        phi1, phi2 = math.radians(lat1), math.radians(lat2)
-        dphi = math.radians(lat2 - lat1)
-        dl = math.radians(lon2 - lon1)
-        a = math.sin(dphi/2)**2 + math.cos(phi1)*math.cos(phi2)*math.sin(dl/2)**2
-        return 2*R*math.atan2(math.sqrt(a), math.sqrt(1-a))
+        return haversine(lat1, lon1, lat2, lon2)
 
 # Global AR spawning system instance
 ar_spawning_system = ARSpawningSystem()
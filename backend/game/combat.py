@@ -3,11 +3,15 @@ import time
 from typing import Dict, Any, Tuple, Optional
 from game.config import CRIT_CHANCE, CRIT_MULTIPLIER, DODGE_CHANCE, SKILLS
 from game.player import player_manager
+from game.enemy_index import enemy_index
+from game.locks import player_locked
+from game.reaper import idle_reaper
 
 class CombatSystem:
     def __init__(self):
         self.active_combats: Dict[str, Dict[str, Any]] = {}  # player_id -> combat_data
     
+    @player_locked
     def start_combat(self, player_id: str, enemy: Dict[str, Any]):
         """Start combat for a player"""
         self.active_combats[player_id] = {
@@ -15,11 +19,15 @@ class CombatSystem:
             "start_time": time.time(),
             "turn_count": 0
         }
+        enemy_index.add(player_id, enemy)
+        idle_reaper.watch_combat(player_id)
     
+    @player_locked
     def end_combat(self, player_id: str):
         """End combat for a player"""
         if player_id in self.active_combats:
             del self.active_combats[player_id]
+        enemy_index.remove(player_id)
     
     def get_combat(self, player_id: str) -> Optional[Dict[str, Any]]:
         """Get current combat data for a player"""
@@ -255,6 +263,7 @@ class CombatSystem:
         
         return max(0, modified_damage)
     
+    @player_locked
     def process_combat_turn(self, player_id: str, player: Dict[str, Any]) -> Dict[str, Any]:
         """Process a complete combat turn with buffs"""
         combat = self.get_combat(player_id)
@@ -320,6 +329,7 @@ class CombatSystem:
                 final_damage = self.apply_buffs_to_defense(player, enemy_attack_result["damage"])
                 player["current_hp"] -= final_damage
                 player["current_hp"] = max(0, player["current_hp"])
+                player_manager.mark_dirty(player_id)
                 
                 enemy_attack_result["damage"] = final_damage
                 result["combat_messages"].append(f"👹 Enemy hits for {final_damage} damage!")
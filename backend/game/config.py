@@ -1,3 +1,5 @@
+import os
+
 # Game configuration constants
 ENEMY_STATS = {
     "class1": {"hp": 80, "atk": 5, "name": "Goblin", "xp_reward": 10},
@@ -71,7 +73,16 @@ SPAWN_CONFIG = {
     },
     "max_enemies_per_area": 3,
     "spawn_cooldown": 10,  # seconds between spawns
-    "area_radius":1  # meters - radius for area limit checking
+    "area_radius":1,  # meters - radius for area limit checking
+    "spawn_latency_budget_ms": 300,  # default wait for a POI-based spawn before the legacy spawn is used
+    "max_spawn_latency_budget_ms": 2000  # upper limit for a per-request spawn_budget_ms
+}
+
+# Enemy weights of the legacy movement spawn (check_enemy_spawn)
+LEGACY_ENEMY_WEIGHTS = {
+    "class1": 70,  # Common enemies
+    "class2": 25,  # Uncommon enemies
+    "class3": 5    # Rare enemies
 }
 
 SPAWN_DISTANCE_THRESHOLD = 1  # meters
@@ -82,3 +93,125 @@ HEAL_AMOUNT = 25
 CRIT_CHANCE = 0.1
 CRIT_MULTIPLIER = 2.0
 DODGE_CHANCE = 0.05
+
+# AR POI cache settings
+POI_CACHE_CONFIG = {
+    "tile_zoom": 17,  # slippy-map zoom - ~300m tiles, roughly a city block
+    "max_entries": 5000,  # tiles kept before least recently used ones are evicted
+    "ttl": 3600,  # seconds - 1 hour cache
+    "stale_ttl": 21600,  # seconds past ttl an expired tile is still served while it refreshes (0 disables)
+    "negative_ttl": 120,  # seconds - failed or empty fetches are not retried before this
+    "refresh_workers": 2  # threads refreshing stale tiles in the background
+}
+
+# AR POI provider settings
+POI_PROVIDER_CONFIG = {
+    "fetch_budget": 5.0,  # seconds - overall wait for all providers, late results are dropped
+    "max_workers": 8,  # threads shared by all provider lookups
+    "providers": {
+        # url - endpoint (point at a local stub server for testing)
+        # timeout - seconds per HTTP attempt, pool_size - keep-alive connections per provider
+        "osm": {"url": "https://overpass-api.de/api/interpreter", "timeout": 15, "pool_size": 4,
+                "index_path": os.environ.get("POI_INDEX_PATH")},  # offline index built by game.poi_index
+        "google": {"url": "https://maps.googleapis.com/maps/api/place/nearbysearch/json", "timeout": 10, "pool_size": 4},
+        "foursquare": {"url": "https://api.foursquare.com/v3/places/search", "timeout": 10, "pool_size": 4}
+    },
+    "max_retries": 2,  # extra attempts on connection errors, timeouts and 429/5xx responses
+    "backoff_base": 0.25,  # seconds - retry delay is a random value up to base * 2^attempt
+    "backoff_max": 2.0,  # seconds - cap for a single retry delay
+    "breaker_threshold": 5,  # consecutive failed requests before a provider's circuit opens
+    "breaker_reset_timeout": 30  # seconds an open circuit rejects requests before a trial request
+}
+
+# Predictive POI prefetch along the player's heading
+PREFETCH_CONFIG = {
+    "enabled": True,
+    "horizon": 60,  # seconds ahead of the player to warm
+    "step": 10,  # seconds between projected positions
+    "min_speed": 0.5,  # m/s - slower players are treated as standing still
+    "max_speed": 50,  # m/s - faster jumps are GPS noise
+    "max_fix_gap": 60,  # seconds - older fixes are too stale to estimate heading
+    "tiles_per_second": 2,  # global prefetch budget shared by all players
+    "burst": 10,  # tiles that can be prefetched at once after idling
+    "workers": 2  # prefetch threads
+}
+
+# Background POI spawn resolution
+SPAWN_TASK_CONFIG = {
+    "workers": 4,  # threads resolving POI-based spawns off the request thread
+    "max_queue": 1000,  # queued lookups before new ones are rejected
+    "result_ttl": 120  # seconds - undelivered results older than this are dropped
+}
+
+# Procedural pseudo-POIs, used when no provider returns any POIs
+PSEUDO_POI_CONFIG = {
+    "enabled": True,
+    "world_seed": os.environ.get("WORLD_SEED", "kla-sick"),  # same seed -> same spawn points on every process
+    "min_per_tile": 2,
+    "max_per_tile": 5  # at most 5 POIs fit in one tile hash
+}
+
+# Precomputed spawn heatmap built by game.heatmap; covered tiles skip live POI lookups
+HEATMAP_CONFIG = {
+    "path": os.environ.get("SPAWN_HEATMAP_PATH")
+}
+
+# Batched GPS fixes sent to /update-location-batch
+LOCATION_BATCH_CONFIG = {
+    "max_fixes": 120,  # fixes accepted per request, e.g. 2 minutes at one fix per second
+    "assumed_fix_interval": 1.0  # seconds - spacing given to fixes sent without timestamps (watchPosition's usual rate)
+}
+
+# Per-player GPS smoothing and dead band applied before any spawn logic
+LOCATION_FILTER_CONFIG = {
+    "enabled": True,
+    "dead_band": 3.0,  # meters - smoothed moves shorter than this are treated as jitter
+    "dead_band_sigmas": 2.0,  # the dead band also widens to this many standard deviations of the smoothed position
+    "default_accuracy": 15.0,  # meters - assumed when the client sends no accuracy
+    "max_accuracy": 100.0,  # meters - fixes less accurate than this are ignored
+    "acceleration_noise": 0.1,  # m/s² - how quickly the player's walking velocity may change
+    "initial_speed": 2.0,  # m/s - velocity uncertainty of a new track (brisk walking pace)
+    "max_gap": 60  # seconds - a longer pause between fixes starts a new track
+}
+
+# Spatial grid of live enemies used for area limits
+ENEMY_INDEX_CONFIG = {
+    "cell_size": 50  # meters - grid cell edge (north-south), keep near the largest area_radius
+}
+
+# Shared world enemies at POIs, discoverable by every nearby player
+WORLD_ENEMY_CONFIG = {
+    "enabled": True,
+    "ttl": 300,  # seconds a POI enemy stays in the world
+    "discovery_radius": 100,  # meters - players this close can discover and engage it
+    "cell_size": 100  # meters - spatial grid cell edge
+}
+
+# Player persistence with batched write-behind
+PLAYER_STORAGE_CONFIG = {
+    "backend": os.environ.get("PLAYER_STORAGE", "memory"),  # "memory" or "sqlite"
+    "path": os.environ.get("PLAYER_DB_PATH", "players.sqlite"),
+    "flush_interval": 2.0,  # seconds - longest a change waits before it is written (durability lag)
+    "max_batch": 500  # players written per transaction
+}
+
+# Background reaper for idle sessions and expired cache entries
+REAPER_CONFIG = {
+    "enabled": True,
+    "interval": 60,  # seconds between reaper runs
+    "combat_ttl": 600,  # seconds without player activity before a combat counts as abandoned
+    "player_ttl": 3600  # seconds without player activity before the player is evicted from memory
+}
+
+# Multi-process mode: worker processes on one host share players and combats through SQLite
+SHARED_STATE_CONFIG = {
+    "enabled": os.environ.get("SHARED_STATE", "0") == "1",  # requires PLAYER_STORAGE=sqlite
+    "lock_path": os.environ.get("SHARED_STATE_LOCK_PATH", "game_state.lock"),
+    "lock_slots": 4096,  # byte-range lock stripes shared by all processes
+    "tombstone_ttl": 600  # seconds an ended combat's row is kept for processes catching up
+}
+
+# Rate limit counters; point every worker at the same storage, e.g. sqlite:///data/rate_limits.sqlite or redis://localhost:6379
+RATE_LIMIT_CONFIG = {
+    "storage_uri": os.environ.get("RATE_LIMIT_STORAGE_URI", "memory://")
+}
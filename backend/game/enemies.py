@@ -1,5 +1,6 @@
 from typing import Dict, Any, List
-from game.config import ENEMY_STATS
+from game.config import ENEMY_STATS, LEGACY_ENEMY_WEIGHTS
+from game.sampler import legacy_enemy_sampler
 
 class EnemyManager:
     def __init__(self):
@@ -31,11 +32,11 @@ class EnemyManager:
     
     def get_spawn_weights(self) -> Dict[str, int]:
         """Get spawn weights for enemy types"""
-        return {
-            "class1": 70,  # Common enemies
-            "class2": 25,  # Uncommon enemies
-            "class3": 5    # Rare enemies
-        }
+        return dict(LEGACY_ENEMY_WEIGHTS)
+    
+    def choose_enemy_type(self, rng=None) -> str:
+        """Draw an enemy type with the spawn weights"""
+        return legacy_enemy_sampler.draw(rng)
 
 # Global enemy manager instance
 enemy_manager = EnemyManager()
@@ -0,0 +1,96 @@
+import math
+import threading
+from typing import Dict, Any, List, Optional, Tuple
+from game.config import ENEMY_INDEX_CONFIG
+from game.geo import METERS_PER_DEGREE_LAT, haversine_many
+from game.tiles import bounding_box
+
+def enemy_position(enemy: Dict[str, Any]) -> Optional[Tuple[float, float]]:
+    """Get an enemy's (lat, lon) from top-level fields or its AR location, if it has one"""
+    if 'lat' in enemy and 'lon' in enemy:
+        return enemy['lat'], enemy['lon']
+    location = enemy.get('location')
+    if location and 'lat' in location and 'lon' in location:
+        return location['lat'], location['lon']
+    return None
+
+class EnemySpatialIndex:
+    """Grid of every live enemy on the server, keyed by its combat owner.
+
+    Cells are cell_size meters north-south and the same number of degrees
+    east-west, so an area query only visits the cells its bounding box
+    overlaps and costs O(enemies nearby) instead of O(all combats).
+    """
+
+    def __init__(self, cell_size: float = None):
+        cell_size = cell_size if cell_size is not None else ENEMY_INDEX_CONFIG["cell_size"]
+        self.cell_degrees = cell_size / METERS_PER_DEGREE_LAT
+        self._cells: Dict[Tuple[int, int], Dict[str, Dict[str, Any]]] = {}  # cell -> owner_id -> enemy
+        self._owners: Dict[str, Tuple[int, int]] = {}  # owner_id -> cell
+        self._lock = threading.Lock()
+        self.queries = 0
+        self.enemies_scanned = 0
+
+    def _cell(self, lat: float, lon: float) -> Tuple[int, int]:
+        return math.floor(lat / self.cell_degrees), math.floor(lon / self.cell_degrees)
+
+    def add(self, owner_id: str, enemy: Dict[str, Any]):
+        """Index an owner's enemy, replacing any enemy it had before"""
+        position = enemy_position(enemy)
+        with self._lock:
+            self._remove(owner_id)
+            if position is None:
+                return  # manually spawned enemies have no place on the map
+            cell = self._cell(*position)
+            self._cells.setdefault(cell, {})[owner_id] = enemy
+            self._owners[owner_id] = cell
+
+    def remove(self, owner_id: str):
+        """Drop an owner's enemy from the index"""
+        with self._lock:
+            self._remove(owner_id)
+
+    def _remove(self, owner_id: str):
+        cell = self._owners.pop(owner_id, None)
+        if cell is None:
+            return
+        enemies = self._cells[cell]
+        del enemies[owner_id]
+        if not enemies:
+            del self._cells[cell]
+
+    def query(self, lat: float, lon: float, radius: float) -> List[Dict[str, Any]]:
+        """Get every live enemy within radius meters of a coordinate"""
+        bbox = bounding_box(lat, lon, radius)
+        south, west = self._cell(bbox['south'], bbox['west'])
+        north, east = self._cell(bbox['north'], bbox['east'])
+
+        with self._lock:
+            candidates = []
+            for lat_cell in range(south, north + 1):
+                for lon_cell in range(west, east + 1):
+                    candidates.extend(self._cells.get((lat_cell, lon_cell), {}).values())
+            self.queries += 1
+            self.enemies_scanned += len(candidates)
+
+        if not candidates:
+            return []
+        positions = [enemy_position(enemy) for enemy in candidates]
+        distances = haversine_many(lat, lon, [p[0] for p in positions], [p[1] for p in positions])
+        return [enemy for enemy, distance in zip(candidates, distances) if distance <= radius]
+
+    def stats(self) -> Dict[str, Any]:
+        """Get index size and query counters"""
+        with self._lock:
+            return {
+                "enemies": len(self._owners),
+                "cells": len(self._cells),
+                "queries": self.queries,
+                "avg_enemies_scanned": round(self.enemies_scanned / self.queries, 2) if self.queries else 0.0
+            }
+
+    def __len__(self) -> int:
+        return len(self._owners)
+
+# Global live enemy index instance
+enemy_index = EnemySpatialIndex()
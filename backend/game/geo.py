@@ -0,0 +1,69 @@
+"""Distances between GPS coordinates on a spherical Earth.
+
+``haversine`` is the scalar path for single pairs. ``haversine_many`` and
+``haversine_pairwise`` are the NumPy batch paths for one point against many
+and for every pair of two point sets; ``path_distances`` measures each
+segment of a trajectory.
+
+``equirectangular`` projects both points onto a plane at their mean latitude.
+For distances under 1 km it differs from haversine by less than 0.2 mm at
+latitudes up to ±85° (relative error below 2e-7), which is far below GPS
+noise; the error grows with the square of the distance. All of these functions
+assume a sphere, which differs from the WGS84 ellipsoid by up to 0.5%.
+"""
+import math
+from typing import Union
+import numpy as np
+
+EARTH_RADIUS = 6371000  # meters
+METERS_PER_DEGREE_LAT = 111320  # 1 degree latitude ≈ 111.32 km
+
+_RADIANS = math.pi / 180
+
+ArrayLike = Union[np.ndarray, list, tuple]
+
+def haversine(lat1: float, lon1: float, lat2: float, lon2: float) -> float:
+    """Calculate distance between two GPS coordinates in meters using Haversine formula"""
+    phi1 = lat1 * _RADIANS
+    phi2 = lat2 * _RADIANS
+    sin_dphi = math.sin((phi2 - phi1) / 2)
+    sin_dl = math.sin((lon2 - lon1) * _RADIANS / 2)
+    a = sin_dphi * sin_dphi + math.cos(phi1) * math.cos(phi2) * sin_dl * sin_dl
+    return 2 * EARTH_RADIUS * math.asin(math.sqrt(min(a, 1.0)))
+
+def _haversine_array(lat1: np.ndarray, lon1: np.ndarray, lat2: np.ndarray, lon2: np.ndarray) -> np.ndarray:
+    """Haversine on broadcastable arrays of degrees"""
+    phi1 = np.radians(lat1)
+    phi2 = np.radians(lat2)
+    a = np.sin((phi2 - phi1) / 2) ** 2 + np.cos(phi1) * np.cos(phi2) * np.sin(np.radians(lon2 - lon1) / 2) ** 2
+    return 2 * EARTH_RADIUS * np.arcsin(np.sqrt(np.minimum(a, 1.0)))
+
+def haversine_many(lat: float, lon: float, lats: ArrayLike, lons: ArrayLike) -> np.ndarray:
+    """Calculate distances in meters from one coordinate to many"""
+    return _haversine_array(lat, lon, np.asarray(lats, dtype=float), np.asarray(lons, dtype=float))
+
+def haversine_pairwise(lats1: ArrayLike, lons1: ArrayLike, lats2: ArrayLike, lons2: ArrayLike) -> np.ndarray:
+    """Calculate the (len(lats1), len(lats2)) matrix of distances in meters between two sets of coordinates"""
+    lats1 = np.asarray(lats1, dtype=float)[:, np.newaxis]
+    lons1 = np.asarray(lons1, dtype=float)[:, np.newaxis]
+    return _haversine_array(lats1, lons1, np.asarray(lats2, dtype=float), np.asarray(lons2, dtype=float))
+
+def path_distances(lats: ArrayLike, lons: ArrayLike) -> np.ndarray:
+    """Calculate the length in meters of each segment of a path of coordinates"""
+    lats = np.asarray(lats, dtype=float)
+    lons = np.asarray(lons, dtype=float)
+    return _haversine_array(lats[:-1], lons[:-1], lats[1:], lons[1:])
+
+def equirectangular(lat1: float, lon1: float, lat2: float, lon2: float) -> float:
+    """Approximate distance in meters for nearby coordinates (see module docstring for error bounds)"""
+    dl = (lon2 - lon1 + 180) % 360 - 180  # shortest way across the antimeridian
+    x = dl * math.cos((lat1 + lat2) / 2 * _RADIANS)
+    y = lat2 - lat1
+    return EARTH_RADIUS * _RADIANS * math.sqrt(x * x + y * y)
+
+def equirectangular_many(lat: float, lon: float, lats: ArrayLike, lons: ArrayLike) -> np.ndarray:
+    """Approximate distances in meters from one coordinate to many nearby ones"""
+    lats = np.asarray(lats, dtype=float)
+    dl = (np.asarray(lons, dtype=float) - lon + 180) % 360 - 180
+    x = dl * np.cos(np.radians((lats + lat) / 2))
+    return EARTH_RADIUS * _RADIANS * np.hypot(x, lats - lat)
@@ -0,0 +1,251 @@
+"""Precomputed spawn-probability heatmap.
+
+For every map tile of a region, the builder evaluates the live spawn formula
+(``calculate_spawn_probabilities`` and ``enemy_weights_for_poi``) on the
+tile's POIs for each player-level bracket and for day and night, and stores
+the results per POI. A spawn decision then needs no POI fetch: the POIs of
+the tiles covering the spawn radius are filtered by distance and rolled with
+the stored chances, exactly like the live path rolls fetched POIs. Run from
+the backend directory:
+
+    python -m game.heatmap build --db data/pois.sqlite --bbox 14.50,120.95,14.70,121.10 --out data/heatmap.npz
+    python -m game.heatmap inspect data/heatmap.npz --csv density.csv
+
+Point ``SPAWN_HEATMAP_PATH`` at the file and ``ARSpawningSystem`` answers
+spawns on covered tiles from it instead of fetching POIs.
+"""
+import argparse
+import csv
+import os
+import time
+from typing import Dict, Any, Callable, Iterable, List, Optional, Tuple
+import numpy as np
+from game.geo import haversine_many
+from game.tiles import latlon_to_tile, tile_bounds, tile_center, tiles_for_circle
+
+ENEMY_TYPES = ["class1", "class2", "class3"]
+LEVEL_BRACKETS = 6  # the spawn formula stops changing with level after level 6
+DAYTIME = (False, True)  # index 0 = night, 1 = day
+TYPE_SEPARATOR = "|"  # joins a POI's types into one string column
+
+class SpawnHeatmap:
+    """Per-POI spawn chances and enemy-type weights, grouped by tile.
+
+    The POIs of tile row r are rows tile_start[r]:tile_start[r + 1] of the
+    POI arrays. ``chance`` is indexed [poi, level bracket, daytime] and
+    ``enemy_cdf`` [poi, level bracket, enemy type] (cumulative weights).
+    """
+
+    def __init__(self, zoom: int, tiles: np.ndarray, tile_start: np.ndarray, chance: np.ndarray,
+                 enemy_cdf: np.ndarray, poi_lat: np.ndarray, poi_lon: np.ndarray, poi_name: np.ndarray,
+                 poi_types: np.ndarray, poi_source: np.ndarray, poi_rating: np.ndarray):
+        self.zoom = zoom
+        self.tiles = tiles
+        self.tile_start = tile_start
+        self.chance = chance
+        self.enemy_cdf = enemy_cdf
+        self.poi_lat = poi_lat
+        self.poi_lon = poi_lon
+        self.poi_name = poi_name
+        self.poi_types = poi_types
+        self.poi_source = poi_source
+        self.poi_rating = poi_rating
+        self.rows: Dict[Tuple[int, int], int] = {(int(x), int(y)): row for row, (x, y) in enumerate(tiles)}
+
+    def covers(self, lat: float, lon: float, radius: float) -> bool:
+        """Check if every tile within radius meters of a coordinate was precomputed"""
+        return all(tile in self.rows for tile in tiles_for_circle(lat, lon, radius, self.zoom))
+
+    def nearby(self, lat: float, lon: float, radius: float, max_pois: int) -> np.ndarray:
+        """Get the indexes of the max_pois nearest POIs within radius meters, nearest first"""
+        rows = [self.rows[tile] for tile in tiles_for_circle(lat, lon, radius, self.zoom)]
+        indexes = np.concatenate([np.arange(self.tile_start[row], self.tile_start[row + 1]) for row in rows])
+        if not indexes.size:
+            return indexes
+
+        distances = haversine_many(lat, lon, self.poi_lat[indexes], self.poi_lon[indexes])
+        within = np.flatnonzero(distances <= radius)
+        within = within[np.argsort(distances[within], kind='stable')]
+        return indexes[within[:max_pois]]
+
+    def roll(self, lat: float, lon: float, radius: float, max_pois: int, candidates: int, player_level: int,
+             daytime: bool, rng: np.random.Generator) -> Optional[Tuple[Dict[str, Any], str]]:
+        """Draw a spawn for a coordinate like the live path, returning (poi, enemy_type) or None.
+
+        The coordinate must be covered (see covers()).
+        """
+        pois = self.nearby(lat, lon, radius, max_pois)
+        if not pois.size:
+            return None
+
+        bracket = min(max(player_level, 1), LEVEL_BRACKETS) - 1
+        chances = self.chance[pois, bracket, int(daytime)]
+
+        # Roll the best candidates at once and spawn at the best one that succeeded
+        top = np.argsort(-chances, kind='stable')[:candidates]
+        successes = np.flatnonzero(rng.random(len(top)) <= chances[top])
+        if not successes.size:
+            return None
+
+        index = pois[top[successes[0]]]
+        enemy_cdf = self.enemy_cdf[index, bracket]
+        enemy_index = min(int(np.searchsorted(enemy_cdf, rng.random() * enemy_cdf[-1], side='right')), len(ENEMY_TYPES) - 1)
+        return self.poi(index), ENEMY_TYPES[enemy_index]
+
+    def poi(self, index: int) -> Dict[str, Any]:
+        """Rebuild the POI dict of a stored POI"""
+        poi = {
+            'name': str(self.poi_name[index]),
+            'lat': float(self.poi_lat[index]),
+            'lon': float(self.poi_lon[index]),
+            'types': str(self.poi_types[index]).split(TYPE_SEPARATOR) if self.poi_types[index] else [],
+            'source': str(self.poi_source[index])
+        }
+        if not np.isnan(self.poi_rating[index]):
+            poi['rating'] = float(self.poi_rating[index])
+        return poi
+
+    def spawn_chances(self, player_level: int = 1, daytime: bool = True, candidates: int = 5) -> np.ndarray:
+        """Get every tile's chance that one of its best candidates spawns, for a level and time of day"""
+        bracket = min(max(player_level, 1), LEVEL_BRACKETS) - 1
+        chances = np.zeros(len(self.tiles))
+        for row in range(len(self.tiles)):
+            tile_chances = np.sort(self.chance[self.tile_start[row]:self.tile_start[row + 1], bracket, int(daytime)])
+            chances[row] = 1 - np.prod(1 - tile_chances[::-1][:candidates])
+        return chances
+
+    def save(self, path: str):
+        """Write the heatmap to a compressed .npz file"""
+        np.savez_compressed(
+            path, zoom=self.zoom, tiles=self.tiles, tile_start=self.tile_start, chance=self.chance,
+            enemy_cdf=self.enemy_cdf, poi_lat=self.poi_lat, poi_lon=self.poi_lon, poi_name=self.poi_name,
+            poi_types=self.poi_types, poi_source=self.poi_source, poi_rating=self.poi_rating
+        )
+
+    @classmethod
+    def load(cls, path: str) -> "SpawnHeatmap":
+        """Read a heatmap written by save()"""
+        with np.load(path) as data:
+            if 'tile_start' not in data:
+                raise ValueError(f"Spawn heatmap {path} was built by an older version, rebuild it")
+            return cls(
+                int(data['zoom']), data['tiles'], data['tile_start'], data['chance'], data['enemy_cdf'],
+                data['poi_lat'], data['poi_lon'], data['poi_name'], data['poi_types'],
+                data['poi_source'], data['poi_rating']
+            )
+
+    def __len__(self) -> int:
+        return len(self.tiles)
+
+def region_tiles(bbox: Dict[str, float], zoom: int) -> List[Tuple[int, int]]:
+    """Get every tile overlapping a bounding box"""
+    x_min, y_min = latlon_to_tile(bbox['north'], bbox['west'], zoom)
+    x_max, y_max = latlon_to_tile(bbox['south'], bbox['east'], zoom)
+    return [(x, y) for x in range(x_min, x_max + 1) for y in range(y_min, y_max + 1)]
+
+def build_heatmap(spawning_system, tiles: Iterable[Tuple[int, int]], zoom: int,
+                  tile_pois: Callable[[int, int], List[Dict[str, Any]]]) -> SpawnHeatmap:
+    """Evaluate the spawn formula on the POIs of every tile"""
+    tiles = list(tiles)
+    tile_start = [0]
+    chance, enemy_cdf = [], []
+    poi_lat, poi_lon, poi_name, poi_types, poi_source, poi_rating = [], [], [], [], [], []
+
+    for x, y in tiles:
+        pois = tile_pois(x, y)
+        for poi in pois:
+            poi_lat.append(poi['lat'])
+            poi_lon.append(poi['lon'])
+            poi_name.append(poi['name'])
+            poi_types.append(TYPE_SEPARATOR.join(str(t) for t in poi.get('types', [])))
+            poi_source.append(poi.get('source', 'unknown'))
+            poi_rating.append(poi['rating'] if poi.get('rating') is not None else np.nan)
+        tile_start.append(len(poi_lat))
+        if not pois:
+            continue  # zero spawn chance
+
+        levels = range(1, LEVEL_BRACKETS + 1)
+        chance.append(np.stack([
+            np.stack([spawning_system.calculate_spawn_probabilities(pois, level, daytime=daytime) for daytime in DAYTIME], axis=1)
+            for level in levels
+        ], axis=1))
+        enemy_cdf.append(np.cumsum([[spawning_system.enemy_weights_for_poi(poi, level) for level in levels] for poi in pois], axis=2))
+
+    return SpawnHeatmap(
+        zoom,
+        np.array(tiles, dtype=np.int32).reshape(-1, 2),
+        np.array(tile_start, dtype=np.int64),
+        np.concatenate(chance).astype(np.float32) if chance else np.zeros((0, LEVEL_BRACKETS, len(DAYTIME)), dtype=np.float32),
+        np.concatenate(enemy_cdf).astype(np.float32) if enemy_cdf else np.zeros((0, LEVEL_BRACKETS, len(ENEMY_TYPES)), dtype=np.float32),
+        np.array(poi_lat, dtype=np.float64),
+        np.array(poi_lon, dtype=np.float64),
+        np.array(poi_name, dtype=str),
+        np.array(poi_types, dtype=str),
+        np.array(poi_source, dtype=str),
+        np.array(poi_rating, dtype=np.float64)
+    )
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Precompute and inspect spawn-probability heatmaps")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+
+    build_parser = subparsers.add_parser("build", help="Precompute a heatmap for a region")
+    build_parser.add_argument("--db", default=os.environ.get("POI_INDEX_PATH"),
+                              help="POI index built by game.poi_index (pseudo-POIs only if omitted)")
+    build_parser.add_argument("--bbox", required=True, help="Region as south,west,north,east")
+    build_parser.add_argument("--out", default=os.environ.get("SPAWN_HEATMAP_PATH", "heatmap.npz"))
+
+    inspect_parser = subparsers.add_parser("inspect", help="Summarize spawn density of a heatmap")
+    inspect_parser.add_argument("heatmap")
+    inspect_parser.add_argument("--csv", help="Also write per-tile spawn chances to a CSV file")
+
+    args = parser.parse_args(argv)
+
+    if args.command == "build":
+        from game.ar_spawning import ar_spawning_system
+        from game.poi_index import POIIndex
+
+        south, west, north, east = (float(value) for value in args.bbox.split(","))
+        zoom = ar_spawning_system.poi_cache.zoom
+        tiles = region_tiles({'south': south, 'west': west, 'north': north, 'east': east}, zoom)
+        index = POIIndex(args.db) if args.db else None
+
+        def tile_pois(x, y):
+            # Same sources as the live path: indexed OSM POIs, pseudo-POIs for empty tiles
+            bounds = tile_bounds(x, y, zoom)
+            pois = [ar_spawning_system._ingest_poi(poi) for poi in index.query_bbox(bounds)] if index else []
+            if not pois and ar_spawning_system.pseudo_pois.enabled:
+                pois = [ar_spawning_system._ingest_poi(poi) for poi in ar_spawning_system.pseudo_pois.tile_pois(x, y, zoom)]
+            return pois
+
+        start = time.time()
+        heatmap = build_heatmap(ar_spawning_system, tiles, zoom, tile_pois)
+        heatmap.save(args.out)
+        print(f"Built {len(heatmap)} tiles ({len(heatmap.poi_lat)} POIs) into {args.out} in {time.time() - start:.1f}s")
+
+    elif args.command == "inspect":
+        heatmap = SpawnHeatmap.load(args.heatmap)
+        print(f"{len(heatmap)} tiles, {len(heatmap.poi_lat)} POIs, zoom {heatmap.zoom}")
+        tile_chances = {(level, daytime): heatmap.spawn_chances(level, daytime)
+                        for level in range(1, LEVEL_BRACKETS + 1) for daytime in DAYTIME}
+        for level in range(1, LEVEL_BRACKETS + 1):
+            for daytime in DAYTIME:
+                chances = tile_chances[(level, daytime)]
+                print(f"level {level}{'+' if level == LEVEL_BRACKETS else ' '} {'day  ' if daytime else 'night'}: "
+                      f"mean {chances.mean():.3f}, p10 {np.percentile(chances, 10):.3f}, "
+                      f"p90 {np.percentile(chances, 90):.3f}, empty tiles {int((chances == 0).sum())}")
+
+        if args.csv:
+            with open(args.csv, "w", newline="") as f:
+                writer = csv.writer(f)
+                writer.writerow(["x", "y", "lat", "lon"] + [f"level{level}_{'day' if daytime else 'night'}"
+                                                            for level in range(1, LEVEL_BRACKETS + 1) for daytime in DAYTIME])
+                for row, (x, y) in enumerate(heatmap.tiles):
+                    lat, lon = tile_center(int(x), int(y), heatmap.zoom)
+                    writer.writerow([int(x), int(y), round(lat, 6), round(lon, 6)] +
+                                    [round(float(tile_chances[(level, daytime)][row]), 4)
+                                     for level in range(1, LEVEL_BRACKETS + 1) for daytime in DAYTIME])
+            print(f"Wrote per-tile spawn chances to {args.csv}")
+
+if __name__ == "__main__":
+    main()
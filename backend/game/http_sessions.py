@@ -0,0 +1,210 @@
+import random
+import threading
+import time
+from typing import Dict, Any, Optional
+import requests
+from requests.adapters import HTTPAdapter
+from game.config import POI_PROVIDER_CONFIG
+
+RETRY_STATUS_CODES = {429, 500, 502, 503, 504}
+
+def is_client_error(response: Optional[requests.Response]) -> bool:
+    """Check if a response is a non-retryable 4xx that says nothing about provider health"""
+    return response is not None and 400 <= response.status_code < 500 and response.status_code not in RETRY_STATUS_CODES
+
+class CircuitOpenError(Exception):
+    """Raised when a provider's circuit breaker is rejecting requests"""
+
+class CircuitBreaker:
+    """Stop calling a provider after repeated failures until a cool-down passes"""
+
+    def __init__(self, failure_threshold: int = 5, reset_timeout: float = 30):
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.consecutive_failures = 0
+        self.opened_at = None
+        self.trial_in_progress = False
+        self.times_opened = 0
+        self._lock = threading.Lock()
+
+    @property
+    def state(self) -> str:
+        """Get the breaker state: closed, open or half_open"""
+        if self.opened_at is None:
+            return "closed"
+        if time.time() - self.opened_at >= self.reset_timeout:
+            return "half_open"
+        return "open"
+
+    def allow_request(self) -> bool:
+        """Check if a request may be sent; half-open lets one trial through"""
+        with self._lock:
+            state = self.state
+            if state == "closed":
+                return True
+            if state == "half_open" and not self.trial_in_progress:
+                self.trial_in_progress = True
+                return True
+            return False
+
+    def record_success(self):
+        """Close the circuit after a successful request"""
+        with self._lock:
+            self.consecutive_failures = 0
+            self.opened_at = None
+            self.trial_in_progress = False
+
+    def record_failure(self):
+        """Count a failed request, opening the circuit past the threshold"""
+        with self._lock:
+            self.consecutive_failures += 1
+            if self.trial_in_progress or self.consecutive_failures >= self.failure_threshold:
+                if self.opened_at is None:
+                    self.times_opened += 1
+                self.opened_at = time.time()
+            self.trial_in_progress = False
+
+    def stats(self) -> Dict[str, Any]:
+        """Get breaker state and counters"""
+        with self._lock:
+            return {
+                "state": self.state,
+                "consecutive_failures": self.consecutive_failures,
+                "times_opened": self.times_opened
+            }
+
+class ProviderSession:
+    """Keep-alive HTTP session for one POI provider with bounded, jittered retries"""
+
+    def __init__(self, name: str, url: str, timeout: float = 10, pool_size: int = 4,
+                 max_retries: int = 2, backoff_base: float = 0.25, backoff_max: float = 2.0,
+                 breaker: Optional[CircuitBreaker] = None):
+        self.name = name
+        self.url = url
+        self.timeout = timeout
+        self.max_retries = max_retries
+        self.backoff_base = backoff_base
+        self.backoff_max = backoff_max
+        self.breaker = breaker or CircuitBreaker()
+
+        # Retries are handled in _get_with_retries() so the backoff can be jittered
+        adapter = HTTPAdapter(pool_connections=1, pool_maxsize=pool_size, max_retries=0)
+        self.session = requests.Session()
+        self.session.mount("http://", adapter)
+        self.session.mount("https://", adapter)
+
+        self._lock = threading.Lock()
+        self.requests_sent = 0
+        self.retries = 0
+        self.failures = 0
+        self.rejected = 0
+
+    def get(self, params: Optional[Dict[str, Any]] = None,
+            headers: Optional[Dict[str, str]] = None) -> requests.Response:
+        """Send a GET request to the provider endpoint, retrying transient errors"""
+        if not self.breaker.allow_request():
+            self._count("rejected")
+            raise CircuitOpenError(f"{self.name} circuit open after repeated failures")
+
+        try:
+            response = self._get_with_retries(params, headers)
+        except requests.HTTPError as e:
+            # A 4xx other than 429 is a problem with our request; the provider itself answered
+            if is_client_error(e.response):
+                self.breaker.record_success()
+            else:
+                self.breaker.record_failure()
+            raise
+        except Exception:
+            self.breaker.record_failure()
+            raise
+        self.breaker.record_success()
+        return response
+
+    def _get_with_retries(self, params: Optional[Dict[str, Any]],
+                          headers: Optional[Dict[str, str]]) -> requests.Response:
+        """Send the request, retrying connection errors, timeouts and 429/5xx"""
+        for attempt in range(self.max_retries + 1):
+            is_last_attempt = attempt == self.max_retries
+            self._count("requests_sent")
+            try:
+                response = self.session.get(self.url, params=params, headers=headers, timeout=self.timeout)
+            except (requests.ConnectionError, requests.Timeout):
+                if is_last_attempt:
+                    self._count("failures")
+                    raise
+                self._backoff(attempt)
+                continue
+
+            if response.status_code in RETRY_STATUS_CODES and not is_last_attempt:
+                self._backoff(attempt, response.headers.get("Retry-After"))
+                continue
+
+            try:
+                response.raise_for_status()
+            except requests.HTTPError:
+                self._count("failures")
+                raise
+            return response
+
+    def _backoff(self, attempt: int, retry_after: Optional[str] = None):
+        """Sleep before the next attempt using full-jitter exponential backoff"""
+        self._count("retries")
+        delay = random.uniform(0, min(self.backoff_max, self.backoff_base * 2 ** attempt))
+        if retry_after and retry_after.isdigit():
+            delay = min(self.backoff_max, max(delay, float(retry_after)))
+        time.sleep(delay)
+
+    def _count(self, counter: str):
+        with self._lock:
+            setattr(self, counter, getattr(self, counter) + 1)
+
+    def stats(self) -> Dict[str, Any]:
+        """Get request, retry and failure counters"""
+        with self._lock:
+            return {
+                "requests": self.requests_sent,
+                "retries": self.retries,
+                "failures": self.failures,
+                "rejected": self.rejected,
+                "breaker": self.breaker.stats()
+            }
+
+    def close(self):
+        """Close pooled connections"""
+        self.session.close()
+
+class HTTPSessionPool:
+    """One pooled ProviderSession per configured POI provider"""
+
+    def __init__(self, config: Dict[str, Any] = None):
+        config = config or POI_PROVIDER_CONFIG
+        self.sessions: Dict[str, ProviderSession] = {
+            name: ProviderSession(
+                name,
+                provider["url"],
+                timeout=provider["timeout"],
+                pool_size=provider["pool_size"],
+                max_retries=config["max_retries"],
+                backoff_base=config["backoff_base"],
+                backoff_max=config["backoff_max"],
+                breaker=CircuitBreaker(config["breaker_threshold"], config["breaker_reset_timeout"])
+            )
+            for name, provider in config["providers"].items()
+        }
+
+    def get(self, provider: str, params: Optional[Dict[str, Any]] = None,
+            headers: Optional[Dict[str, str]] = None) -> requests.Response:
+        """Send a GET request through a provider's pooled session"""
+        if provider not in self.sessions:
+            raise ValueError(f"Unknown POI provider: {provider}")
+        return self.sessions[provider].get(params=params, headers=headers)
+
+    def stats(self) -> Dict[str, Any]:
+        """Get counters for every provider session"""
+        return {name: session.stats() for name, session in self.sessions.items()}
+
+    def close(self):
+        """Close all pooled connections"""
+        for session in self.sessions.values():
+            session.close()
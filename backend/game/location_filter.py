@@ -0,0 +1,152 @@
+import math
+import threading
+import time
+from typing import Dict, Any, List, Optional, Tuple
+from game.config import LOCATION_FILTER_CONFIG
+from game.geo import METERS_PER_DEGREE_LAT, equirectangular
+
+# Client timestamps above this are milliseconds (watchPosition), below it seconds
+MILLISECONDS_THRESHOLD = 1e11
+
+# Fields of a player's filter state, see LocationFilter.states
+STATE_SIZE = 10
+
+def to_server_times(timestamps: List[float], received_at: float) -> List[float]:
+    """Map client fix timestamps, in seconds or milliseconds, onto the server clock.
+
+    Only the gaps between fixes are taken from the client: the newest fix is
+    placed at received_at, so these times mix with the server time.time()
+    used for single updates whatever the client's clock says.
+    """
+    seconds = [timestamp / 1000.0 if timestamp > MILLISECONDS_THRESHOLD else timestamp for timestamp in timestamps]
+    newest = max(seconds)
+    return [received_at - (newest - timestamp) for timestamp in seconds]
+
+def spread_times(count: int, received_at: float, interval: float) -> List[float]:
+    """Place fixes sent without timestamps interval seconds apart on the server clock, the newest at received_at"""
+    return [received_at - (count - 1 - index) * interval for index in range(count)]
+
+class LocationFilter:
+    """Per-player GPS smoother with a dead band.
+
+    Each fix is blended into a smoothed track by a constant-velocity Kalman
+    filter weighted by the fix's reported accuracy: the filter estimates the
+    player's walking velocity as well as their position, so a steady walk is
+    followed without lagging behind. A fix is only passed on to the spawn
+    logic once the smoothed position has moved out of a dead band around the
+    last position passed on (dead_band meters, or more while the position is
+    uncertain), so a stationary phone's jitter never reaches it.
+    """
+
+    def __init__(self, config: Dict[str, Any] = None):
+        config = config or LOCATION_FILTER_CONFIG
+        self.enabled = config["enabled"]
+        self.dead_band = config["dead_band"]
+        self.dead_band_sigmas = config["dead_band_sigmas"]
+        self.default_accuracy = config["default_accuracy"]
+        self.max_accuracy = config["max_accuracy"]
+        self.acceleration_noise = config["acceleration_noise"]
+        self.initial_speed = config["initial_speed"]
+        self.max_gap = config["max_gap"]
+
+        # player_id -> (lat, lon, east m/s, north m/s, position variance m², position-velocity covariance,
+        #               velocity variance, timestamp, accepted_lat, accepted_lon); east and north share one covariance
+        self.states: Dict[str, Tuple[float, ...]] = {}
+        self._lock = threading.Lock()
+
+        self.fixes = 0
+        self.accepted = 0
+        self.short_circuited = 0
+        self.inaccurate = 0
+
+    def filter(self, player_id: str, lat: float, lon: float, accuracy: Optional[float] = None,
+               timestamp: Optional[float] = None) -> Tuple[bool, float, float]:
+        """Smooth a fix, returning (accepted, lat, lon) with the smoothed position.
+
+        timestamp is on the server clock in seconds (see to_server_times).
+        """
+        if not self.enabled:
+            return True, lat, lon
+
+        accuracy = float(accuracy) if accuracy else self.default_accuracy
+        now = timestamp if timestamp is not None else time.time()
+
+        with self._lock:
+            self.fixes += 1
+            state = self.states.get(player_id)
+            if state is not None and len(state) != STATE_SIZE:
+                state = None  # stored by an older version of the filter
+
+            if accuracy > self.max_accuracy:
+                self.inaccurate += 1
+                # Without an accepted position yet, wait for a fix good enough to anchor on
+                return (False, state[-2], state[-1]) if state else (False, lat, lon)
+
+            noise = accuracy * accuracy
+            if state is None:
+                self.states[player_id] = self._start(lat, lon, noise) + (now, lat, lon)
+                self.accepted += 1
+                return True, lat, lon
+
+            smooth_lat, smooth_lon, east, north, p_pos, p_cross, p_vel, last_time, accepted_lat, accepted_lon = state
+            elapsed = max(now - last_time, 0.0)
+            if elapsed > self.max_gap:
+                # The old velocity says nothing about where the player went since, start a new track
+                smooth_lat, smooth_lon, east, north, p_pos, p_cross, p_vel = self._start(lat, lon, noise)
+            else:
+                # Predict: move along the estimated velocity, uncertainty grows with possible acceleration
+                meters_per_degree_lon = METERS_PER_DEGREE_LAT * math.cos(math.radians(smooth_lat))
+                smooth_lat += north * elapsed / METERS_PER_DEGREE_LAT
+                smooth_lon += east * elapsed / meters_per_degree_lon
+                q = self.acceleration_noise * self.acceleration_noise
+                p_pos += 2 * elapsed * p_cross + elapsed * elapsed * p_vel + q * elapsed ** 3 / 3
+                p_cross += elapsed * p_vel + q * elapsed * elapsed / 2
+                p_vel += q * elapsed
+
+                # Update: trust the fix in proportion to its accuracy
+                innovation = p_pos + noise
+                position_gain, velocity_gain = p_pos / innovation, p_cross / innovation
+                north_error = (lat - smooth_lat) * METERS_PER_DEGREE_LAT
+                east_error = (lon - smooth_lon) * meters_per_degree_lon
+                smooth_lat += position_gain * north_error / METERS_PER_DEGREE_LAT
+                smooth_lon += position_gain * east_error / meters_per_degree_lon
+                north += velocity_gain * north_error
+                east += velocity_gain * east_error
+                p_pos, p_cross, p_vel = p_pos * noise / innovation, p_cross * noise / innovation, p_vel - p_cross * velocity_gain
+
+            # Moves within the position's own uncertainty are noise, not walking
+            dead_band = max(self.dead_band, self.dead_band_sigmas * math.sqrt(p_pos))
+            if equirectangular(accepted_lat, accepted_lon, smooth_lat, smooth_lon) >= dead_band:
+                accepted_lat, accepted_lon = smooth_lat, smooth_lon
+            self.states[player_id] = (smooth_lat, smooth_lon, east, north, p_pos, p_cross, p_vel, now, accepted_lat, accepted_lon)
+
+            if (accepted_lat, accepted_lon) != (smooth_lat, smooth_lon):
+                self.short_circuited += 1
+                return False, accepted_lat, accepted_lon
+            self.accepted += 1
+            return True, smooth_lat, smooth_lon
+
+    def _start(self, lat: float, lon: float, noise: float) -> Tuple[float, ...]:
+        """Start a track at a fix: standing still, but possibly walking at initial_speed"""
+        return (lat, lon, 0.0, 0.0, noise, 0.0, self.initial_speed * self.initial_speed)
+
+    def forget(self, player_id: str):
+        """Drop a player's filter state"""
+        with self._lock:
+            self.states.pop(player_id, None)
+
+    def stats(self) -> Dict[str, Any]:
+        """Get how many fixes were passed on or short-circuited"""
+        with self._lock:
+            return {
+                "enabled": self.enabled,
+                "tracked_players": len(self.states),
+                "fixes": self.fixes,
+                "accepted": self.accepted,
+                "short_circuited": self.short_circuited,
+                "inaccurate": self.inaccurate,
+                "short_circuit_rate": round((self.short_circuited + self.inaccurate) / self.fixes, 3) if self.fixes else 0.0
+            }
+
+# Global location filter instance
+location_filter = LocationFilter()
@@ -0,0 +1,45 @@
+import functools
+import threading
+import weakref
+from typing import Any, Callable, Dict
+
+class PlayerLocks:
+    """One re-entrant lock per player, looked up through sharded tables.
+
+    Each player gets their own RLock, so requests for unrelated players never
+    wait on each other. The tables mapping player ids to locks are split into
+    shards with their own mutex, held only for the lookup. Locks are weakly
+    referenced and disappear once no thread is holding or waiting on them.
+    """
+
+    def __init__(self, shards: int = 64):
+        self.shards = shards
+        self._tables = [weakref.WeakValueDictionary() for _ in range(shards)]
+        self._guards = [threading.Lock() for _ in range(shards)]
+
+    def lock(self, player_id: str) -> threading.RLock:
+        """Get the lock of a player; use it as a context manager"""
+        shard = hash(player_id) % self.shards
+        with self._guards[shard]:
+            player_lock = self._tables[shard].get(player_id)
+            if player_lock is None:
+                player_lock = self._tables[shard][player_id] = threading.RLock()
+            return player_lock
+
+    def stats(self) -> Dict[str, Any]:
+        """Get how many player locks are alive"""
+        return {
+            "shards": self.shards,
+            "locks": sum(len(table) for table in self._tables)
+        }
+
+def player_locked(method: Callable) -> Callable:
+    """Run a method whose first argument is a player id under that player's lock"""
+    @functools.wraps(method)
+    def wrapper(self, player_id: str, *args, **kwargs):
+        with player_locks.lock(player_id):
+            return method(self, player_id, *args, **kwargs)
+    return wrapper
+
+# Global player lock manager instance
+player_locks = PlayerLocks()
@@ -1,17 +1,13 @@
-import math
 import random
 import time
 from typing import Dict, Any, Optional
 from game.config import ENEMY_STATS, SPAWN_DISTANCE_THRESHOLD, MIN_TRAVEL_DISTANCE, SPAWN_RATE
+from game.geo import haversine
+from game.sampler import legacy_enemy_sampler
 
 def calculate_distance(lat1: float, lon1: float, lat2: float, lon2: float) -> float:
     """Calculate distance between two GPS coordinates in meters using Haversine formula"""
-    R = 6371000  # Earth's radius in meters
-    phi1, phi2 = math.radians(lat1), math.radians(lat2)
-    dphi = math.radians(lat2 - lat1)
-    dl = math.radians(lon2 - lon1)
-    a = math.sin(dphi/2)**2 + math.cos(phi1)*math.cos(phi2)*math.sin(dl/2)**2
-    return 2*R*math.atan2(math.sqrt(a), math.sqrt(1-a))
+    return haversine(lat1, lon1, lat2, lon2)
 
 def check_enemy_spawn(player: Dict[str, Any], distance_traveled: float) -> Optional[Dict[str, Any]]:
     """Check if an enemy should spawn based on player movement (legacy system)"""
@@ -27,11 +23,12 @@ def check_enemy_spawn(player: Dict[str, Any], distance_traveled: float) -> Optio
     if random.random() > SPAWN_RATE:
         return None
     
+    return create_legacy_enemy()
+
+def create_legacy_enemy(location: Optional[Dict[str, float]] = None) -> Dict[str, Any]:
+    """Create an enemy with the legacy weighted probabilities, optionally placed at a location"""
     # Select enemy type based on weighted probabilities
-    enemy_type = random.choices(
-        ["class1", "class2", "class3"],
-        weights=[70, 25, 5]
-    )[0]
+    enemy_type = legacy_enemy_sampler.draw()
     
     # Create enemy instance
     enemy_stats = ENEMY_STATS[enemy_type]
@@ -44,11 +41,25 @@ def check_enemy_spawn(player: Dict[str, Any], distance_traveled: float) -> Optio
         "spawn_time": time.time(),
         "spawn_source": "legacy"
     }
+    if location:
+        enemy["lat"] = location["lat"]
+        enemy["lon"] = location["lon"]
     
     return enemy
 
 def check_ar_enemy_spawn(player: Dict[str, Any], distance_traveled: float) -> Optional[Dict[str, Any]]:
-    """Check if an enemy should spawn using AR POI-based system"""
+    """Check if an enemy should spawn using AR POI-based system.
+    
+    POI lookups run on the spawn task queue; this returns the enemy resolved
+    by an earlier call, if any, and queues a new lookup otherwise.
+    """
+    from game.spawn_tasks import spawn_task_queue
+    
+    # Deliver a spawn resolved in the background since the last call
+    enemy = spawn_task_queue.pop_result(player["id"], "ar_spawn")
+    if enemy:
+        return enemy
+    
     # Only consider spawn if player traveled minimum distance
     if distance_traveled < SPAWN_DISTANCE_THRESHOLD:
         return None
@@ -62,14 +73,19 @@ def check_ar_enemy_spawn(player: Dict[str, Any], distance_traveled: float) -> Op
     if not last_location:
         return None
     
+    # Its own kind: unlike resolve_poi_spawn, this lookup may resolve to no enemy
+    spawn_task_queue.submit(
+        player["id"], "ar_spawn", resolve_ar_enemy_spawn,
+        dict(player), distance_traveled, last_location['lat'], last_location['lon']
+    )
+    return None
+
+def resolve_ar_enemy_spawn(player: Dict[str, Any], distance_traveled: float, lat: float, lon: float) -> Optional[Dict[str, Any]]:
+    """Resolve an AR POI-based spawn, falling back to the legacy system (runs on a spawn worker)"""
     # Use AR spawning system
     try:
         from game.ar_spawning import ar_spawning_system
-        enemy = ar_spawning_system.find_best_spawn_location(
-            last_location[0], 
-            last_location[1], 
-            player["level"]
-        )
+        enemy = ar_spawning_system.find_best_spawn_location(lat, lon, player["level"])
         
         if enemy:
             return enemy
@@ -85,6 +101,40 @@ def check_ar_enemy_spawn(player: Dict[str, Any], distance_traveled: float) -> Op
     
     return None
 
+def resolve_poi_spawn(lat: float, lon: float, player_level: int, player_id: Optional[str] = None) -> Dict[str, Any]:
+    """Resolve a spawn for /update-location at the best nearby POI (runs on a spawn worker).
+    
+    A world enemy already living at a nearby POI is reused before any new
+    spawn is computed; a new POI enemy is placed in the world for others.
+    Falls back to a config-weighted enemy at the player's location when no
+    POI spawn succeeds, so an allowed spawn always produces an enemy.
+    """
+    from game.ar_spawning import ar_spawning_system
+    from game.config import SPAWN_CONFIG
+    from game.spawn import get_enemy_type_by_weight, spawn_enemy as spawn_config_enemy
+    from game.world_enemies import world_enemies
+    
+    for world_enemy in world_enemies.find_nearby(lat, lon, exclude_player=player_id):
+        enemy = world_enemies.engage(world_enemy['world_enemy_id'], player_id)
+        if enemy:
+            return enemy
+    
+    try:
+        enemy = ar_spawning_system.find_best_spawn_location(lat, lon, player_level)
+        if enemy:
+            world_enemy_id = world_enemies.register(enemy)
+            if world_enemy_id:
+                enemy = world_enemies.engage(world_enemy_id, player_id) or enemy
+                enemy["spawn_source"] = "ar_poi"
+            return enemy
+    except Exception as e:
+        print(f"AR spawning error: {e}")
+    
+    enemy_type = get_enemy_type_by_weight(SPAWN_CONFIG["enemy_weights"])
+    enemy = spawn_config_enemy(enemy_type, {'lat': lat, 'lon': lon})
+    enemy["spawn_source"] = "config"
+    return enemy
+
 def spawn_enemy(enemy_type: str) -> Dict[str, Any]:
     """Manually spawn an enemy of specified type"""
     if enemy_type not in ENEMY_STATS:
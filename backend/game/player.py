@@ -1,46 +1,268 @@
+import atexit
 import time
-from typing import Dict, Any, Optional
+from array import array
+from collections.abc import MutableMapping
+from typing import Dict, Any, Iterator, List, Optional
 from game.config import CHARACTERS, HEAL_COOLDOWN, HEAL_AMOUNT
+from game.locks import player_locked, player_locks
+from game.reaper import idle_reaper
+from game.storage import PlayerStore, WriteBehindWriter, create_player_store
+
+ENEMY_CLASSES = ("class1", "class2", "class3")
+_ENEMY_CLASS_INDEX = {enemy_class: index for index, enemy_class in enumerate(ENEMY_CLASSES)}
+
+class KillsView(MutableMapping):
+    """Dict-compatible view of a player's kill counts, stored as one array slot per enemy class"""
+
+    __slots__ = ("_counts",)
+
+    def __init__(self, counts: array):
+        self._counts = counts
+
+    def __getitem__(self, enemy_class: str) -> int:
+        return self._counts[_ENEMY_CLASS_INDEX[enemy_class]]
+
+    def __setitem__(self, enemy_class: str, count: int):
+        self._counts[_ENEMY_CLASS_INDEX[enemy_class]] = count
+
+    def __delitem__(self, enemy_class: str):
+        raise TypeError("Kill counts cannot be deleted")
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(ENEMY_CLASSES)
+
+    def __len__(self) -> int:
+        return len(ENEMY_CLASSES)
+
+    def __repr__(self) -> str:
+        return repr(dict(self))
+
+class Player:
+    """Slotted player record with dict-style access for existing callers.
+
+    ``player["level"]`` reads and writes attributes, ``player["kills"]`` is a
+    KillsView over an array indexed by enemy class, and the per-skill and
+    buff dicts are only created once something is stored in them.
+    """
+
+    __slots__ = (
+        "id", "character", "character_class", "current_hp", "max_hp", "xp", "level",
+        "skill_points", "_kills", "last_location", "distance_since_last_spawn",
+        "last_spawn_time", "last_heal", "_skill_cooldowns", "_skill_levels",
+        "_active_buffs", "pending_level_up", "created_at"
+    )
+
+    KEYS = (
+        "id", "character", "character_class", "current_hp", "max_hp", "xp", "level",
+        "skill_points", "kills", "last_location", "distance_since_last_spawn",
+        "last_spawn_time", "last_heal", "skill_cooldowns", "skill_levels",
+        "active_buffs", "pending_level_up", "created_at"
+    )
+
+    def __init__(self, player_id: str, character_class: str, character: Dict[str, Any]):
+        self.id = player_id
+        self.character = character
+        self.character_class = character_class
+        self.current_hp = character["hp"]
+        self.max_hp = character["hp"]
+        self.xp = 0
+        self.level = 1
+        self.skill_points = 0
+        self._kills = array("I", bytes(4 * len(ENEMY_CLASSES)))
+        self.last_location = None
+        self.distance_since_last_spawn = 0
+        self.last_spawn_time = None
+        self.last_heal = 0
+        self._skill_cooldowns = None
+        self._skill_levels = None  # skill_name -> level
+        self._active_buffs = None  # buff_name -> {end_time, value}
+        self.pending_level_up = False
+        self.created_at = time.time()
+
+    @property
+    def kills(self) -> KillsView:
+        return KillsView(self._kills)
+
+    @kills.setter
+    def kills(self, kills: Dict[str, int]):
+        for enemy_class in ENEMY_CLASSES:
+            self._kills[_ENEMY_CLASS_INDEX[enemy_class]] = kills.get(enemy_class, 0)
+
+    @property
+    def skill_cooldowns(self) -> Dict[str, float]:
+        if self._skill_cooldowns is None:
+            self._skill_cooldowns = {}
+        return self._skill_cooldowns
+
+    @skill_cooldowns.setter
+    def skill_cooldowns(self, value: Dict[str, float]):
+        self._skill_cooldowns = value
+
+    @property
+    def skill_levels(self) -> Dict[str, int]:
+        if self._skill_levels is None:
+            self._skill_levels = {}
+        return self._skill_levels
+
+    @skill_levels.setter
+    def skill_levels(self, value: Dict[str, int]):
+        self._skill_levels = value
+
+    @property
+    def active_buffs(self) -> Dict[str, Dict[str, float]]:
+        if self._active_buffs is None:
+            self._active_buffs = {}
+        return self._active_buffs
+
+    @active_buffs.setter
+    def active_buffs(self, value: Dict[str, Dict[str, float]]):
+        self._active_buffs = value
+
+    def __getitem__(self, key: str) -> Any:
+        if key not in self.KEYS:
+            raise KeyError(key)
+        return getattr(self, key)
+
+    def __setitem__(self, key: str, value: Any):
+        if key not in self.KEYS:
+            raise KeyError(key)
+        setattr(self, key, value)
+
+    def __contains__(self, key: str) -> bool:
+        return key in self.KEYS
+
+    def get(self, key: str, default: Any = None) -> Any:
+        return getattr(self, key) if key in self.KEYS else default
+
+    def keys(self):
+        return self.KEYS
+
+    def to_dict(self) -> Dict[str, Any]:
+        """Get the player as the plain dict create_player used to build"""
+        player = {key: getattr(self, key) for key in self.KEYS}
+        player["kills"] = dict(player["kills"])
+        # Copies, so a background writer never iterates a dict a request is changing
+        player["skill_cooldowns"] = dict(player["skill_cooldowns"])
+        player["skill_levels"] = dict(player["skill_levels"])
+        player["active_buffs"] = {name: dict(buff) for name, buff in list(player["active_buffs"].items())}
+        return player
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> "Player":
+        """Rebuild a player from to_dict() output"""
+        player = cls.__new__(cls)
+        player._kills = array("I", bytes(4 * len(ENEMY_CLASSES)))
+        for key in cls.KEYS:
+            setattr(player, key, data[key])
+        return player
 
 class PlayerManager:
-    def __init__(self):
-        self.players: Dict[str, Dict[str, Any]] = {}
+    def __init__(self, store: PlayerStore = None):
+        self.store = store or create_player_store()
+        self.players: Dict[str, Player] = {
+            player_id: Player.from_dict(record) for player_id, record in self.store.load_all().items()
+        }
+        self.writer = WriteBehindWriter(self.store, self._snapshot)
+        self._spilled: Dict[str, Dict[str, Any]] = {}  # evicted players waiting for flush_spilled
+        self.shared = False  # the store is written through by other processes too (see game.shared_state)
+        for player_id in self.players:
+            idle_reaper.touch(player_id)
     
-    def create_player(self, player_id: str, character_class: str) -> Dict[str, Any]:
+    def _snapshot(self, player_id: str) -> Optional[Dict[str, Any]]:
+        """Get the record of a player to write, if they still exist"""
+        # Under the player's lock, so a request is never halfway through changing the record
+        with player_locks.lock(player_id):
+            player = self.players.get(player_id)
+            return player.to_dict() if player else None
+    
+    def mark_dirty(self, player_id: str):
+        """Schedule a changed player for the next batched write"""
+        # A memory store would only hold a second copy of the loaded players, and shared sessions write through
+        if self.store.persistent and not self.shared:
+            self.writer.mark_dirty(player_id)
+    
+    def flush(self) -> int:
+        """Write every changed player now"""
+        return self.writer.flush()
+    
+    @player_locked
+    def create_player(self, player_id: str, character_class: str) -> Player:
         """Create a new player with the selected character class"""
         if character_class not in CHARACTERS:
             raise ValueError(f"Invalid character class: {character_class}")
         
-        character_stats = CHARACTERS[character_class]
-        
-        player = {
-            "id": player_id,
-            "character": character_stats,
-            "character_class": character_class,
-            "current_hp": character_stats["hp"],
-            "max_hp": character_stats["hp"],
-            "xp": 0,
-            "level": 1,
-            "skill_points": 0,
-            "kills": {"class1": 0, "class2": 0, "class3": 0},
-            "last_location": None,
-            "distance_since_last_spawn": 0,
-            "last_spawn_time": None,
-            "last_heal": 0,
-            "skill_cooldowns": {},
-            "skill_levels": {},  # skill_name -> level
-            "active_buffs": {},  # buff_name -> {end_time, value}
-            "pending_level_up": False,
-            "created_at": time.time()
-        }
+        player = Player(player_id, character_class, CHARACTERS[character_class])
         
         self.players[player_id] = player
+        if self.shared:
+            # A new player may have no session around them yet (select-character without a player_id)
+            self.store.save_many([(player_id, player.to_dict())])
+        self.mark_dirty(player_id)
+        idle_reaper.touch(player_id)
+        return player
+    
+    def get_player(self, player_id: str) -> Optional[Player]:
+        """Get player data by ID, reloading a player spilled to storage"""
+        player = self.players.get(player_id)
+        if player is None:
+            record = self._spilled.pop(player_id, None) or self.store.load(player_id)
+            if record is not None:
+                player = self.players.setdefault(player_id, Player.from_dict(record))
+                if not self.store.persistent:
+                    # The memory store only holds evicted players, never a second copy of loaded ones
+                    self.store.delete(player_id)
+        if player is not None:
+            idle_reaper.touch(player_id)
         return player
     
-    def get_player(self, player_id: str) -> Optional[Dict[str, Any]]:
-        """Get player data by ID"""
-        return self.players.get(player_id)
+    def reload(self, player_id: str) -> Optional[Player]:
+        """Replace the in-memory copy of a player with the stored record"""
+        record = self.store.load(player_id)
+        if record is None:
+            self.players.pop(player_id, None)
+            return None
+        player = self.players[player_id] = Player.from_dict(record)
+        return player
+    
+    def all_players(self) -> List[Player]:
+        """Get every player, including evicted ones and those only in the shared store"""
+        if self.shared:
+            return [Player.from_dict(record) for record in self.store.load_all().values()]
+        players = list(self.players.values())
+        stored = self.store.load_all()
+        stored.update(self._spilled)
+        players.extend(Player.from_dict(record) for player_id, record in stored.items() if player_id not in self.players)
+        return players
+    
+    @player_locked
+    def evict(self, player_id: str) -> bool:
+        """Drop an idle player from memory, returning False if they were not loaded.
+        
+        The player is kept as a record until flush_spilled writes it to the
+        store (a MemoryPlayerStore too), so evicting many players costs one
+        write and the player comes back on their next request.
+        """
+        player = self.players.get(player_id)
+        if player is None:
+            return False
+        if not self.shared:  # a shared store already has every change, and maybe newer ones from other processes
+            self._spilled[player_id] = player.to_dict()
+        del self.players[player_id]
+        return True
+    
+    def flush_spilled(self) -> int:
+        """Write every evicted player to the store in one batch"""
+        spilled = dict(self._spilled)
+        if not spilled:
+            return 0
+        self.store.save_many(list(spilled.items()))
+        for player_id, record in spilled.items():
+            # Players reloaded meanwhile already left _spilled
+            if self._spilled.get(player_id) is record:
+                del self._spilled[player_id]
+        return len(spilled)
     
+    @player_locked
     def update_location(self, player_id: str, lat: float, lon: float) -> Dict[str, Any]:
         """Update player location and track distance"""
         player = self.get_player(player_id)
@@ -48,21 +270,23 @@ class PlayerManager:
             raise ValueError(f"Player {player_id} not found")
         
         last_location = player["last_location"]
-        player["last_location"] = (lat, lon)
+        player["last_location"] = {'lat': lat, 'lon': lon}
         
         distance_traveled = 0
         if last_location:
             from .movement import calculate_distance
             distance_traveled = calculate_distance(
-                last_location[0], last_location[1], lat, lon
+                last_location['lat'], last_location['lon'], lat, lon
             )
             player["distance_since_last_spawn"] += distance_traveled
+        self.mark_dirty(player_id)
         
         return {
             "player": player,
             "distance_traveled": distance_traveled
         }
     
+    @player_locked
     def heal_player(self, player_id: str) -> Dict[str, Any]:
         """Heal player without cooldown check"""
         player = self.get_player(player_id)
@@ -77,6 +301,7 @@ class PlayerManager:
             }
         
         player["current_hp"] += heal_amount
+        self.mark_dirty(player_id)
         
         return {
             "success": True,
@@ -85,6 +310,7 @@ class PlayerManager:
             "max_hp": player["max_hp"]
         }
     
+    @player_locked
     def add_xp(self, player_id: str, xp_amount: int) -> Dict[str, Any]:
         """Add XP and handle level ups"""
         player = self.get_player(player_id)
@@ -101,6 +327,7 @@ class PlayerManager:
         if leveled_up:
             player["pending_level_up"] = True
             player["skill_points"] += 1  # Grant skill point on level up
+        self.mark_dirty(player_id)
         
         return {
             "xp_gained": xp_amount,
@@ -111,6 +338,7 @@ class PlayerManager:
             "skill_points": player["skill_points"]
         }
     
+    @player_locked
     def upgrade_skill(self, player_id: str, skill_name: str) -> Dict[str, Any]:
         """Upgrade a skill using skill points"""
         from .config import SKILLS, SKILL_UPGRADES
@@ -154,6 +382,7 @@ class PlayerManager:
         # Upgrade the skill
         player["skill_levels"][skill_name] = current_level + 1
         player["skill_points"] -= 1
+        self.mark_dirty(player_id)
         
         return {
             "success": True,
@@ -162,6 +391,7 @@ class PlayerManager:
             "skill_points_remaining": player["skill_points"]
         }
     
+    @player_locked
     def apply_level_up_reward(self, player_id: str, reward_type: str) -> Dict[str, Any]:
         """Apply level up reward (heal or confirm level up)"""
         from .config import LEVEL_UP_REWARDS
@@ -201,6 +431,7 @@ class PlayerManager:
         
         # Clear pending level up
         player["pending_level_up"] = False
+        self.mark_dirty(player_id)
         
         return result
     
@@ -238,6 +469,7 @@ class PlayerManager:
         
         return base_skill
     
+    @player_locked
     def add_active_buff(self, player_id: str, buff_name: str, value: float, duration: int):
         """Add an active buff to player"""
         player = self.get_player(player_id)
@@ -247,6 +479,7 @@ class PlayerManager:
                 "end_time": time.time() + duration
             }
     
+    @player_locked
     def get_active_buffs(self, player_id: str) -> Dict[str, Any]:
         """Get and clean expired buffs"""
         player = self.get_player(player_id)
@@ -256,7 +489,7 @@ class PlayerManager:
         current_time = time.time()
         active_buffs = {}
         
-        for buff_name, buff_data in player["active_buffs"].items():
+        for buff_name, buff_data in list(player["active_buffs"].items()):
             if current_time < buff_data["end_time"]:
                 active_buffs[buff_name] = buff_data
             else:
@@ -265,13 +498,16 @@ class PlayerManager:
         
         return active_buffs
     
+    @player_locked
     def reset_spawn_tracking(self, player_id: str):
         """Reset spawn tracking after enemy spawn"""
         player = self.get_player(player_id)
         if player:
             player["distance_since_last_spawn"] = 0
             player["last_spawn_time"] = time.time()
+            self.mark_dirty(player_id)
     
+    @player_locked
     def update_skill_cooldown(self, player_id: str, skill_name: str, cooldown: int):
         """Update skill cooldown"""
         player = self.get_player(player_id)
@@ -290,3 +526,5 @@ class PlayerManager:
 
 # Global player manager instance
 player_manager = PlayerManager()
+# Write pending changes on a clean shutdown
+atexit.register(player_manager.flush)
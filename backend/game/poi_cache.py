@@ -0,0 +1,256 @@
+import heapq
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, Any, List, Callable, Tuple
+import numpy as np
+from game.config import POI_CACHE_CONFIG
+from game.geo import haversine_many
+from game.tiles import tiles_for_circle, tile_bounds
+
+class _Call:
+    """An in-flight fetch that concurrent callers can wait on"""
+
+    def __init__(self):
+        self.done = threading.Event()
+        self.result = None
+        self.error = None
+
+class SingleFlight:
+    """Coalesce concurrent calls for the same key into one execution"""
+
+    def __init__(self):
+        self._calls: Dict[Any, _Call] = {}
+        self._lock = threading.Lock()
+        self.executed = 0
+        self.coalesced = 0
+
+    def do(self, key: Any, fn: Callable[[], Any]) -> Any:
+        """Run fn for key, or wait for the result of a call already in flight"""
+        with self._lock:
+            call = self._calls.get(key)
+            is_leader = call is None
+            if is_leader:
+                call = self._calls[key] = _Call()
+                self.executed += 1
+            else:
+                self.coalesced += 1
+
+        if not is_leader:
+            call.done.wait()
+            if call.error:
+                raise call.error
+            return call.result
+
+        try:
+            call.result = fn()
+            return call.result
+        except Exception as e:
+            call.error = e
+            raise
+        finally:
+            with self._lock:
+                del self._calls[key]
+            call.done.set()
+
+    def is_running(self, key: Any) -> bool:
+        """Check if a call for key is currently running"""
+        with self._lock:
+            return key in self._calls
+
+    def in_flight(self) -> int:
+        """Get the number of calls currently running"""
+        with self._lock:
+            return len(self._calls)
+
+class TilePOICache:
+    """POI cache keyed by slippy-map tile with bounded LRU eviction.
+
+    Each entry holds every POI of one source inside one tile, so nearby GPS
+    fixes share the same entries instead of keying on raw coordinates.
+    Expired tiles are served stale while a background refresh runs, and
+    failed or empty fetches are remembered for a short negative TTL.
+    """
+
+    def __init__(self, zoom: int = None, max_entries: int = None, ttl: float = None,
+                 stale_ttl: float = None, negative_ttl: float = None):
+        self.zoom = zoom if zoom is not None else POI_CACHE_CONFIG["tile_zoom"]
+        self.max_entries = max_entries if max_entries is not None else POI_CACHE_CONFIG["max_entries"]
+        self.ttl = ttl if ttl is not None else POI_CACHE_CONFIG["ttl"]
+        self.stale_ttl = stale_ttl if stale_ttl is not None else POI_CACHE_CONFIG["stale_ttl"]
+        self.negative_ttl = negative_ttl if negative_ttl is not None else POI_CACHE_CONFIG["negative_ttl"]
+
+        # key -> (pois, fetched_at, is_negative)
+        self._entries: "OrderedDict[Tuple, Tuple[List[Dict[str, Any]], float, bool]]" = OrderedDict()
+        # (time the entry can no longer be served, key, fetched_at) - stale rows are skipped on purge
+        self._expiry: List[Tuple[float, Tuple, float]] = []
+        self._lock = threading.Lock()
+        self.flights = SingleFlight()
+        self._refresh_executor = ThreadPoolExecutor(
+            max_workers=POI_CACHE_CONFIG["refresh_workers"],
+            thread_name_prefix="poi-refresh"
+        )
+
+        self.hits = 0
+        self.misses = 0
+        self.stale_hits = 0
+        self.negative_hits = 0
+        self.fetch_errors = 0
+        self.evictions = 0
+        self.purged = 0
+
+    def _is_fresh(self, entry: Tuple[List[Dict[str, Any]], float, bool], now: float) -> bool:
+        """Check if an entry can be served without refetching"""
+        _, fetched_at, is_negative = entry
+        return now - fetched_at < (self.negative_ttl if is_negative else self.ttl)
+
+    def _is_servable_stale(self, entry: Tuple[List[Dict[str, Any]], float, bool], now: float) -> bool:
+        """Check if an expired entry can still be served while it refreshes"""
+        _, fetched_at, is_negative = entry
+        return not is_negative and now - fetched_at < self.ttl + self.stale_ttl
+
+    def is_cached(self, source: str, x: int, y: int) -> bool:
+        """Check if a tile is cached and fresh"""
+        with self._lock:
+            entry = self._entries.get((source, self.zoom, x, y))
+            return entry is not None and self._is_fresh(entry, time.time())
+
+    def get_tile(self, source: str, x: int, y: int,
+                 fetch_tile: Callable[[Dict[str, float]], List[Dict[str, Any]]]) -> List[Dict[str, Any]]:
+        """Get all POIs of a source inside a tile, fetching them on a miss"""
+        key = (source, self.zoom, x, y)
+        now = time.time()
+
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry and self._is_fresh(entry, now):
+                self._entries.move_to_end(key)
+                self.hits += 1
+                if entry[2]:
+                    self.negative_hits += 1
+                return entry[0]
+            if entry and self._is_servable_stale(entry, now):
+                self._entries.move_to_end(key)
+                self.stale_hits += 1
+                is_stale = True
+            else:
+                self.misses += 1
+                is_stale = False
+
+        if is_stale:
+            self._refresh_in_background(source, x, y, fetch_tile)
+            return entry[0]
+
+        # Fetch outside the lock so slow providers don't block other tiles, and
+        # let concurrent misses for the same tile wait on the first fetch
+        return self.flights.do(key, lambda: self._fetch_tile(source, x, y, fetch_tile))
+
+    def _refresh_in_background(self, source: str, x: int, y: int,
+                               fetch_tile: Callable[[Dict[str, float]], List[Dict[str, Any]]]):
+        """Refetch a stale tile without blocking the caller"""
+        key = (source, self.zoom, x, y)
+        if self.flights.is_running(key):
+            return
+
+        def refresh():
+            try:
+                self.flights.do(key, lambda: self._fetch_tile(source, x, y, fetch_tile))
+            except Exception as e:
+                print(f"POI tile refresh error ({source} {x}/{y}): {e}")
+
+        self._refresh_executor.submit(refresh)
+
+    def _fetch_tile(self, source: str, x: int, y: int,
+                    fetch_tile: Callable[[Dict[str, float]], List[Dict[str, Any]]]) -> List[Dict[str, Any]]:
+        """Fetch and store a tile unless another caller stored it since our miss"""
+        key = (source, self.zoom, x, y)
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry and self._is_fresh(entry, time.time()):
+                return entry[0]
+
+        try:
+            pois = fetch_tile(tile_bounds(x, y, self.zoom))
+        except Exception:
+            with self._lock:
+                self.fetch_errors += 1
+                # Keep serving a stale copy over remembering the failure
+                keep_stale = entry is not None and self._is_servable_stale(entry, time.time())
+            if not keep_stale:
+                self.put_tile(source, x, y, [], is_negative=True)
+            raise
+
+        self.put_tile(source, x, y, pois, is_negative=not pois)
+        return pois
+
+    def put_tile(self, source: str, x: int, y: int, pois: List[Dict[str, Any]], is_negative: bool = False):
+        """Store the POIs of a tile, evicting the least recently used tiles"""
+        key = (source, self.zoom, x, y)
+        now = time.time()
+        with self._lock:
+            self._entries[key] = (pois, now, is_negative)
+            self._entries.move_to_end(key)
+            heapq.heappush(self._expiry, (now + (self.negative_ttl if is_negative else self.ttl + self.stale_ttl), key, now))
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+
+    def get_pois(self, source: str, lat: float, lon: float, radius: float,
+                 fetch_tile: Callable[[Dict[str, float]], List[Dict[str, Any]]]) -> List[Dict[str, Any]]:
+        """Get POIs of a source within radius meters, sorted by distance"""
+        candidates = []
+        for x, y in tiles_for_circle(lat, lon, radius, self.zoom):
+            candidates.extend(self.get_tile(source, x, y, fetch_tile))
+        if not candidates:
+            return []
+
+        distances = haversine_many(lat, lon, [poi['lat'] for poi in candidates], [poi['lon'] for poi in candidates])
+        nearby = np.flatnonzero(distances <= radius)
+        nearby = nearby[np.argsort(distances[nearby], kind='stable')]
+        return [candidates[index] for index in nearby]
+
+    def purge_expired(self, now: float = None) -> int:
+        """Drop tiles that can no longer be served, returning how many were dropped"""
+        now = now if now is not None else time.time()
+        purged = 0
+        with self._lock:
+            while self._expiry and self._expiry[0][0] <= now:
+                _, key, fetched_at = heapq.heappop(self._expiry)
+                entry = self._entries.get(key)
+                if entry is not None and entry[1] == fetched_at:
+                    del self._entries[key]
+                    purged += 1
+            # Rows of tiles that were refetched or evicted since are skipped above
+            self.purged += purged
+        return purged
+
+    def clear(self):
+        """Drop all cached tiles"""
+        with self._lock:
+            self._entries.clear()
+            self._expiry.clear()
+
+    def stats(self) -> Dict[str, Any]:
+        """Get cache size and hit/miss counters"""
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "entries": len(self._entries),
+                "max_entries": self.max_entries,
+                "tile_zoom": self.zoom,
+                "hits": self.hits,
+                "misses": self.misses,
+                "stale_hits": self.stale_hits,
+                "negative_hits": self.negative_hits,
+                "fetch_errors": self.fetch_errors,
+                "evictions": self.evictions,
+                "purged": self.purged,
+                "fetches": self.flights.executed,
+                "coalesced": self.flights.coalesced,
+                "in_flight": self.flights.in_flight(),
+                "hit_rate": round(self.hits / lookups, 3) if lookups else 0.0
+            }
+
+    def __len__(self) -> int:
+        return len(self._entries)
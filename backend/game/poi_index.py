@@ -0,0 +1,177 @@
+"""Offline POI index built from a local OpenStreetMap extract.
+
+Build an index from an Overpass JSON dump or an .osm.pbf extract (needs the
+optional ``osmium`` package), run from the backend directory:
+
+    python -m game.poi_index import city.osm.pbf --db data/pois.sqlite
+
+Point ``POI_INDEX_PATH`` at the database and ``ARSpawningSystem`` answers
+OpenStreetMap lookups from it instead of the public Overpass endpoint.
+"""
+import argparse
+import json
+import os
+import re
+import sqlite3
+import threading
+import time
+from typing import Dict, Any, List, Iterable, Iterator, Tuple
+
+# Same tag filters as the Overpass query in ARSpawningSystem._fetch_osm_tile
+SPAWN_TAG_PATTERNS = {
+    'tourism': re.compile('attraction|museum|art_gallery'),
+    'amenity': re.compile('restaurant|cafe|fast_food'),
+    'shop': re.compile(''),
+    'leisure': re.compile('park|playground'),
+    'historic': re.compile('')
+}
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS pois (
+    id INTEGER PRIMARY KEY,  -- OSM node id
+    name TEXT NOT NULL,
+    lat REAL NOT NULL,
+    lon REAL NOT NULL,
+    types TEXT NOT NULL,
+    tags TEXT NOT NULL
+);
+CREATE VIRTUAL TABLE IF NOT EXISTS poi_rtree USING rtree(id, min_lat, max_lat, min_lon, max_lon);
+"""
+
+def is_spawn_poi(tags: Dict[str, str]) -> bool:
+    """Check if an OSM node's tags make it a spawn point"""
+    return any(key in tags and pattern.search(tags[key]) for key, pattern in SPAWN_TAG_PATTERNS.items())
+
+def node_to_poi(osm_id: Any, lat: float, lon: float, tags: Dict[str, str]) -> Dict[str, Any]:
+    """Convert an OSM node into the POI dict shape used by ARSpawningSystem"""
+    return {
+        'name': tags.get('name', 'Unknown Location'),
+        'lat': lat,
+        'lon': lon,
+        'types': [key for key in tags.keys() if key in SPAWN_TAG_PATTERNS],
+        'rating': 0,  # OSM doesn't provide ratings
+        'place_id': str(osm_id),
+        'source': 'osm',
+        'tags': tags
+    }
+
+def read_overpass_json(path: str) -> Iterator[Tuple[Any, float, float, Dict[str, str]]]:
+    """Yield (id, lat, lon, tags) for every node in an Overpass JSON dump"""
+    with open(path, encoding='utf-8') as f:
+        data = json.load(f)
+    for element in data.get('elements', []):
+        if element.get('type') == 'node' and 'lat' in element:
+            yield element['id'], element['lat'], element['lon'], element.get('tags', {})
+
+def read_osm_pbf(path: str) -> Iterator[Tuple[Any, float, float, Dict[str, str]]]:
+    """Yield (id, lat, lon, tags) for every tagged node in an .osm.pbf extract"""
+    try:
+        import osmium
+    except ImportError:
+        raise RuntimeError("Importing .osm.pbf extracts requires the 'osmium' package (pip install osmium)")
+
+    for node in osmium.FileProcessor(path, osmium.osm.NODE):
+        if node.tags and node.location.valid():
+            yield node.id, node.location.lat, node.location.lon, {tag.k: tag.v for tag in node.tags}
+
+class POIIndex:
+    """SQLite R*Tree index of OpenStreetMap POIs"""
+
+    def __init__(self, db_path: str):
+        self.db_path = db_path
+        self._local = threading.local()
+
+    def _connection(self) -> sqlite3.Connection:
+        """Get this thread's connection to the index"""
+        conn = getattr(self._local, 'conn', None)
+        if conn is None:
+            conn = sqlite3.connect(self.db_path)
+            conn.executescript(SCHEMA)
+            self._local.conn = conn
+        return conn
+
+    def import_nodes(self, nodes: Iterable[Tuple[Any, float, float, Dict[str, str]]], batch_size: int = 10000) -> int:
+        """Add spawn-point nodes to the index, replacing ones already present"""
+        conn = self._connection()
+        imported = 0
+        batch = []
+
+        def flush():
+            with conn:
+                for osm_id, lat, lon, tags in batch:
+                    poi = node_to_poi(osm_id, lat, lon, tags)
+                    conn.execute(
+                        "INSERT OR REPLACE INTO pois (id, name, lat, lon, types, tags) VALUES (?, ?, ?, ?, ?, ?)",
+                        (int(osm_id), poi['name'], lat, lon, json.dumps(poi['types']), json.dumps(tags))
+                    )
+                    conn.execute(
+                        "INSERT OR REPLACE INTO poi_rtree (id, min_lat, max_lat, min_lon, max_lon) VALUES (?, ?, ?, ?, ?)",
+                        (int(osm_id), lat, lat, lon, lon)
+                    )
+            batch.clear()
+
+        for osm_id, lat, lon, tags in nodes:
+            if not is_spawn_poi(tags):
+                continue
+            batch.append((osm_id, lat, lon, tags))
+            imported += 1
+            if len(batch) >= batch_size:
+                flush()
+        flush()
+        return imported
+
+    def import_file(self, path: str) -> int:
+        """Import an Overpass JSON dump or .osm.pbf extract"""
+        if path.endswith('.pbf'):
+            return self.import_nodes(read_osm_pbf(path))
+        return self.import_nodes(read_overpass_json(path))
+
+    def query_bbox(self, bbox: Dict[str, float]) -> List[Dict[str, Any]]:
+        """Get all POIs inside a bounding box (north/east edges exclusive)"""
+        # The R*Tree stores 32-bit floats, so it only narrows the search;
+        # exact bounds are checked against the full-precision columns
+        rows = self._connection().execute(
+            "SELECT p.id, p.name, p.lat, p.lon, p.types, p.tags FROM poi_rtree r "
+            "JOIN pois p ON p.id = r.id "
+            "WHERE r.max_lat >= :south AND r.min_lat <= :north AND r.max_lon >= :west AND r.min_lon <= :east "
+            "AND p.lat >= :south AND p.lat < :north AND p.lon >= :west AND p.lon < :east",
+            bbox
+        ).fetchall()
+
+        return [
+            {
+                'name': name,
+                'lat': lat,
+                'lon': lon,
+                'types': json.loads(types),
+                'rating': 0,
+                'place_id': str(osm_id),
+                'source': 'osm',
+                'tags': json.loads(tags)
+            }
+            for osm_id, name, lat, lon, types, tags in rows
+        ]
+
+    def count(self) -> int:
+        """Get the number of indexed POIs"""
+        return self._connection().execute("SELECT COUNT(*) FROM pois").fetchone()[0]
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Build an offline POI index from an OpenStreetMap extract")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+
+    import_parser = subparsers.add_parser("import", help="Import an .osm.pbf extract or Overpass JSON dump")
+    import_parser.add_argument("extract", help="Path to the .osm.pbf or Overpass JSON file")
+    import_parser.add_argument("--db", default=os.environ.get("POI_INDEX_PATH", "pois.sqlite"),
+                               help="Index database to create or update")
+
+    args = parser.parse_args(argv)
+
+    if args.command == "import":
+        index = POIIndex(args.db)
+        start = time.time()
+        imported = index.import_file(args.extract)
+        print(f"Imported {imported} POIs into {args.db} in {time.time() - start:.1f}s ({index.count()} total)")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,68 @@
+from enum import Enum
+from typing import Dict, Any, NamedTuple, Tuple
+
+class POICategory(str, Enum):
+    TOURISM = "tourism"
+    PARK = "park"
+    COMMERCIAL = "commercial"
+    OTHER = "other"
+
+# Spawn probability bonus per category
+TYPE_BONUS = {
+    POICategory.TOURISM: 0.3,  # Tourist attractions are great spawn points
+    POICategory.PARK: 0.2,  # Parks are good spawn points
+    POICategory.COMMERCIAL: 0.1,  # Commercial areas are okay
+    POICategory.OTHER: 0.0
+}
+
+# Enemy weights (class1, class2, class3) per category
+ENEMY_WEIGHTS = {
+    POICategory.TOURISM: (60, 30, 10),  # Tourist areas - more variety, including rare enemies
+    POICategory.PARK: (70, 25, 5),  # Parks - balanced spawn
+    POICategory.COMMERCIAL: (80, 18, 2),  # Commercial areas - more common enemies
+    POICategory.OTHER: (70, 25, 5)  # Default weights
+}
+
+class POIProfile(NamedTuple):
+    """Spawn-relevant facts about a POI, computed once when it is fetched"""
+    category: POICategory  # drives the spawn probability bonus
+    enemy_category: POICategory  # drives enemy type weights
+    type_bonus: float
+    rating_bonus: float
+    enemy_weights: Tuple[int, int, int]
+
+def _classify(type_names: Tuple[str, ...], tourism_keywords: Tuple[str, ...]) -> POICategory:
+    """Pick the first matching category for lowercased POI type names"""
+    if any(keyword in name for name in type_names for keyword in tourism_keywords):
+        return POICategory.TOURISM
+    if any('park' in name or 'leisure' in name for name in type_names):
+        return POICategory.PARK
+    if any('restaurant' in name or 'shop' in name for name in type_names):
+        return POICategory.COMMERCIAL
+    return POICategory.OTHER
+
+def classify_poi(poi: Dict[str, Any]) -> POIProfile:
+    """Build the spawn profile of a POI from its types and rating"""
+    type_names = tuple(str(t).lower() for t in poi.get('types', []))
+
+    # Spawn chance treats attractions as tourism; enemy selection treats museums as tourism
+    category = _classify(type_names, ('tourism', 'attraction'))
+    enemy_category = _classify(type_names, ('tourism', 'museum'))
+
+    rating = poi.get('rating', 0) or 0
+    rating_bonus = min(rating / 5.0 * 0.2, 0.2)  # Max 20% bonus for 5-star places
+
+    return POIProfile(
+        category=category,
+        enemy_category=enemy_category,
+        type_bonus=TYPE_BONUS[category],
+        rating_bonus=rating_bonus,
+        enemy_weights=ENEMY_WEIGHTS[enemy_category]
+    )
+
+def get_profile(poi: Dict[str, Any]) -> POIProfile:
+    """Get a POI's precomputed profile, classifying POIs that bypassed ingest"""
+    profile = poi.get('profile')
+    if profile is None:
+        profile = classify_poi(poi)
+    return profile
@@ -0,0 +1,154 @@
+import math
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, Any, List, Optional, Tuple
+from game.ar_spawning import ar_spawning_system
+from game.config import PREFETCH_CONFIG
+from game.geo import METERS_PER_DEGREE_LAT
+from game.tiles import tiles_for_circle
+
+class POIPrefetcher:
+    """Warm POI tiles along each player's heading before they get there"""
+
+    def __init__(self, spawning_system, config: Dict[str, Any] = None):
+        config = config or PREFETCH_CONFIG
+        self.spawning_system = spawning_system
+        self.enabled = config["enabled"]
+        self.horizon = config["horizon"]
+        self.step = config["step"]
+        self.min_speed = config["min_speed"]
+        self.max_speed = config["max_speed"]
+        self.max_fix_gap = config["max_fix_gap"]
+
+        # Global budget shared by all players: a token bucket of tile fetches
+        self.tiles_per_second = config["tiles_per_second"]
+        self.burst = config["burst"]
+        self._tokens = float(self.burst)
+        self._tokens_updated = time.time()
+
+        # player_id -> (lat, lon, timestamp, velocity_north, velocity_east) in m/s
+        self.tracks: Dict[str, Tuple[float, float, float, float, float]] = {}
+        self._scheduled = set()
+        self._lock = threading.Lock()
+        self._executor = ThreadPoolExecutor(max_workers=config["workers"], thread_name_prefix="poi-prefetch")
+
+        self.tiles_scheduled = 0
+        self.tiles_already_cached = 0
+        self.tiles_over_budget = 0
+
+    def observe(self, player_id: str, lat: float, lon: float, timestamp: Optional[float] = None):
+        """Record a location fix and prefetch the tiles ahead of the player"""
+        if not self.enabled:
+            return
+
+        now = timestamp if timestamp is not None else time.time()
+        velocity = self._update_track(player_id, lat, lon, now)
+        if velocity is None:
+            return
+
+        for x, y in self._tiles_ahead(lat, lon, *velocity):
+            self._schedule(x, y)
+
+    def _update_track(self, player_id: str, lat: float, lon: float, now: float) -> Optional[Tuple[float, float]]:
+        """Update a player's smoothed velocity, returning it if the player is walking"""
+        with self._lock:
+            previous = self.tracks.get(player_id)
+            self.tracks[player_id] = (lat, lon, now, 0.0, 0.0)
+            if not previous:
+                return None
+
+            prev_lat, prev_lon, prev_time, prev_v_north, prev_v_east = previous
+            elapsed = now - prev_time
+            if elapsed <= 0 or elapsed > self.max_fix_gap:
+                return None
+
+            v_north = (lat - prev_lat) * METERS_PER_DEGREE_LAT / elapsed
+            v_east = (lon - prev_lon) * METERS_PER_DEGREE_LAT * math.cos(math.radians(lat)) / elapsed
+            speed = math.hypot(v_north, v_east)
+            if speed > self.max_speed:
+                return None  # GPS jump, not real movement
+
+            # Smooth the heading over consecutive fixes
+            v_north = (v_north + prev_v_north) / 2
+            v_east = (v_east + prev_v_east) / 2
+            self.tracks[player_id] = (lat, lon, now, v_north, v_east)
+
+            if math.hypot(v_north, v_east) < self.min_speed:
+                return None
+            return v_north, v_east
+
+    def _tiles_ahead(self, lat: float, lon: float, v_north: float, v_east: float) -> List[Tuple[int, int]]:
+        """Get the tiles covering the spawn radius along the projected path, nearest first"""
+        radius = self.spawning_system.spawn_radius
+        zoom = self.spawning_system.poi_cache.zoom
+        lon_scale = METERS_PER_DEGREE_LAT * math.cos(math.radians(lat))
+
+        tiles = []
+        seen = set()
+        seconds = self.step
+        while seconds <= self.horizon:
+            ahead_lat = lat + v_north * seconds / METERS_PER_DEGREE_LAT
+            ahead_lon = lon + v_east * seconds / lon_scale
+            for tile in tiles_for_circle(ahead_lat, ahead_lon, radius, zoom):
+                if tile not in seen:
+                    seen.add(tile)
+                    tiles.append(tile)
+            seconds += self.step
+        return tiles
+
+    def _take_token(self) -> bool:
+        """Spend one tile fetch from the global prefetch budget"""
+        now = time.time()
+        self._tokens = min(self.burst, self._tokens + (now - self._tokens_updated) * self.tiles_per_second)
+        self._tokens_updated = now
+        if self._tokens < 1:
+            return False
+        self._tokens -= 1
+        return True
+
+    def _schedule(self, x: int, y: int):
+        """Queue a background warm-up of a tile unless it is cached or over budget"""
+        if self.spawning_system.is_tile_cached(x, y):
+            with self._lock:
+                self.tiles_already_cached += 1
+            return
+
+        with self._lock:
+            if (x, y) in self._scheduled:
+                return
+            if not self._take_token():
+                self.tiles_over_budget += 1
+                return
+            self._scheduled.add((x, y))
+            self.tiles_scheduled += 1
+
+        self._executor.submit(self._warm, x, y)
+
+    def _warm(self, x: int, y: int):
+        """Fetch a tile into the POI cache"""
+        try:
+            self.spawning_system.warm_tile(x, y)
+        finally:
+            with self._lock:
+                self._scheduled.discard((x, y))
+
+    def forget(self, player_id: str):
+        """Drop a player's movement track"""
+        with self._lock:
+            self.tracks.pop(player_id, None)
+
+    def stats(self) -> Dict[str, Any]:
+        """Get prefetch counters"""
+        with self._lock:
+            return {
+                "enabled": self.enabled,
+                "tracked_players": len(self.tracks),
+                "tiles_scheduled": self.tiles_scheduled,
+                "tiles_in_flight": len(self._scheduled),
+                "tiles_already_cached": self.tiles_already_cached,
+                "tiles_over_budget": self.tiles_over_budget
+            }
+
+# Global POI prefetcher instance
+poi_prefetcher = POIPrefetcher(ar_spawning_system)
@@ -0,0 +1,66 @@
+import hashlib
+from typing import Dict, Any, List
+from game.config import PSEUDO_POI_CONFIG
+from game.tiles import latlon_to_tile, tile_bounds
+
+# (name, types) of generated POIs; types are picked up by classify_poi like real POI types
+PSEUDO_POI_KINDS = [
+    ("Ancient Shrine", ["tourism", "attraction"]),
+    ("Old Museum", ["tourism", "museum"]),
+    ("Overgrown Grove", ["leisure", "park"]),
+    ("Abandoned Market", ["shop"]),
+    ("Roadside Eatery", ["amenity", "restaurant"]),
+    ("Weathered Marker", ["historic"])
+]
+
+DIGEST_SIZE = 32
+POI_BYTES = 6  # 2 bytes latitude, 2 bytes longitude, 1 byte kind, 1 byte rating
+MAX_POIS_PER_TILE = (DIGEST_SIZE - 1) // POI_BYTES  # first byte picks the count
+
+class PseudoPOIGenerator:
+    """Derive deterministic pseudo-POIs for a map tile from a hash of the tile and a world seed.
+
+    Every process with the same seed produces the same POIs for a tile, with
+    no network access or shared state, so they can stand in for real POIs
+    when no provider is configured or reachable.
+    """
+
+    def __init__(self, config: Dict[str, Any] = None):
+        config = config or PSEUDO_POI_CONFIG
+        self.enabled = config["enabled"]
+        self.key = hashlib.blake2b(str(config["world_seed"]).encode(), digest_size=DIGEST_SIZE).digest()
+        self.min_per_tile = config["min_per_tile"]
+        self.max_per_tile = min(config["max_per_tile"], MAX_POIS_PER_TILE)
+
+    def tile_pois(self, x: int, y: int, zoom: int) -> List[Dict[str, Any]]:
+        """Generate the pseudo-POIs of a tile"""
+        digest = hashlib.blake2b(f"{zoom}/{x}/{y}".encode(), key=self.key, digest_size=DIGEST_SIZE).digest()
+        bounds = tile_bounds(x, y, zoom)
+        lat_span = bounds['north'] - bounds['south']
+        lon_span = bounds['east'] - bounds['west']
+
+        count = self.min_per_tile + digest[0] % (self.max_per_tile - self.min_per_tile + 1)
+        pois = []
+        for i in range(count):
+            offset = 1 + i * POI_BYTES
+            lat_fraction = int.from_bytes(digest[offset:offset + 2], 'big') / 65536
+            lon_fraction = int.from_bytes(digest[offset + 2:offset + 4], 'big') / 65536
+            name, types = PSEUDO_POI_KINDS[digest[offset + 4] % len(PSEUDO_POI_KINDS)]
+
+            pois.append({
+                'name': name,
+                'lat': bounds['south'] + lat_fraction * lat_span,
+                'lon': bounds['west'] + lon_fraction * lon_span,
+                'types': list(types),
+                'rating': 3.0 + (digest[offset + 5] % 21) / 10,  # 3.0 - 5.0
+                'place_id': f"procedural/{zoom}/{x}/{y}/{i}",
+                'source': 'procedural'
+            })
+        return pois
+
+    def bounds_pois(self, bounds: Dict[str, float], zoom: int) -> List[Dict[str, Any]]:
+        """Generate the pseudo-POIs of the tile with the given bounds"""
+        center_lat = (bounds['south'] + bounds['north']) / 2
+        center_lon = (bounds['west'] + bounds['east']) / 2
+        x, y = latlon_to_tile(center_lat, center_lon, zoom)
+        return self.tile_pois(x, y, zoom)
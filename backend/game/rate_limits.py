@@ -0,0 +1,97 @@
+"""Rate-limit counters in a SQLite file, shared by every worker process on one host.
+
+Importing this module registers the ``sqlite://`` scheme with the ``limits``
+package used by Flask-Limiter, so a worker pool can share counters without an
+external server:
+
+    RATE_LIMIT_STORAGE_URI=sqlite:///data/rate_limits.sqlite   (absolute path)
+    RATE_LIMIT_STORAGE_URI=sqlite://rate_limits.sqlite         (relative path)
+
+Only the fixed-window strategy (Flask-Limiter's default) is supported.
+"""
+import sqlite3
+import threading
+import time
+from typing import Optional, Tuple, Type
+from limits.storage import Storage
+
+class SQLiteRateLimitStorage(Storage):
+    """Fixed-window counters in one SQLite table, updated with a single atomic upsert per hit"""
+
+    STORAGE_SCHEME = ["sqlite"]
+
+    def __init__(self, uri: str, wrap_exceptions: bool = False, purge_every: int = 1000, **options):
+        super().__init__(uri, wrap_exceptions=wrap_exceptions, **options)
+        self.path = uri[len("sqlite://"):]
+        if not self.path:
+            raise ValueError(f"Rate limit storage URI needs a file path: {uri}")
+        self.purge_every = purge_every
+        self._conn = sqlite3.connect(self.path, check_same_thread=False, timeout=30)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS rate_limits (key TEXT PRIMARY KEY, count INTEGER NOT NULL, expires_at REAL NOT NULL)"
+        )
+        self._conn.commit()
+        self._lock = threading.Lock()
+        self._hits = 0
+
+    @property
+    def base_exceptions(self) -> Type[Exception]:
+        return sqlite3.Error
+
+    def incr(self, key: str, expiry: float, amount: int = 1, elastic_expiry: bool = False) -> int:
+        """Add to a counter, starting a new window if the old one expired, and return the new count"""
+        now = time.time()
+        with self._lock, self._conn:
+            # One statement, so concurrent workers never lose a hit or both start a window
+            count = self._conn.execute(
+                "INSERT INTO rate_limits (key, count, expires_at) VALUES (?, ?, ?) "
+                "ON CONFLICT(key) DO UPDATE SET "
+                "count = CASE WHEN expires_at <= ? THEN excluded.count ELSE count + excluded.count END, "
+                "expires_at = CASE WHEN expires_at <= ? OR ? THEN excluded.expires_at ELSE expires_at END "
+                "RETURNING count",
+                (key, amount, now + expiry, now, now, elastic_expiry)
+            ).fetchone()[0]
+
+            self._hits += 1
+            if self._hits % self.purge_every == 0:
+                self._conn.execute("DELETE FROM rate_limits WHERE expires_at <= ?", (now,))
+        return count
+
+    def _window(self, key: str) -> Optional[Tuple[int, float]]:
+        """Get (count, expires_at) of a counter's current window, if it has one"""
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT count, expires_at FROM rate_limits WHERE key = ? AND expires_at > ?", (key, time.time())
+            ).fetchone()
+        return row
+
+    def get(self, key: str) -> int:
+        """Get a counter's value in its current window"""
+        window = self._window(key)
+        return window[0] if window else 0
+
+    def get_expiry(self, key: str) -> float:
+        """Get when a counter's current window ends"""
+        window = self._window(key)
+        return window[1] if window else time.time()
+
+    def check(self) -> bool:
+        """Check that the database answers"""
+        try:
+            with self._lock:
+                self._conn.execute("SELECT 1").fetchone()
+            return True
+        except sqlite3.Error:
+            return False
+
+    def reset(self) -> Optional[int]:
+        """Drop every counter, returning how many were dropped"""
+        with self._lock, self._conn:
+            return self._conn.execute("DELETE FROM rate_limits").rowcount
+
+    def clear(self, key: str) -> None:
+        """Drop one counter"""
+        with self._lock, self._conn:
+            self._conn.execute("DELETE FROM rate_limits WHERE key = ?", (key,))
@@ -0,0 +1,192 @@
+import heapq
+import threading
+import time
+from typing import Dict, Any, Callable, List, Optional, Set, Tuple
+from game.config import REAPER_CONFIG
+from game.locks import player_locks
+
+class IdleReaper:
+    """Background reaper for idle players, abandoned combats and expired caches.
+
+    touch() only records when a player was last active, with a plain dict
+    write; the reaper's lock is taken only to schedule a player it is not
+    tracking yet, so requests for unrelated players never contend on it.
+    Each player and each combat has one deadline in a min-heap; when a
+    deadline comes up the reaper checks last_seen and either reaps the entry
+    or pushes a new deadline, so a run costs O(expired + touched) instead of
+    a full scan.
+    """
+
+    def __init__(self, config: Dict[str, Any] = None):
+        config = config or REAPER_CONFIG
+        self.enabled = config["enabled"]
+        self.interval = config["interval"]
+        self.combat_ttl = config["combat_ttl"]
+        self.player_ttl = config["player_ttl"]
+
+        self.last_seen: Dict[str, float] = {}
+        self._player_deadlines: List[Tuple[float, str]] = []
+        self._combat_deadlines: List[Tuple[float, str]] = []
+        self._scheduled_players: Set[str] = set()
+        self._scheduled_combats: Set[str] = set()
+        self._lock = threading.Lock()
+        self._thread = None
+
+        self.runs = 0
+        self.players_evicted = 0
+        self.players_spilled = 0
+        self.combats_ended = 0
+        self.cache_entries_purged = 0
+        self.world_enemies_despawned = 0
+        self.results_dropped = 0
+        self.last_run_ms = 0.0
+
+    def start(self):
+        """Start the background reaper thread"""
+        with self._lock:
+            if self._thread is None and self.enabled:
+                self._thread = threading.Thread(target=self._run, name="idle-reaper", daemon=True)
+                self._thread.start()
+
+    def touch(self, player_id: str, now: Optional[float] = None):
+        """Record player activity"""
+        if self._thread is None and self.enabled:
+            self.start()
+        now = now if now is not None else time.time()
+        # Atomic under the GIL; a reap that misses it re-checks last_seen under the player's lock
+        self.last_seen[player_id] = now
+        if player_id not in self._scheduled_players:
+            with self._lock:
+                if player_id not in self._scheduled_players:
+                    self._scheduled_players.add(player_id)
+                    heapq.heappush(self._player_deadlines, (now + self.player_ttl, player_id))
+
+    def watch_combat(self, player_id: str, now: Optional[float] = None):
+        """Schedule a started combat for the abandoned-combat check"""
+        now = now if now is not None else time.time()
+        with self._lock:
+            self.last_seen.setdefault(player_id, now)
+            if player_id not in self._scheduled_combats:
+                self._scheduled_combats.add(player_id)
+                heapq.heappush(self._combat_deadlines, (self.last_seen[player_id] + self.combat_ttl, player_id))
+
+    def _pop_idle(self, deadlines: List[Tuple[float, str]], scheduled: Set[str], ttl: float, now: float,
+                  is_live: Callable[[str], bool]) -> List[str]:
+        """Pop the live entries whose deadline passed, rescheduling those active since"""
+        idle = []
+        with self._lock:
+            while deadlines and deadlines[0][0] <= now:
+                _, player_id = heapq.heappop(deadlines)
+                last_seen = self.last_seen.get(player_id, 0)
+                if not is_live(player_id):
+                    scheduled.discard(player_id)  # already gone, e.g. a combat that ended normally
+                elif last_seen + ttl > now:
+                    heapq.heappush(deadlines, (last_seen + ttl, player_id))
+                else:
+                    scheduled.discard(player_id)
+                    idle.append(player_id)
+        return idle
+
+    def _became_active(self, player_id: str, deadlines: List[Tuple[float, str]], scheduled: Set[str],
+                       ttl: float, now: float) -> bool:
+        """Reschedule a popped player who made a request before we got their lock"""
+        with self._lock:
+            last_seen = self.last_seen.get(player_id, 0)
+            if last_seen + ttl <= now:
+                return False
+            if player_id not in scheduled:
+                scheduled.add(player_id)
+                heapq.heappush(deadlines, (last_seen + ttl, player_id))
+            return True
+
+    def _run(self):
+        while True:
+            time.sleep(self.interval)
+            try:
+                self.reap()
+            except Exception as e:
+                print(f"❌ Reaper error: {e}")
+
+    def reap(self, now: Optional[float] = None) -> Dict[str, int]:
+        """Reap everything idle or expired at now, returning what was reclaimed"""
+        from game.ar_spawning import ar_spawning_system
+        from game.combat import combat_system
+        from game.location_filter import location_filter
+        from game.player import player_manager
+        from game.prefetch import poi_prefetcher
+        from game.shared_state import shared_state
+        from game.spawn_tasks import spawn_task_queue
+        from game.world_enemies import world_enemies
+
+        start = time.time()
+        now = now if now is not None else start
+        reclaimed = {"combats_ended": 0, "players_evicted": 0, "players_spilled": 0, "results_dropped": 0}
+
+        # With shared state this process only sees part of a player's activity; the store is swept below instead
+        live_combat = (lambda player_id: False) if player_manager.shared else combat_system.active_combats.__contains__
+        for player_id in self._pop_idle(self._combat_deadlines, self._scheduled_combats, self.combat_ttl, now,
+                                        live_combat):
+            with player_locks.lock(player_id):
+                if self._became_active(player_id, self._combat_deadlines, self._scheduled_combats, self.combat_ttl, now):
+                    continue
+                combat_system.end_combat(player_id)
+                reclaimed["combats_ended"] += 1
+        if player_manager.shared:
+            reclaimed["combats_ended"] += shared_state.end_idle_combats(now, self.combat_ttl)
+            shared_state.purge(now)
+
+        for player_id in self._pop_idle(self._player_deadlines, self._scheduled_players, self.player_ttl, now,
+                                        player_manager.players.__contains__):
+            # Hold the player's lock so no request is using them while they are evicted
+            with player_locks.lock(player_id):
+                if self._became_active(player_id, self._player_deadlines, self._scheduled_players, self.player_ttl, now):
+                    continue
+                with self._lock:
+                    self.last_seen.pop(player_id, None)
+                if combat_system.get_combat(player_id):
+                    combat_system.end_combat(player_id)
+                    reclaimed["combats_ended"] += 1
+                location_filter.forget(player_id)
+                poi_prefetcher.forget(player_id)
+                reclaimed["results_dropped"] += spawn_task_queue.forget(player_id)
+                if player_manager.evict(player_id):
+                    reclaimed["players_evicted" if player_manager.shared else "players_spilled"] += 1
+
+        player_manager.flush_spilled()
+
+        # Results of lookups nobody polls again, e.g. /test-ar-spawn calls without a player_id
+        reclaimed["results_dropped"] += spawn_task_queue.purge_expired(now)
+
+        reclaimed["cache_entries_purged"] = ar_spawning_system.poi_cache.purge_expired(now)
+        reclaimed["world_enemies_despawned"] = world_enemies.purge_expired(now)
+
+        with self._lock:
+            self.runs += 1
+            self.combats_ended += reclaimed["combats_ended"]
+            self.players_evicted += reclaimed["players_evicted"]
+            self.players_spilled += reclaimed["players_spilled"]
+            self.results_dropped += reclaimed["results_dropped"]
+            self.cache_entries_purged += reclaimed["cache_entries_purged"]
+            self.world_enemies_despawned += reclaimed["world_enemies_despawned"]
+            self.last_run_ms = (time.time() - start) * 1000
+        return reclaimed
+
+    def stats(self) -> Dict[str, Any]:
+        """Get tracked sessions and totals reclaimed so far"""
+        with self._lock:
+            return {
+                "enabled": self.enabled,
+                "tracked_players": len(self._scheduled_players),
+                "tracked_combats": len(self._scheduled_combats),
+                "runs": self.runs,
+                "last_run_ms": round(self.last_run_ms, 2),
+                "players_evicted": self.players_evicted,
+                "players_spilled": self.players_spilled,
+                "combats_ended": self.combats_ended,
+                "results_dropped": self.results_dropped,
+                "cache_entries_purged": self.cache_entries_purged,
+                "world_enemies_despawned": self.world_enemies_despawned
+            }
+
+# Global idle reaper instance
+idle_reaper = IdleReaper()
@@ -0,0 +1,80 @@
+import functools
+import random
+from typing import Dict, Any, Optional, Sequence, Tuple, Union
+import numpy as np
+from game.config import LEGACY_ENEMY_WEIGHTS, SPAWN_CONFIG
+
+ENEMY_TYPES = ("class1", "class2", "class3")
+
+class AliasSampler:
+    """Weighted sampler using Walker's alias method (Vose's construction).
+
+    Building the table is O(n) and happens once per weight table; every draw
+    afterwards is O(1) - one uniform number picks a column and decides
+    between its own outcome and its alias.
+    """
+
+    def __init__(self, outcomes: Sequence[Any], weights: Sequence[float]):
+        if len(outcomes) != len(weights) or not outcomes:
+            raise ValueError("Sampler needs one weight per outcome")
+        if any(weight < 0 for weight in weights) or sum(weights) <= 0:
+            raise ValueError(f"Invalid sampler weights: {list(weights)}")
+
+        self.outcomes = tuple(outcomes)
+        count = len(weights)
+        total = float(sum(weights))
+        scaled = [weight * count / total for weight in weights]
+
+        self.prob = [1.0] * count
+        self.alias = list(range(count))
+        small = [i for i, value in enumerate(scaled) if value < 1.0]
+        large = [i for i, value in enumerate(scaled) if value >= 1.0]
+        while small and large:
+            less, more = small.pop(), large.pop()
+            self.prob[less] = scaled[less]
+            self.alias[less] = more
+            scaled[more] += scaled[less] - 1.0
+            (small if scaled[more] < 1.0 else large).append(more)
+        # Leftovers are 1.0 up to rounding error
+
+        self._count = count
+        self._prob_array = np.array(self.prob)
+        self._alias_array = np.array(self.alias)
+        self._outcome_array = np.array(self.outcomes)
+
+    def draw(self, rng=None) -> Any:
+        """Draw one outcome; rng is anything with random() (random.Random, numpy Generator)"""
+        u = (rng or random).random() * self._count
+        column = int(u)
+        return self.outcomes[column] if u - column < self.prob[column] else self.outcomes[self.alias[column]]
+
+    def draw_many(self, size: int, rng: Optional[np.random.Generator] = None) -> np.ndarray:
+        """Draw many outcomes at once, e.g. for spawn simulations"""
+        rng = rng or np.random.default_rng()
+        u = rng.random(size) * self._count
+        columns = u.astype(np.intp)
+        picks = np.where(u - columns < self._prob_array[columns], columns, self._alias_array[columns])
+        return self._outcome_array[picks]
+
+    def probabilities(self) -> Dict[Any, float]:
+        """Get the normalized probability of each outcome, rebuilt from the table"""
+        result = dict.fromkeys(self.outcomes, 0.0)
+        for column in range(self._count):
+            result[self.outcomes[column]] += self.prob[column] / self._count
+            result[self.outcomes[self.alias[column]]] += (1.0 - self.prob[column]) / self._count
+        return result
+
+@functools.lru_cache(maxsize=256)
+def _compile(table: Tuple[Tuple[Any, float], ...]) -> AliasSampler:
+    return AliasSampler([outcome for outcome, _ in table], [weight for _, weight in table])
+
+def get_sampler(weights: Union[Dict[Any, float], Sequence[float]],
+                outcomes: Sequence[Any] = ENEMY_TYPES) -> AliasSampler:
+    """Get the compiled sampler of a weight table (a dict, or weights for outcomes), compiling it once"""
+    if isinstance(weights, dict):
+        return _compile(tuple(weights.items()))
+    return _compile(tuple(zip(outcomes, weights)))
+
+# Compile the configured weight tables when config loads
+config_enemy_sampler = get_sampler(SPAWN_CONFIG["enemy_weights"])
+legacy_enemy_sampler = get_sampler(LEGACY_ENEMY_WEIGHTS)
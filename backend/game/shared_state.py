@@ -0,0 +1,431 @@
+"""Game state shared by several worker processes on one host.
+
+In this mode the SQLite player store is the source of truth. Each request
+for a player runs in a session: the session takes the player's in-process
+lock and an fcntl byte-range lock on a shared lock file, loads the player
+and their location filter and prefetch state from SQLite, catches up on
+combats changed by any process, runs the request, and writes everything back
+before it releases the locks. World enemies are replayed from SQLite the
+same way as combats; caches (POI tiles, heatmap) stay per process.
+
+    SHARED_STATE=1 PLAYER_STORAGE=sqlite PLAYER_DB_PATH=data/players.sqlite \\
+    RATE_LIMIT_STORAGE_URI=sqlite://data/rate_limits.sqlite \\
+        gunicorn -w 4 --threads 8 -b 0.0.0.0:5000 --chdir backend/app app:app
+"""
+import contextlib
+import fcntl
+import json
+import os
+import sqlite3
+import threading
+import zlib
+from collections.abc import MutableMapping
+from typing import Dict, Any, Iterator, List, Optional, Tuple
+from game.config import SHARED_STATE_CONFIG
+from game.enemy_index import enemy_index
+from game.location_filter import location_filter
+from game.locks import player_locks
+from game.prefetch import poi_prefetcher
+from game.world_enemies import world_enemies
+
+class SQLiteMapping(MutableMapping):
+    """Dict of JSON values in a SQLite table, visible to every process using the file"""
+
+    def __init__(self, path: str, table: str):
+        self.table = table
+        self._conn = sqlite3.connect(path, check_same_thread=False, timeout=30)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.execute(f"CREATE TABLE IF NOT EXISTS {table} (key TEXT PRIMARY KEY, value TEXT NOT NULL)")
+        self._conn.commit()
+        self._lock = threading.Lock()
+
+    def __getitem__(self, key: str) -> Any:
+        with self._lock:
+            row = self._conn.execute(f"SELECT value FROM {self.table} WHERE key = ?", (key,)).fetchone()
+        if row is None:
+            raise KeyError(key)
+        return json.loads(row[0])
+
+    def __setitem__(self, key: str, value: Any):
+        data = json.dumps(value)
+        with self._lock, self._conn:
+            self._conn.execute(
+                f"INSERT INTO {self.table} (key, value) VALUES (?, ?) "
+                "ON CONFLICT(key) DO UPDATE SET value = excluded.value",
+                (key, data)
+            )
+
+    def __delitem__(self, key: str):
+        with self._lock, self._conn:
+            if self._conn.execute(f"DELETE FROM {self.table} WHERE key = ?", (key,)).rowcount == 0:
+                raise KeyError(key)
+
+    def __iter__(self) -> Iterator[str]:
+        with self._lock:
+            keys = [row[0] for row in self._conn.execute(f"SELECT key FROM {self.table}")]
+        return iter(keys)
+
+    def __len__(self) -> int:
+        with self._lock:
+            return self._conn.execute(f"SELECT COUNT(*) FROM {self.table}").fetchone()[0]
+
+class SharedCombats:
+    """Combats of every process in one SQLite table, versioned by change.
+
+    Each change takes the next version number, and an ended combat keeps its
+    row with a NULL value, so a process catches up on every start and end
+    since it last looked with one indexed query. Those tombstones are purged
+    once they are older than tombstone_ttl; a process whose last sync is
+    older than the purge (purged_through) reloads every combat instead.
+    """
+
+    def __init__(self, path: str):
+        self._conn = sqlite3.connect(path, check_same_thread=False, timeout=30)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.execute("CREATE TABLE IF NOT EXISTS combats (player_id TEXT PRIMARY KEY, combat TEXT, version INTEGER NOT NULL)")
+        self._conn.execute("CREATE INDEX IF NOT EXISTS combats_version ON combats (version)")
+        # (recorded_at, version) samples, to find the version that was current tombstone_ttl ago
+        self._conn.execute("CREATE TABLE IF NOT EXISTS combat_marks (recorded_at REAL NOT NULL, version INTEGER NOT NULL)")
+        self._conn.execute("CREATE TABLE IF NOT EXISTS combat_meta (key TEXT PRIMARY KEY, value INTEGER NOT NULL)")
+        self._conn.commit()
+        self._lock = threading.Lock()
+
+    def put(self, player_id: str, combat: Optional[Dict[str, Any]]):
+        """Store a player's combat, or None once it ended; unchanged combats keep their version"""
+        next_version = "(SELECT COALESCE(MAX(version), 0) + 1 FROM combats)"
+        with self._lock, self._conn:
+            if combat is None:
+                self._conn.execute(
+                    f"UPDATE combats SET combat = NULL, version = {next_version} "
+                    "WHERE player_id = ? AND combat IS NOT NULL",
+                    (player_id,)
+                )
+            else:
+                self._conn.execute(
+                    f"INSERT INTO combats (player_id, combat, version) VALUES (?, ?, {next_version}) "
+                    "ON CONFLICT(player_id) DO UPDATE SET combat = excluded.combat, version = excluded.version "
+                    "WHERE combats.combat IS NOT excluded.combat",
+                    (player_id, json.dumps(combat))
+                )
+
+    def changes_since(self, version: int) -> Tuple[List[Tuple[str, Optional[Dict[str, Any]]]], int]:
+        """Get (player_id, combat or None) for every change after a version, and the latest version"""
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT player_id, combat, version FROM combats WHERE version > ? ORDER BY version", (version,)
+            ).fetchall()
+        changes = [(player_id, json.loads(combat) if combat is not None else None) for player_id, combat, _ in rows]
+        return changes, rows[-1][2] if rows else version
+
+    def snapshot(self) -> Tuple[Dict[str, Dict[str, Any]], int]:
+        """Get every live combat and the latest version, read in one statement"""
+        with self._lock:
+            rows = self._conn.execute("SELECT player_id, combat, version FROM combats").fetchall()
+        live = {player_id: json.loads(combat) for player_id, combat, _ in rows if combat is not None}
+        return live, max((version for _, _, version in rows), default=0)
+
+    def purged_through(self) -> int:
+        """Get the latest version whose tombstones may have been purged"""
+        with self._lock:
+            row = self._conn.execute("SELECT value FROM combat_meta WHERE key = 'purged_through'").fetchone()
+        return row[0] if row else 0
+
+    def idle_players(self, cutoff: float, player_id: Optional[str] = None) -> List[str]:
+        """Get players with a live combat whose record was last written before cutoff"""
+        query = ("SELECT combats.player_id FROM combats LEFT JOIN players ON players.id = combats.player_id "
+                 "WHERE combats.combat IS NOT NULL AND COALESCE(players.updated_at, 0) < ?")
+        params: Tuple = (cutoff,)
+        if player_id is not None:
+            query += " AND combats.player_id = ?"
+            params += (player_id,)
+        with self._lock:
+            return [row[0] for row in self._conn.execute(query, params)]
+
+    def purge_tombstones(self, now: float, ttl: float) -> int:
+        """Delete ended combats older than ttl, returning how many rows were deleted"""
+        with self._lock, self._conn:
+            self._conn.execute(
+                "INSERT INTO combat_marks (recorded_at, version) SELECT ?, COALESCE(MAX(version), 0) FROM combats", (now,)
+            )
+            horizon = self._conn.execute(
+                "SELECT MAX(version) FROM combat_marks WHERE recorded_at <= ?", (now - ttl,)
+            ).fetchone()[0]
+            if not horizon:
+                return 0
+            # The newest row always stays, so the next change still gets a higher version
+            purged = self._conn.execute(
+                "DELETE FROM combats WHERE combat IS NULL AND version <= ? "
+                "AND version < (SELECT MAX(version) FROM combats)",
+                (horizon,)
+            ).rowcount
+            self._conn.execute(
+                "DELETE FROM combat_marks WHERE recorded_at < (SELECT MAX(recorded_at) FROM combat_marks WHERE recorded_at <= ?)",
+                (now - ttl,)
+            )
+            self._conn.execute(
+                "INSERT INTO combat_meta (key, value) VALUES ('purged_through', ?) "
+                "ON CONFLICT(key) DO UPDATE SET value = MAX(value, excluded.value)",
+                (horizon,)
+            )
+        return purged
+
+class SharedWorldEnemies:
+    """World enemies of every process in one SQLite table, versioned by change like combats.
+
+    Rows are deleted once expired; every process expires its own copies at
+    the same expires_at, so no tombstones are needed.
+    """
+
+    def __init__(self, path: str):
+        self._conn = sqlite3.connect(path, check_same_thread=False, timeout=30)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS world_enemies (world_enemy_id TEXT PRIMARY KEY, enemy TEXT NOT NULL, "
+            "engaged_by TEXT NOT NULL, expires_at REAL NOT NULL, version INTEGER NOT NULL)"
+        )
+        self._conn.execute("CREATE INDEX IF NOT EXISTS world_enemies_version ON world_enemies (version)")
+        self._conn.commit()
+        self._lock = threading.Lock()
+
+    def put(self, template: Dict[str, Any]):
+        """Store a newly registered world enemy"""
+        next_version = "(SELECT COALESCE(MAX(version), 0) + 1 FROM world_enemies)"
+        with self._lock, self._conn:
+            self._conn.execute(
+                f"INSERT OR IGNORE INTO world_enemies (world_enemy_id, enemy, engaged_by, expires_at, version) "
+                f"VALUES (?, ?, '[]', ?, {next_version})",
+                (template['world_enemy_id'], json.dumps(template), template['expires_at'])
+            )
+
+    def engage(self, world_enemy_id: str, player_id: str):
+        """Record that a player engaged a world enemy"""
+        next_version = "(SELECT COALESCE(MAX(version), 0) + 1 FROM world_enemies)"
+        with self._lock, self._conn:
+            self._conn.execute(
+                f"UPDATE world_enemies SET engaged_by = json_insert(engaged_by, '$[#]', ?), version = {next_version} "
+                "WHERE world_enemy_id = ? AND NOT EXISTS (SELECT 1 FROM json_each(engaged_by) WHERE value = ?)",
+                (player_id, world_enemy_id, player_id)
+            )
+
+    def changes_since(self, version: int) -> Tuple[List[Tuple[Dict[str, Any], List[str]]], int]:
+        """Get (template, engaged player ids) for every change after a version, and the latest version"""
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT enemy, engaged_by, version FROM world_enemies WHERE version > ? ORDER BY version", (version,)
+            ).fetchall()
+        changes = [(json.loads(enemy), json.loads(engaged_by)) for enemy, engaged_by, _ in rows]
+        return changes, rows[-1][2] if rows else version
+
+    def purge_expired(self, now: float) -> int:
+        """Delete expired world enemies, returning how many rows were deleted"""
+        with self._lock, self._conn:
+            return self._conn.execute(
+                "DELETE FROM world_enemies WHERE expires_at <= ? AND version < (SELECT MAX(version) FROM world_enemies)",
+                (now,)
+            ).rowcount
+
+class ProcessLocks:
+    """Cross-process exclusive locks striped over the bytes of one lock file.
+
+    fcntl record locks belong to the process, not the thread, so each stripe
+    also has a thread lock: two threads of one process never hold the same
+    byte at once and neither can release it under the other.
+    """
+
+    def __init__(self, path: str, slots: int):
+        self.slots = slots
+        self._fd = os.open(path, os.O_RDWR | os.O_CREAT, 0o644)
+        self._thread_locks = [threading.Lock() for _ in range(slots)]
+
+    @contextlib.contextmanager
+    def lock(self, key: str):
+        """Hold the stripe of a key in every process"""
+        # crc32, unlike hash(), gives the same stripe in every process
+        slot = zlib.crc32(key.encode()) % self.slots
+        with self._thread_locks[slot]:
+            fcntl.lockf(self._fd, fcntl.LOCK_EX, 1, slot)
+            try:
+                yield
+            finally:
+                fcntl.lockf(self._fd, fcntl.LOCK_UN, 1, slot)
+
+class SharedGameState:
+    """Loads and stores a player's record and combat around each request"""
+
+    def __init__(self, config: Dict[str, Any] = None):
+        config = config or SHARED_STATE_CONFIG
+        self.enabled = config["enabled"]
+        self.lock_path = config["lock_path"]
+        self.lock_slots = config["lock_slots"]
+        self.tombstone_ttl = config["tombstone_ttl"]
+        self.combats: Optional[SharedCombats] = None
+        self.world: Optional[SharedWorldEnemies] = None
+        self.locations: Optional[SQLiteMapping] = None
+        self.process_locks: Optional[ProcessLocks] = None
+        self.combat_version = 0  # every combat change up to this one is applied locally
+        self.world_version = 0  # likewise for world enemies
+        self._in_session = set()  # players whose session in this process is past _load
+        self._sync_lock = threading.Lock()
+
+        self.sessions = 0
+        self.writes = 0
+        self.combats_synced = 0
+        self.combat_resyncs = 0
+        self.world_enemies_synced = 0
+        self.combats_swept = 0
+        self.rows_purged = 0
+
+    def start(self, player_manager, combat_system):
+        """Switch the managers of this process to the shared store"""
+        if not self.enabled:
+            return
+        if not player_manager.store.persistent:
+            raise ValueError("Shared state needs a persistent player store (PLAYER_STORAGE=sqlite)")
+
+        self.player_manager = player_manager
+        self.combat_system = combat_system
+        self.combats = SharedCombats(player_manager.store.path)
+        self.locations = SQLiteMapping(player_manager.store.path, "location_state")
+        self.world = world_enemies.shared = SharedWorldEnemies(player_manager.store.path)
+        self.process_locks = ProcessLocks(self.lock_path, self.lock_slots)
+        # Every session writes through, so nothing is left for write-behind or spilling
+        player_manager.shared = True
+
+    @contextlib.contextmanager
+    def session(self, player_id: str):
+        """Run a request for a player against the shared state"""
+        with player_locks.lock(player_id), self.process_locks.lock(player_id):
+            location = self._load(player_id)
+            with self._sync_lock:
+                self._in_session.add(player_id)
+            try:
+                yield
+            finally:
+                self._store(player_id, location)
+                with self._sync_lock:
+                    self._in_session.discard(player_id)
+
+    def sync_combats(self):
+        """Apply the combats started or ended by any process since the last sync.
+
+        Every process then sees all live enemies for area limits. A player's
+        own combat can't change elsewhere while their session holds the
+        lock, so applying changes never overwrites one in use.
+        """
+        with self._sync_lock:
+            if self.combat_version < self.combats.purged_through():
+                self._resync_combats()
+                return
+            changes, self.combat_version = self.combats.changes_since(self.combat_version)
+            for owner_id, combat in changes:
+                if combat is not None:
+                    self.combat_system.active_combats[owner_id] = combat
+                    enemy_index.add(owner_id, combat["enemy"])
+                elif self.combat_system.active_combats.pop(owner_id, None) is not None:
+                    enemy_index.remove(owner_id)
+            self.combats_synced += len(changes)
+
+    def _resync_combats(self):
+        """Reload every combat after missing changes whose tombstones were purged (holding _sync_lock).
+
+        Players in a session here are skipped: their combat may have changed
+        locally and no other process can have changed it in the store.
+        """
+        live, self.combat_version = self.combats.snapshot()
+        active_combats = self.combat_system.active_combats
+        for owner_id in [owner_id for owner_id in active_combats if owner_id not in live]:
+            if owner_id not in self._in_session:
+                del active_combats[owner_id]
+                enemy_index.remove(owner_id)
+        for owner_id, combat in live.items():
+            if owner_id not in self._in_session:
+                active_combats[owner_id] = combat
+                enemy_index.add(owner_id, combat["enemy"])
+        self.combats_synced += len(live)
+        self.combat_resyncs += 1
+
+    def sync_world_enemies(self):
+        """Apply the world enemies registered or engaged by any process since the last sync"""
+        with self._sync_lock:
+            changes, self.world_version = self.world.changes_since(self.world_version)
+            for template, engaged_by in changes:
+                world_enemies.apply(template, engaged_by)
+            self.world_enemies_synced += len(changes)
+
+    def end_idle_combats(self, now: float, ttl: float) -> int:
+        """End combats whose player made no request in any process for ttl seconds, returning how many"""
+        ended = 0
+        cutoff = now - ttl
+        for player_id in self.combats.idle_players(cutoff):
+            with player_locks.lock(player_id), self.process_locks.lock(player_id):
+                # The player may have made a request since the query
+                if not self.combats.idle_players(cutoff, player_id):
+                    continue
+                self.combats.put(player_id, None)
+                if self.combat_system.get_combat(player_id):
+                    self.combat_system.end_combat(player_id)
+                ended += 1
+        self.combats_swept += ended
+        return ended
+
+    def purge(self, now: float) -> int:
+        """Delete old combat tombstones and expired world enemies from the store, returning how many rows"""
+        purged = self.combats.purge_tombstones(now, self.tombstone_ttl) + self.world.purge_expired(now)
+        self.rows_purged += purged
+        return purged
+
+    def _load(self, player_id: str) -> str:
+        """Replace this process's copy of a player with the shared one, returning their stored location state"""
+        self.player_manager.reload(player_id)
+        self.sync_combats()
+        self.sync_world_enemies()
+
+        location = self.locations.get(player_id) or {}
+        if location.get("filter"):
+            location_filter.states[player_id] = tuple(location["filter"])
+        else:
+            location_filter.forget(player_id)
+        if location.get("track"):
+            poi_prefetcher.tracks[player_id] = tuple(location["track"])
+        else:
+            poi_prefetcher.forget(player_id)
+        self.sessions += 1
+        return json.dumps({"filter": location.get("filter"), "track": location.get("track")})
+
+    def _store(self, player_id: str, stored_location: str):
+        """Write a player, their combat and their location state back for the other processes"""
+        player = self.player_manager.players.get(player_id)
+        if player is None:
+            return
+        self.player_manager.store.save_many([(player_id, player.to_dict())])
+        self.combats.put(player_id, self.combat_system.active_combats.get(player_id))
+
+        location = {
+            "filter": location_filter.states.get(player_id),
+            "track": poi_prefetcher.tracks.get(player_id)
+        }
+        if json.dumps(location) != stored_location:
+            self.locations[player_id] = location
+        self.writes += 1
+
+    def stats(self) -> Dict[str, Any]:
+        """Get session counters of this process"""
+        return {
+            "enabled": self.enabled,
+            "pid": os.getpid(),
+            "sessions": self.sessions,
+            "writes": self.writes,
+            "combat_version": self.combat_version,
+            "combats_synced": self.combats_synced,
+            "combat_resyncs": self.combat_resyncs,
+            "world_version": self.world_version,
+            "world_enemies_synced": self.world_enemies_synced,
+            "combats_swept": self.combats_swept,
+            "rows_purged": self.rows_purged
+        }
+
+# Global shared state instance
+shared_state = SharedGameState()
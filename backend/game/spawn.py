@@ -1,32 +1,15 @@
-import math
 import random
 import time
+from game.enemy_index import enemy_position
+from game.geo import haversine, haversine_many
+from game.sampler import get_sampler
 
 def calculate_distance(lat1, lon1, lat2, lon2):
     """
     Calculate the distance between two GPS coordinates in meters.
     Uses the Haversine formula.
     """
-    # Earth's radius in meters
-    earth_radius = 6371000
-    
-    # Convert latitude and longitude to radians
-    lat1_rad = math.radians(lat1)
-    lon1_rad = math.radians(lon1)
-    lat2_rad = math.radians(lat2)
-    lon2_rad = math.radians(lon2)
-    
-    # Differences
-    dlat = lat2_rad - lat1_rad
-    dlon = lon2_rad - lon1_rad
-    
-    # Haversine formula
-    a = (math.sin(dlat/2)**2 + 
-         math.cos(lat1_rad) * math.cos(lat2_rad) * math.sin(dlon/2)**2)
-    c = 2 * math.atan2(math.sqrt(a), math.sqrt(1-a))
-    
-    distance = earth_radius * c
-    return distance
+    return haversine(lat1, lon1, lat2, lon2)
 
 def should_spawn_enemy(spawn_probability):
     """
@@ -34,20 +17,13 @@ def should_spawn_enemy(spawn_probability):
     """
     return random.random() < spawn_probability
 
-def get_enemy_type_by_weight(enemy_weights):
+def get_enemy_type_by_weight(enemy_weights, rng=None):
     """
     Select enemy type based on configured weights.
     enemy_weights: dict with enemy types as keys and weights as values
+    The weight table is compiled into an alias table once and reused.
     """
-    enemy_types = list(enemy_weights.keys())
-    weights = list(enemy_weights.values())
-    
-    # Normalize weights to ensure they sum to 1
-    total_weight = sum(weights)
-    if total_weight != 1:
-        weights = [w / total_weight for w in weights]
-    
-    return random.choices(enemy_types, weights=weights)[0]
+    return get_sampler(enemy_weights).draw(rng)
 
 def check_area_limits(player_location, existing_enemies, config):
     """
@@ -63,13 +39,15 @@ def check_area_limits(player_location, existing_enemies, config):
     enemies_in_area = 0
     last_spawn_time = None
     
-    for enemy in existing_enemies:
-        # Calculate distance from player to enemy
-        enemy_distance = calculate_distance(
-            player_location['lat'], player_location['lon'],
-            enemy['lat'], enemy['lon']
-        )
-        
+    # Calculate distance from player to every enemy at once
+    positions = [enemy_position(enemy) for enemy in existing_enemies]
+    enemy_distances = haversine_many(
+        player_location['lat'], player_location['lon'],
+        [position[0] for position in positions],
+        [position[1] for position in positions]
+    )
+    
+    for enemy, enemy_distance in zip(existing_enemies, enemy_distances):
         if enemy_distance <= area_radius:
             enemies_in_area += 1
             # Track the most recent spawn time in this area
@@ -0,0 +1,209 @@
+import heapq
+import queue
+import threading
+import time
+from typing import Dict, Any, Callable, List, Optional, Tuple
+from game.config import SPAWN_TASK_CONFIG
+
+class SpawnJob:
+    """A background spawn lookup whose result is delivered to a player later"""
+
+    def __init__(self, player_id: str, kind: str, fn: Callable, args: Tuple):
+        self.player_id = player_id
+        self.kind = kind
+        self.fn = fn
+        self.args = args
+        self.created_at = time.time()
+        self.result = None
+        self.error = None
+        self.detached = False  # result is discarded instead of delivered
+        self.done = threading.Event()
+
+    def wait(self, timeout: Optional[float] = None) -> bool:
+        """Wait for the job to finish, returning True if it did"""
+        return self.done.wait(timeout)
+
+class SpawnTaskQueue:
+    """Local task queue with a worker pool for POI-based spawn resolution.
+
+    Jobs are keyed by (player_id, kind) so a player never has two identical
+    lookups queued. Finished results wait in a per-player mailbox until the
+    player's next /update-location or /player-status response collects them.
+    """
+
+    def __init__(self, workers: int = None, max_queue: int = None, result_ttl: float = None):
+        self.workers = workers if workers is not None else SPAWN_TASK_CONFIG["workers"]
+        self.result_ttl = result_ttl if result_ttl is not None else SPAWN_TASK_CONFIG["result_ttl"]
+        max_queue = max_queue if max_queue is not None else SPAWN_TASK_CONFIG["max_queue"]
+
+        self._queue: "queue.Queue[SpawnJob]" = queue.Queue(maxsize=max_queue)
+        self._pending: Dict[Tuple[str, str], SpawnJob] = {}
+        self._results: Dict[str, Dict[str, Tuple[Any, float]]] = {}  # player_id -> kind -> (result, finished_at)
+        self._expiry: List[Tuple[float, str, str, float]] = []  # (expires_at, player_id, kind, finished_at)
+        self._lock = threading.Lock()
+        self._threads = []
+
+        self.submitted = 0
+        self.deduplicated = 0
+        self.rejected = 0
+        self.completed = 0
+        self.failed = 0
+        self.delivered = 0
+        self.expired = 0
+        self.discarded = 0
+
+    def start(self):
+        """Start the worker threads"""
+        with self._lock:
+            while len(self._threads) < self.workers:
+                thread = threading.Thread(target=self._work, name=f"spawn-worker-{len(self._threads)}", daemon=True)
+                thread.start()
+                self._threads.append(thread)
+
+    def submit(self, player_id: str, kind: str, fn: Callable, *args) -> Optional[SpawnJob]:
+        """Queue a lookup for a player, reusing an identical job already pending.
+
+        Returns None when the queue is full.
+        """
+        if not self._threads:
+            self.start()
+
+        key = (player_id, kind)
+        with self._lock:
+            job = self._pending.get(key)
+            # A job detached by an earlier caller is only reused for the same lookup, not an older fix
+            if job and not (job.detached and job.args != args):
+                job.detached = False
+                self.deduplicated += 1
+                return job
+
+            job = SpawnJob(player_id, kind, fn, args)
+            try:
+                self._queue.put_nowait(job)
+            except queue.Full:
+                self.rejected += 1
+                return None
+            self._pending[key] = job
+            self.submitted += 1
+            return job
+
+    def _work(self):
+        """Run queued jobs and file their results in the owner's mailbox"""
+        while True:
+            job = self._queue.get()
+            try:
+                job.result = job.fn(*job.args)
+            except Exception as e:
+                print(f"❌ Spawn task error ({job.kind} for {job.player_id}): {e}")
+                job.error = e
+
+            with self._lock:
+                key = (job.player_id, job.kind)
+                if self._pending.get(key) is job:
+                    del self._pending[key]
+                if job.error:
+                    self.failed += 1
+                elif job.detached:
+                    self.completed += 1
+                    self.discarded += 1
+                else:
+                    self.completed += 1
+                    finished_at = time.time()
+                    self._results.setdefault(job.player_id, {})[job.kind] = (job.result, finished_at)
+                    heapq.heappush(self._expiry, (finished_at + self.result_ttl, job.player_id, job.kind, finished_at))
+                # Under the lock, so detach() sees either a pending job or its filed result
+                job.done.set()
+            self._queue.task_done()
+
+    def detach(self, job: SpawnJob):
+        """Let a job finish in the background without delivering its result"""
+        with self._lock:
+            job.detached = True
+            if job.done.is_set():
+                mailbox = self._results.get(job.player_id, {})
+                filed = mailbox.get(job.kind)
+                if filed is not None and filed[0] is job.result:
+                    del mailbox[job.kind]
+                    self.discarded += 1
+                if not mailbox:
+                    self._results.pop(job.player_id, None)
+
+    def forget(self, player_id: str) -> int:
+        """Drop a player's undelivered results, returning how many were dropped"""
+        with self._lock:
+            dropped = len(self._results.pop(player_id, {}))
+            self.discarded += dropped
+            return dropped
+
+    def purge_expired(self, now: Optional[float] = None) -> int:
+        """Drop results nobody collected within result_ttl, returning how many were dropped"""
+        now = now if now is not None else time.time()
+        purged = 0
+        with self._lock:
+            while self._expiry and self._expiry[0][0] <= now:
+                _, player_id, kind, finished_at = heapq.heappop(self._expiry)
+                mailbox = self._results.get(player_id)
+                # Rows of results that were collected or replaced since are skipped
+                if mailbox and kind in mailbox and mailbox[kind][1] == finished_at:
+                    del mailbox[kind]
+                    if not mailbox:
+                        del self._results[player_id]
+                    purged += 1
+            self.expired += purged
+        return purged
+
+    def is_pending(self, player_id: str, kind: str) -> bool:
+        """Check if a lookup is queued or running for a player"""
+        with self._lock:
+            return (player_id, kind) in self._pending
+
+    def pop_result(self, player_id: str, kind: str) -> Optional[Any]:
+        """Collect one finished result for a player, if any"""
+        with self._lock:
+            mailbox = self._results.get(player_id)
+            if not mailbox or kind not in mailbox:
+                return None
+            result, finished_at = mailbox.pop(kind)
+            if not mailbox:
+                del self._results[player_id]
+            return self._deliver(result, finished_at)
+
+    def pop_results(self, player_id: str) -> Dict[str, Any]:
+        """Collect every finished result for a player"""
+        with self._lock:
+            mailbox = self._results.pop(player_id, {})
+            results = {}
+            for kind, (result, finished_at) in mailbox.items():
+                result = self._deliver(result, finished_at)
+                if result is not None:
+                    results[kind] = result
+            return results
+
+    def _deliver(self, result: Any, finished_at: float) -> Optional[Any]:
+        """Count a delivered result, dropping it if it waited too long"""
+        if time.time() - finished_at > self.result_ttl:
+            self.expired += 1
+            return None
+        self.delivered += 1
+        return result
+
+    def stats(self) -> Dict[str, Any]:
+        """Get queue depth and job counters"""
+        with self._lock:
+            return {
+                "workers": len(self._threads),
+                "queue_depth": self._queue.qsize(),
+                "pending": len(self._pending),
+                "undelivered": sum(len(mailbox) for mailbox in self._results.values()),
+                "submitted": self.submitted,
+                "deduplicated": self.deduplicated,
+                "rejected": self.rejected,
+                "completed": self.completed,
+                "failed": self.failed,
+                "delivered": self.delivered,
+                "expired": self.expired,
+                "discarded": self.discarded
+            }
+
+# Global spawn task queue instance
+spawn_task_queue = SpawnTaskQueue()
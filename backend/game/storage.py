@@ -0,0 +1,230 @@
+import abc
+import json
+import sqlite3
+import threading
+import time
+from typing import Dict, Any, Callable, List, Optional, Tuple
+from game.config import PLAYER_STORAGE_CONFIG
+
+class PlayerStore(abc.ABC):
+    """Storage backend for player records (the dicts built by Player.to_dict)"""
+
+    persistent = False  # records survive a restart
+
+    @abc.abstractmethod
+    def load(self, player_id: str) -> Optional[Dict[str, Any]]:
+        """Get one stored player"""
+
+    @abc.abstractmethod
+    def load_all(self) -> Dict[str, Dict[str, Any]]:
+        """Get every stored player by id"""
+
+    @abc.abstractmethod
+    def save_many(self, records: List[Tuple[str, Dict[str, Any]]]):
+        """Write (player_id, record) pairs in one batch"""
+
+    @abc.abstractmethod
+    def delete(self, player_id: str):
+        """Remove a stored player"""
+
+    def close(self):
+        """Release the backend's resources"""
+
+class MemoryPlayerStore(PlayerStore):
+    """Process-local store; records are lost on restart.
+
+    Holds only the idle players PlayerManager evicted, until their next
+    request loads them again. Loaded players are never written behind to it,
+    as it would just be a second copy in the same process.
+    """
+
+    def __init__(self):
+        self.records: Dict[str, Dict[str, Any]] = {}
+        self._lock = threading.Lock()
+
+    def load(self, player_id: str) -> Optional[Dict[str, Any]]:
+        with self._lock:
+            return self.records.get(player_id)
+
+    def load_all(self) -> Dict[str, Dict[str, Any]]:
+        with self._lock:
+            return dict(self.records)
+
+    def save_many(self, records: List[Tuple[str, Dict[str, Any]]]):
+        with self._lock:
+            self.records.update(records)
+
+    def delete(self, player_id: str):
+        with self._lock:
+            self.records.pop(player_id, None)
+
+class SQLitePlayerStore(PlayerStore):
+    """SQLite store in WAL mode, one JSON row per player.
+
+    WAL lets readers keep going during a flush, and synchronous=NORMAL only
+    syncs at checkpoints: a power loss can drop the last transactions but
+    never corrupts the file.
+    """
+
+    persistent = True
+
+    def __init__(self, path: str):
+        self.path = path
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS players (id TEXT PRIMARY KEY, data TEXT NOT NULL, updated_at REAL NOT NULL)"
+        )
+        self._conn.commit()
+        self._lock = threading.Lock()
+
+    def load(self, player_id: str) -> Optional[Dict[str, Any]]:
+        with self._lock:
+            row = self._conn.execute("SELECT data FROM players WHERE id = ?", (player_id,)).fetchone()
+        return json.loads(row[0]) if row else None
+
+    def load_all(self) -> Dict[str, Dict[str, Any]]:
+        with self._lock:
+            rows = self._conn.execute("SELECT id, data FROM players").fetchall()
+        return {player_id: json.loads(data) for player_id, data in rows}
+
+    def save_many(self, records: List[Tuple[str, Dict[str, Any]]]):
+        now = time.time()
+        rows = [(player_id, json.dumps(record), now) for player_id, record in records]
+        with self._lock, self._conn:
+            self._conn.executemany(
+                "INSERT INTO players (id, data, updated_at) VALUES (?, ?, ?) "
+                "ON CONFLICT(id) DO UPDATE SET data = excluded.data, updated_at = excluded.updated_at",
+                rows
+            )
+
+    def delete(self, player_id: str):
+        with self._lock, self._conn:
+            self._conn.execute("DELETE FROM players WHERE id = ?", (player_id,))
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
+
+class WriteBehindWriter:
+    """Coalesces player mutations into periodic batched writes.
+
+    mark_dirty only records a player id; a background thread snapshots every
+    dirty player each flush_interval seconds and writes them in batches of
+    max_batch, so a player changed many times between flushes is written
+    once and request threads never wait on storage.
+    """
+
+    def __init__(self, store: PlayerStore, snapshot: Callable[[str], Optional[Dict[str, Any]]],
+                 flush_interval: float = None, max_batch: int = None):
+        self.store = store
+        self.snapshot = snapshot
+        self.flush_interval = flush_interval if flush_interval is not None else PLAYER_STORAGE_CONFIG["flush_interval"]
+        self.max_batch = max_batch if max_batch is not None else PLAYER_STORAGE_CONFIG["max_batch"]
+
+        self._dirty: Dict[str, float] = {}  # player_id -> first unflushed change
+        self._lock = threading.Lock()
+        self._flush_lock = threading.Lock()
+        self._wakeup = threading.Event()
+        self._thread = None
+
+        self.marked = 0
+        self.coalesced = 0
+        self.flushes = 0
+        self.written = 0
+        self.errors = 0
+        self.max_lag = 0.0
+        self.last_lag = 0.0
+        self.write_seconds = 0.0
+
+    def start(self):
+        """Start the background flush thread"""
+        with self._lock:
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._run, name="player-writer", daemon=True)
+                self._thread.start()
+
+    def mark_dirty(self, player_id: str):
+        """Queue a player for the next flush"""
+        if self._thread is None:
+            self.start()
+        with self._lock:
+            self.marked += 1
+            if player_id in self._dirty:
+                self.coalesced += 1
+            else:
+                self._dirty[player_id] = time.time()
+
+    def _run(self):
+        while True:
+            self._wakeup.wait(self.flush_interval)
+            self._wakeup.clear()
+            try:
+                self.flush()
+            except Exception as e:
+                print(f"❌ Player flush error: {e}")
+
+    def flush(self) -> int:
+        """Write every dirty player now, returning how many were written"""
+        with self._flush_lock:
+            with self._lock:
+                dirty, self._dirty = self._dirty, {}
+            if not dirty:
+                return 0
+
+            start = time.time()
+            items = list(dirty.items())
+            written = 0
+            for offset in range(0, len(items), self.max_batch):
+                batch = items[offset:offset + self.max_batch]
+                records = []
+                for player_id, _ in batch:
+                    record = self.snapshot(player_id)
+                    if record is not None:
+                        records.append((player_id, record))
+                try:
+                    self.store.save_many(records)
+                except Exception:
+                    with self._lock:
+                        # Keep the failed batch and every batch after it for the next flush, with their original age
+                        for player_id, dirty_since in items[offset:]:
+                            self._dirty.setdefault(player_id, dirty_since)
+                        self.errors += 1
+                    raise
+                written += len(records)
+
+            finished = time.time()
+            with self._lock:
+                self.flushes += 1
+                self.written += written
+                self.write_seconds += finished - start
+                self.last_lag = finished - min(dirty.values())
+                self.max_lag = max(self.max_lag, self.last_lag)
+            return written
+
+    def stats(self) -> Dict[str, Any]:
+        """Get flush counters, durability lag and write throughput"""
+        with self._lock:
+            return {
+                "dirty": len(self._dirty),
+                "oldest_dirty_age": round(time.time() - min(self._dirty.values()), 3) if self._dirty else 0.0,
+                "flush_interval": self.flush_interval,
+                "marked": self.marked,
+                "coalesced": self.coalesced,
+                "flushes": self.flushes,
+                "written": self.written,
+                "errors": self.errors,
+                "last_lag": round(self.last_lag, 3),
+                "max_lag": round(self.max_lag, 3),
+                "writes_per_second": round(self.written / self.write_seconds) if self.write_seconds else 0
+            }
+
+def create_player_store(config: Dict[str, Any] = None) -> PlayerStore:
+    """Create the player store selected by config"""
+    config = config or PLAYER_STORAGE_CONFIG
+    if config["backend"] == "sqlite":
+        return SQLitePlayerStore(config["path"])
+    if config["backend"] == "memory":
+        return MemoryPlayerStore()
+    raise ValueError(f"Unknown player storage backend: {config['backend']}")
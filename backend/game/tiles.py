@@ -0,0 +1,67 @@
+import math
+from typing import Dict, List, Tuple
+from game.geo import METERS_PER_DEGREE_LAT
+
+def latlon_to_tile(lat: float, lon: float, zoom: int) -> Tuple[int, int]:
+    """Convert a GPS coordinate to slippy-map tile (x, y) at the given zoom"""
+    n = 2 ** zoom
+    lat = max(min(lat, 85.0511), -85.0511)  # Web Mercator latitude limit
+    x = int((lon + 180.0) / 360.0 * n)
+    y = int((1.0 - math.asinh(math.tan(math.radians(lat))) / math.pi) / 2.0 * n)
+    return min(max(x, 0), n - 1), min(max(y, 0), n - 1)
+
+def tile_bounds(x: int, y: int, zoom: int) -> Dict[str, float]:
+    """Get the bounding box of a slippy-map tile"""
+    n = 2 ** zoom
+
+    def tile_lat(ty):
+        return math.degrees(math.atan(math.sinh(math.pi * (1 - 2 * ty / n))))
+
+    return {
+        'south': tile_lat(y + 1),
+        'north': tile_lat(y),
+        'west': x / n * 360.0 - 180.0,
+        'east': (x + 1) / n * 360.0 - 180.0
+    }
+
+def tile_center(x: int, y: int, zoom: int) -> Tuple[float, float]:
+    """Get the (lat, lon) center of a slippy-map tile"""
+    bounds = tile_bounds(x, y, zoom)
+    return (bounds['south'] + bounds['north']) / 2, (bounds['west'] + bounds['east']) / 2
+
+def bounding_box(lat: float, lon: float, radius_meters: float) -> Dict[str, float]:
+    """Get a bounding box enclosing a circle around a GPS coordinate"""
+    lat_delta = radius_meters / METERS_PER_DEGREE_LAT
+    lon_delta = radius_meters / (METERS_PER_DEGREE_LAT * max(math.cos(math.radians(lat)), 1e-6))
+    return {
+        'south': lat - lat_delta,
+        'north': lat + lat_delta,
+        'west': lon - lon_delta,
+        'east': lon + lon_delta
+    }
+
+def in_bounds(lat: float, lon: float, bounds: Dict[str, float]) -> bool:
+    """Check if a coordinate lies inside a bounding box (north/east edges exclusive)"""
+    return bounds['south'] <= lat < bounds['north'] and bounds['west'] <= lon < bounds['east']
+
+def tiles_for_circle(lat: float, lon: float, radius_meters: float, zoom: int) -> List[Tuple[int, int]]:
+    """Get every tile that overlaps a circle around a GPS coordinate"""
+    bbox = bounding_box(lat, lon, radius_meters)
+    x_min, y_min = latlon_to_tile(bbox['north'], bbox['west'], zoom)
+    x_max, y_max = latlon_to_tile(bbox['south'], bbox['east'], zoom)
+
+    lat_scale = METERS_PER_DEGREE_LAT
+    lon_scale = METERS_PER_DEGREE_LAT * math.cos(math.radians(lat))
+
+    tiles = []
+    for x in range(x_min, x_max + 1):
+        for y in range(y_min, y_max + 1):
+            bounds = tile_bounds(x, y, zoom)
+            # Distance from the circle center to the closest point of the tile
+            nearest_lat = min(max(lat, bounds['south']), bounds['north'])
+            nearest_lon = min(max(lon, bounds['west']), bounds['east'])
+            dy = (nearest_lat - lat) * lat_scale
+            dx = (nearest_lon - lon) * lon_scale
+            if dx * dx + dy * dy <= radius_meters * radius_meters:
+                tiles.append((x, y))
+    return tiles
@@ -0,0 +1,139 @@
+import heapq
+import threading
+import time
+import uuid
+from typing import Dict, Any, List, Optional, Set, Tuple
+from game.config import WORLD_ENEMY_CONFIG
+from game.enemy_index import EnemySpatialIndex, enemy_position
+from game.geo import haversine
+
+class WorldEnemyRegistry:
+    """Enemies spawned at POIs that every nearby player shares until they expire.
+
+    Each registered enemy is a template: a player who engages it fights
+    their own copy, so one spawn computation at a busy landmark serves
+    every visitor. Expiry times sit in a min-heap and are purged in bulk.
+    With shared state, registrations and engagements are also written to
+    SQLite and applied by the other worker processes.
+    """
+
+    def __init__(self, config: Dict[str, Any] = None):
+        config = config or WORLD_ENEMY_CONFIG
+        self.enabled = config["enabled"]
+        self.ttl = config["ttl"]
+        self.discovery_radius = config["discovery_radius"]
+
+        self._enemies: Dict[str, Dict[str, Any]] = {}  # world_enemy_id -> template
+        self._engaged_by: Dict[str, Set[str]] = {}  # world_enemy_id -> player ids
+        self._expiry: List[Tuple[float, str]] = []  # (expires_at, world_enemy_id)
+        self._index = EnemySpatialIndex(config["cell_size"])
+        self._lock = threading.Lock()
+        self.shared = None  # SharedWorldEnemies when worker processes share the registry
+
+        self.registered = 0
+        self.engagements = 0
+        self.expired = 0
+
+    def register(self, enemy: Dict[str, Any]) -> Optional[str]:
+        """Place a copy of a freshly spawned POI enemy in the world, returning its id"""
+        if not self.enabled or enemy_position(enemy) is None:
+            return None
+
+        world_enemy_id = str(uuid.uuid4())
+        now = time.time()
+        template = dict(enemy, world_enemy_id=world_enemy_id, expires_at=now + self.ttl)
+        if 'location' in template:
+            template['location'] = dict(template['location'])
+
+        with self._lock:
+            self._purge(now)
+            self._add(template, set())
+            self.registered += 1
+        if self.shared:
+            self.shared.put(template)
+        return world_enemy_id
+
+    def apply(self, template: Dict[str, Any], engaged_by: List[str]):
+        """Add or update a world enemy registered by another process"""
+        with self._lock:
+            world_enemy_id = template['world_enemy_id']
+            if world_enemy_id in self._enemies:
+                self._engaged_by[world_enemy_id].update(engaged_by)
+            elif template['expires_at'] > time.time():
+                self._add(template, set(engaged_by))
+
+    def _add(self, template: Dict[str, Any], engaged_by: Set[str]):
+        world_enemy_id = template['world_enemy_id']
+        self._enemies[world_enemy_id] = template
+        self._engaged_by[world_enemy_id] = engaged_by
+        heapq.heappush(self._expiry, (template['expires_at'], world_enemy_id))
+        self._index.add(world_enemy_id, template)
+
+    def find_nearby(self, lat: float, lon: float, radius: Optional[float] = None,
+                    exclude_player: Optional[str] = None) -> List[Dict[str, Any]]:
+        """Get live world enemies within radius meters, nearest first"""
+        radius = radius if radius is not None else self.discovery_radius
+        with self._lock:
+            self._purge(time.time())
+            found = [
+                enemy for enemy in self._index.query(lat, lon, radius)
+                if exclude_player is None or exclude_player not in self._engaged_by[enemy['world_enemy_id']]
+            ]
+        found.sort(key=lambda enemy: haversine(lat, lon, *enemy_position(enemy)))
+        return found
+
+    def engage(self, world_enemy_id: str, player_id: str) -> Optional[Dict[str, Any]]:
+        """Get a player's own copy of a world enemy to fight, or None if it expired"""
+        with self._lock:
+            self._purge(time.time())
+            template = self._enemies.get(world_enemy_id)
+            if template is None:
+                return None
+            self._engaged_by[world_enemy_id].add(player_id)
+            self.engagements += 1
+        if self.shared:
+            self.shared.engage(world_enemy_id, player_id)
+
+        enemy = dict(template, spawn_time=time.time(), spawn_source="world")
+        if 'location' in enemy:
+            enemy['location'] = dict(enemy['location'])
+        return enemy
+
+    def get(self, world_enemy_id: str) -> Optional[Dict[str, Any]]:
+        """Get a live world enemy template"""
+        with self._lock:
+            self._purge(time.time())
+            return self._enemies.get(world_enemy_id)
+
+    def purge_expired(self, now: Optional[float] = None) -> int:
+        """Despawn every expired enemy, returning how many were removed"""
+        with self._lock:
+            return self._purge(now if now is not None else time.time())
+
+    def _purge(self, now: float) -> int:
+        removed = 0
+        while self._expiry and self._expiry[0][0] <= now:
+            _, world_enemy_id = heapq.heappop(self._expiry)
+            if self._enemies.pop(world_enemy_id, None) is not None:
+                del self._engaged_by[world_enemy_id]
+                self._index.remove(world_enemy_id)
+                removed += 1
+        self.expired += removed
+        return removed
+
+    def stats(self) -> Dict[str, Any]:
+        """Get registry size and counters"""
+        with self._lock:
+            return {
+                "enabled": self.enabled,
+                "live": len(self._enemies),
+                "registered": self.registered,
+                "engagements": self.engagements,
+                "expired": self.expired
+            }
+
+    def __len__(self) -> int:
+        return len(self._enemies)
+
+# Global world enemy registry instance
+world_enemies = WorldEnemyRegistry()
@@ -0,0 +1,76 @@
+import io
+import os
+import random
+import tempfile
+import unittest
+from contextlib import redirect_stdout
+from unittest import mock
+import numpy as np
+from game.ar_spawning import ARSpawningSystem, ar_spawning_system, top_candidates
+from game.config import HEATMAP_CONFIG, POI_PROVIDER_CONFIG
+
+class TopCandidatesTest(unittest.TestCase):
+    def test_matches_a_stable_sort_with_ties(self):
+        rng = np.random.default_rng(0)
+        for _ in range(500):
+            # Few distinct values, so most draws tie at the cut-off
+            probabilities = rng.choice([0.1, 0.4, 0.4, 0.7, 1.0], size=int(rng.integers(1, 40)))
+            count = int(rng.integers(1, 8))
+            np.testing.assert_array_equal(top_candidates(probabilities, count),
+                                          np.argsort(-probabilities, kind='stable')[:count])
+
+    def test_empty(self):
+        self.assertEqual(len(top_candidates(np.array([]), 5)), 0)
+
+class SpawnRollTest(unittest.TestCase):
+    def setUp(self):
+        self.addCleanup(setattr, ar_spawning_system, "rng", ar_spawning_system.rng)
+        self.addCleanup(setattr, ar_spawning_system, "heatmap", ar_spawning_system.heatmap)
+        ar_spawning_system.heatmap = None
+        # Equal POIs, so only the tie-break decides the order
+        self.pois = [ar_spawning_system._ingest_poi({"name": f"Cafe {index}", "lat": 14.6, "lon": 121.0 + index * 1e-4,
+                                                     "types": ["cafe"], "source": "osm"}) for index in range(12)]
+
+    def spawns(self, seed: int):
+        ar_spawning_system.rng = np.random.default_rng(seed)
+        with mock.patch.object(ar_spawning_system, "get_all_nearby_pois", return_value=self.pois):
+            return [(enemy or {}).get("location", {}).get("poi_name") for enemy in
+                    (ar_spawning_system.find_best_spawn_location(14.6, 121.0, 1) for _ in range(50))]
+
+    def test_seeded_rng_gives_the_same_spawns(self):
+        first = self.spawns(7)
+        self.assertEqual(first, self.spawns(7))
+        # Ties go to the nearest (first listed) POIs
+        self.assertLessEqual({name for name in first if name}, {f"Cafe {index}" for index in range(5)})
+
+    def test_single_poi_roll_uses_the_seeded_rng(self):
+        with mock.patch.object(random, "random", side_effect=AssertionError("global random used")):
+            ar_spawning_system.rng = np.random.default_rng(3)
+            first = [ar_spawning_system.spawn_enemy_at_poi(self.pois[0]) is not None for _ in range(20)]
+            ar_spawning_system.rng = np.random.default_rng(3)
+            second = [ar_spawning_system.spawn_enemy_at_poi(self.pois[0]) is not None for _ in range(20)]
+        self.assertEqual(first, second)
+
+class OfflineDataTest(unittest.TestCase):
+    def test_missing_files_fall_back_to_live_lookups(self):
+        osm = dict(POI_PROVIDER_CONFIG["providers"]["osm"], index_path="/nonexistent/pois.sqlite")
+        with mock.patch.dict(HEATMAP_CONFIG, path="/nonexistent/heatmap.npz"), \
+                mock.patch.dict(POI_PROVIDER_CONFIG["providers"], osm=osm), redirect_stdout(io.StringIO()) as output:
+            spawning_system = ARSpawningSystem()
+
+        self.assertIsNone(spawning_system.poi_index)
+        self.assertIsNone(spawning_system.heatmap)
+        self.assertIn("POI index not found", output.getvalue())
+        self.assertIn("Spawn heatmap not found", output.getvalue())
+
+    def test_heatmap_from_an_older_version_is_skipped(self):
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        path = os.path.join(directory.name, "heatmap.npz")
+        np.savez_compressed(path, zoom=17, tiles=np.zeros((0, 2)), cdf=np.zeros(0))
+
+        with redirect_stdout(io.StringIO()):
+            self.assertFalse(ar_spawning_system.set_heatmap(path))
+
+if __name__ == "__main__":
+    unittest.main()
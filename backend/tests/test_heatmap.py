@@ -0,0 +1,78 @@
+import os
+import tempfile
+import unittest
+import numpy as np
+from game.ar_spawning import ar_spawning_system
+from game.geo import METERS_PER_DEGREE_LAT
+from game.heatmap import SpawnHeatmap, build_heatmap
+from game.tiles import latlon_to_tile, tile_bounds, tiles_for_circle
+
+ZOOM = 17
+
+def poi(name: str, lat: float, lon: float, types, rating=None, source="osm"):
+    poi = {"name": name, "lat": lat, "lon": lon, "types": types, "source": source}
+    if rating is not None:
+        poi["rating"] = rating
+    return poi
+
+class SpawnHeatmapTest(unittest.TestCase):
+    def setUp(self):
+        # A player 30 m south of their tile's northern edge
+        x, y = latlon_to_tile(14.6, 121.0, ZOOM)
+        north = tile_bounds(x, y, ZOOM)["north"]
+        lon = (tile_bounds(x, y, ZOOM)["west"] + tile_bounds(x, y, ZOOM)["east"]) / 2
+        self.lat, self.lon = north - 30 / METERS_PER_DEGREE_LAT, lon
+        self.tile, self.north_tile = (x, y), (x, y - 1)
+
+        # The player's own tile only holds an attraction out of reach, the tile to the north a café in reach
+        self.pois = {
+            self.tile: [poi("Far Museum", north - 250 / METERS_PER_DEGREE_LAT, lon, ["tourism", "museum"], rating=4.5)],
+            self.north_tile: [poi("Corner Cafe", north + 20 / METERS_PER_DEGREE_LAT, lon, ["amenity", "cafe"], source="google")]
+        }
+        tiles = tiles_for_circle(self.lat, self.lon, ar_spawning_system.spawn_radius, ZOOM)
+        self.heatmap = build_heatmap(ar_spawning_system, tiles, ZOOM,
+                                     lambda x, y: [ar_spawning_system._ingest_poi(dict(p)) for p in self.pois.get((x, y), [])])
+
+    def roll(self, heatmap: SpawnHeatmap, rng: np.random.Generator):
+        return heatmap.roll(self.lat, self.lon, ar_spawning_system.spawn_radius, ar_spawning_system.max_pois_per_request,
+                            ar_spawning_system.max_spawn_candidates, 3, True, rng)
+
+    def test_roll_uses_neighbouring_tiles_and_skips_pois_out_of_range(self):
+        rng = np.random.default_rng(1)
+        rolled = [self.roll(self.heatmap, rng) for _ in range(200)]
+        names = {result[0]["name"] for result in rolled if result}
+        self.assertEqual(names, {"Corner Cafe"})
+
+    def test_source_rating_and_types_survive_save_and_load(self):
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        path = os.path.join(directory.name, "heatmap.npz")
+        self.heatmap.save(path)
+        loaded = SpawnHeatmap.load(path)
+
+        museum = loaded.poi(int(loaded.tile_start[loaded.rows[self.tile]]))
+        self.assertEqual((museum["source"], museum["rating"], museum["types"]), ("osm", 4.5, ["tourism", "museum"]))
+        cafe = loaded.poi(int(loaded.tile_start[loaded.rows[self.north_tile]]))
+        self.assertEqual(cafe["source"], "google")
+        self.assertNotIn("rating", cafe)
+        np.testing.assert_array_equal(loaded.chance, self.heatmap.chance)
+
+    def test_heatmap_spawn_matches_the_live_enemy(self):
+        self.addCleanup(setattr, ar_spawning_system, "heatmap", ar_spawning_system.heatmap)
+        ar_spawning_system.heatmap = self.heatmap
+        self.assertTrue(ar_spawning_system.heatmap_covers(self.lat, self.lon))
+
+        enemy = None
+        while enemy is None:
+            enemy = ar_spawning_system.spawn_from_heatmap(self.lat, self.lon, 3)
+        live = ar_spawning_system._create_enemy_at_poi(self.pois[self.north_tile][0], 3, enemy["type"])
+        for key in ("type", "hp", "max_hp", "atk", "name", "location", "spawn_source"):
+            self.assertEqual(enemy[key], live[key])
+
+    def test_spawn_radius_reaching_a_missing_tile_is_not_covered(self):
+        partial = build_heatmap(ar_spawning_system, [self.tile], ZOOM, lambda x, y: [])
+        self.assertFalse(partial.covers(self.lat, self.lon, ar_spawning_system.spawn_radius))
+        self.assertTrue(partial.covers(self.lat - 200 / METERS_PER_DEGREE_LAT, self.lon, 50))
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,171 @@
+import threading
+import time
+import unittest
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+import requests
+from game.http_sessions import CircuitBreaker, CircuitOpenError, ProviderSession
+
+class StubProvider(ThreadingHTTPServer):
+    """Local HTTP server answering with scripted (status, headers) responses, then 200s"""
+
+    daemon_threads = True
+
+    def __init__(self):
+        super().__init__(("127.0.0.1", 0), StubHandler)
+        self.script = []
+        self.hits = 0
+        self.lock = threading.Lock()
+
+    @property
+    def url(self) -> str:
+        return f"http://127.0.0.1:{self.server_address[1]}/places"
+
+    def next_response(self):
+        with self.lock:
+            self.hits += 1
+            return self.script.pop(0) if self.script else (200, {})
+
+class StubHandler(BaseHTTPRequestHandler):
+    def do_GET(self):
+        status, headers = self.server.next_response()
+        body = b'{"results": []}'
+        self.send_response(status)
+        for name, value in headers.items():
+            self.send_header(name, value)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass
+
+class ProviderSessionTest(unittest.TestCase):
+    def setUp(self):
+        self.server = StubProvider()
+        threading.Thread(target=self.server.serve_forever, daemon=True).start()
+
+    def tearDown(self):
+        self.server.shutdown()
+        self.server.server_close()
+
+    def session(self, **kwargs) -> ProviderSession:
+        options = {"timeout": 2, "max_retries": 2, "backoff_base": 0.01, "backoff_max": 2.0}
+        options.update(kwargs)
+        session = ProviderSession("stub", self.server.url, **options)
+        self.addCleanup(session.close)
+        return session
+
+    def test_retries_transient_errors_until_success(self):
+        self.server.script = [(503, {}), (502, {})]
+        session = self.session()
+
+        response = session.get()
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(self.server.hits, 3)
+        self.assertEqual(session.retries, 2)
+        self.assertEqual(session.failures, 0)
+        self.assertEqual(session.breaker.state, "closed")
+
+    def test_gives_up_after_max_retries(self):
+        self.server.script = [(500, {})] * 5
+        session = self.session()
+
+        with self.assertRaises(requests.HTTPError):
+            session.get()
+
+        self.assertEqual(self.server.hits, 3)
+        self.assertEqual(session.failures, 1)
+        self.assertEqual(session.breaker.consecutive_failures, 1)
+
+    def test_backoff_delay_is_capped(self):
+        self.server.script = [(503, {})] * 2
+        session = self.session(backoff_base=10, backoff_max=0.05)
+
+        start = time.monotonic()
+        session.get()
+
+        self.assertLess(time.monotonic() - start, 1.0)
+
+    def test_honours_retry_after(self):
+        self.server.script = [(429, {"Retry-After": "1"})]
+        session = self.session()
+
+        start = time.monotonic()
+        response = session.get()
+
+        self.assertEqual(response.status_code, 200)
+        self.assertGreaterEqual(time.monotonic() - start, 1.0)
+
+    def test_retry_after_is_capped_by_backoff_max(self):
+        self.server.script = [(429, {"Retry-After": "30"})]
+        session = self.session(backoff_max=0.1)
+
+        start = time.monotonic()
+        session.get()
+
+        self.assertLess(time.monotonic() - start, 1.0)
+
+    def test_client_errors_are_not_retried_or_counted_by_the_breaker(self):
+        self.server.script = [(404, {})] * 10
+        session = self.session(breaker=CircuitBreaker(failure_threshold=3, reset_timeout=60))
+
+        for _ in range(10):
+            with self.assertRaises(requests.HTTPError):
+                session.get()
+
+        self.assertEqual(self.server.hits, 10)
+        self.assertEqual(session.retries, 0)
+        self.assertEqual(session.breaker.state, "closed")
+        self.assertEqual(session.breaker.consecutive_failures, 0)
+
+    def test_breaker_opens_after_repeated_failures_and_recovers(self):
+        self.server.script = [(503, {})] * 3
+        session = self.session(max_retries=0, breaker=CircuitBreaker(failure_threshold=3, reset_timeout=0.2))
+
+        for _ in range(3):
+            with self.assertRaises(requests.HTTPError):
+                session.get()
+        self.assertEqual(session.breaker.state, "open")
+
+        # Open: rejected without reaching the provider
+        with self.assertRaises(CircuitOpenError):
+            session.get()
+        self.assertEqual(self.server.hits, 3)
+        self.assertEqual(session.rejected, 1)
+
+        # Half-open after the cool-down: one trial goes through and closes the circuit
+        time.sleep(0.25)
+        self.assertEqual(session.breaker.state, "half_open")
+        self.assertEqual(session.get().status_code, 200)
+        self.assertEqual(session.breaker.state, "closed")
+        self.assertEqual(session.breaker.times_opened, 1)
+
+    def test_failed_trial_reopens_the_breaker(self):
+        self.server.script = [(503, {})] * 2
+        session = self.session(max_retries=0, breaker=CircuitBreaker(failure_threshold=1, reset_timeout=0.2))
+
+        with self.assertRaises(requests.HTTPError):
+            session.get()
+        time.sleep(0.25)
+        with self.assertRaises(requests.HTTPError):
+            session.get()
+
+        self.assertEqual(session.breaker.state, "open")
+        self.assertEqual(self.server.hits, 2)
+
+    def test_connection_errors_are_retried_and_counted(self):
+        self.server.shutdown()
+        self.server.server_close()
+        session = self.session(breaker=CircuitBreaker(failure_threshold=1, reset_timeout=60))
+
+        with self.assertRaises(requests.ConnectionError):
+            session.get()
+
+        self.assertEqual(session.requests_sent, 3)
+        self.assertEqual(session.retries, 2)
+        self.assertEqual(session.breaker.state, "open")
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,81 @@
+import math
+import random
+import unittest
+from unittest import mock
+from app.app import app, limiter
+from game.config import CHARACTERS, LOCATION_FILTER_CONFIG, SPAWN_CONFIG
+from game.geo import METERS_PER_DEGREE_LAT
+from game.location_filter import LocationFilter, spread_times
+from game.prefetch import poi_prefetcher
+
+START_LAT, START_LON = 14.6, 121.0
+
+def walk(speed: float, seconds: int, accuracy: float, seed: int = 7):
+    """Yield (second, true northward meters, lat, lon) of a 1 Hz walk north with Gaussian GPS noise"""
+    rng = random.Random(seed)
+    meters_per_degree_lon = METERS_PER_DEGREE_LAT * math.cos(math.radians(START_LAT))
+    for second in range(seconds):
+        north = speed * second
+        yield (second, north,
+               START_LAT + (north + rng.gauss(0, accuracy)) / METERS_PER_DEGREE_LAT,
+               START_LON + rng.gauss(0, accuracy) / meters_per_degree_lon)
+
+class LocationFilterTest(unittest.TestCase):
+    def setUp(self):
+        self.filter = LocationFilter(LOCATION_FILTER_CONFIG)
+
+    def smoothed_north(self, player_id: str) -> float:
+        return (self.filter.states[player_id][0] - START_LAT) * METERS_PER_DEGREE_LAT
+
+    def test_walking_player_is_followed_without_lag(self):
+        errors = []
+        for second, north, lat, lon in walk(1.4, 300, 15.0):
+            self.filter.filter("walker", lat, lon, 15.0, 1000.0 + second)
+            if second >= 60:
+                errors.append(self.smoothed_north("walker") - north)
+
+        self.assertLess(abs(sum(errors) / len(errors)), 3.0)
+        self.assertLess(math.sqrt(sum(error * error for error in errors) / len(errors)), 8.0)
+
+    def test_standing_player_jitter_is_mostly_filtered(self):
+        accepted = sum(self.filter.filter("standing", lat, lon, 15.0, 1000.0 + second)[0]
+                       for second, _, lat, lon in walk(0.0, 300, 15.0))
+        self.assertLess(accepted, 30)
+
+    def test_untimestamped_steps_keep_their_length(self):
+        steps = [(START_LAT + 22 * index / METERS_PER_DEGREE_LAT, START_LON) for index in range(10)]
+        for (lat, lon), now in zip(steps, spread_times(len(steps), 1000.0, 1.0)):
+            self.filter.filter("batch", lat, lon, 5.0, now)
+
+        self.assertGreater(self.smoothed_north("batch"), 0.9 * 22 * 9)
+
+    def test_long_pause_starts_a_new_track(self):
+        for second, _, lat, lon in walk(1.4, 60, 5.0):
+            self.filter.filter("pause", lat, lon, 5.0, 1000.0 + second)
+        # Back an hour later where they stopped: the old velocity must not carry them kilometers on
+        self.filter.filter("pause", lat, lon, 5.0, 1000.0 + 3600)
+        self.assertLess(abs(self.smoothed_north("pause") - 1.4 * 59), 10.0)
+
+class LocationBatchTest(unittest.TestCase):
+    def setUp(self):
+        limiter.enabled = False
+        self.addCleanup(setattr, limiter, "enabled", True)
+        self.client = app.test_client()
+        self.player_id = f"location-test-{id(self)}"
+        response = self.client.post("/select-character", json={
+            "player_id": self.player_id, "character": next(iter(CHARACTERS))
+        })
+        self.assertEqual(response.status_code, 200)
+
+    def test_untimestamped_batch_reports_the_distance_walked(self):
+        fixes = [{"lat": START_LAT + 22 * index / METERS_PER_DEGREE_LAT, "lon": START_LON, "accuracy": 5}
+                 for index in range(10)]
+        # No spawns or prefetches, so the test never waits on a POI provider
+        with mock.patch.dict(SPAWN_CONFIG, spawn_distance=float("inf")), mock.patch.object(poi_prefetcher, "enabled", False):
+            response = self.client.post("/update-location-batch", json={"player_id": self.player_id, "fixes": fixes})
+
+        self.assertEqual(response.status_code, 200)
+        self.assertGreater(response.get_json()["distance_traveled"], 0.9 * 22 * 9)
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,100 @@
+import contextlib
+import io
+import sys
+import threading
+import unittest
+from app.app import app, limiter
+from game.combat import combat_system
+from game.config import CHARACTERS, SKILLS
+from game.player import player_manager
+
+class PlayerLockingTest(unittest.TestCase):
+    """Hammer one player through the real routes and the managers from many threads at once.
+
+    Fighter threads send /combat-turn, /use-skill, /spawn-enemy and /heal for
+    the player through app.test_client(), so every request runs under
+    lock_player. Trainer threads call PlayerManager methods directly, guarded
+    only by @player_locked. Without the locks kills, XP and levels drift apart.
+    """
+
+    FIGHTERS = 6
+    TRAINERS = 4
+    TURNS = 600
+
+    def setUp(self):
+        limiter.enabled = False
+        self.addCleanup(setattr, limiter, "enabled", True)
+        # Switch threads as often as possible to expose races
+        switch_interval = sys.getswitchinterval()
+        sys.setswitchinterval(1e-6)
+        self.addCleanup(sys.setswitchinterval, switch_interval)
+
+        self.character_class = next(iter(CHARACTERS))
+        self.attack_skill = next(skill["name"] for skill in SKILLS[self.character_class]
+                                 if skill.get("type") == "damage")
+        self.player_id = f"locking-test-{id(self)}"
+        response = app.test_client().post("/select-character", json={
+            "player_id": self.player_id, "character": self.character_class
+        })
+        self.assertEqual(response.status_code, 200)
+        self.addCleanup(combat_system.end_combat, self.player_id)
+
+    def fight(self, totals, totals_lock, errors):
+        client = app.test_client()
+        for turn in range(self.TURNS):
+            if turn % 3 == 2:
+                response = client.post("/use-skill", json={"player_id": self.player_id, "skill_name": self.attack_skill})
+            else:
+                response = client.post("/combat-turn", json={"player_id": self.player_id, "action": "attack"})
+            result = response.get_json()
+
+            if response.status_code == 400 or (response.status_code == 200 and "error" in result):
+                # No enemy left to fight (or the skill is cooling down): spawn one and heal up
+                spawned = client.post("/spawn-enemy", json={"player_id": self.player_id, "enemy_type": "class1"})
+                if spawned.status_code == 200:
+                    with totals_lock:
+                        totals["spawns"] += 1
+                client.post("/heal", json={"player_id": self.player_id})
+            elif response.status_code != 200:
+                errors.append(f"{response.status_code} from a fight request: {result}")
+            elif result.get("enemy_defeated"):
+                with totals_lock:
+                    totals["defeats"] += 1
+                    totals["xp"] += result["xp_gained"]
+
+    def train(self, totals, totals_lock):
+        for _ in range(self.TURNS):
+            result = player_manager.add_xp(self.player_id, 10)
+            player_manager.add_active_buff(self.player_id, "training", 0.1, 0)
+            with totals_lock:
+                totals["xp"] += result["xp_gained"]
+
+    def test_concurrent_requests_keep_player_consistent(self):
+        totals = {"spawns": 0, "defeats": 0, "xp": 0}
+        totals_lock = threading.Lock()
+        errors = []
+
+        threads = [threading.Thread(target=self.fight, args=(totals, totals_lock, errors)) for _ in range(self.FIGHTERS)]
+        threads += [threading.Thread(target=self.train, args=(totals, totals_lock)) for _ in range(self.TRAINERS)]
+        # The routes log every turn; keep the test output readable
+        with contextlib.redirect_stdout(io.StringIO()):
+            for thread in threads:
+                thread.start()
+            for thread in threads:
+                thread.join()
+
+        self.assertEqual(errors, [])
+        player = player_manager.get_player(self.player_id)
+        self.assertGreater(totals["defeats"], 0)
+        # An enemy is defeated at most once, and /spawn-enemy replaces any enemy still alive
+        self.assertLessEqual(totals["defeats"], totals["spawns"])
+        self.assertEqual(sum(player["kills"].values()), totals["defeats"])
+        self.assertEqual(player["xp"], totals["xp"])
+        self.assertEqual(player["level"], 1 + player["xp"] // 100)
+        # Every XP award is at most 10, so each level-up is a single level and grants one point
+        self.assertEqual(player["skill_points"], player["level"] - 1)
+        self.assertGreaterEqual(player["current_hp"], 0)
+        self.assertLessEqual(player["current_hp"], player["max_hp"])
+
+if __name__ == "__main__":
+    unittest.main()
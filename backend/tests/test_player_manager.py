@@ -0,0 +1,38 @@
+import unittest
+from game.config import CHARACTERS
+from game.player import PlayerManager
+from game.storage import MemoryPlayerStore
+
+class PlayerEvictionTest(unittest.TestCase):
+    def setUp(self):
+        self.store = MemoryPlayerStore()
+        self.manager = PlayerManager(self.store)
+        self.manager.create_player("p1", next(iter(CHARACTERS)))
+        self.manager.add_xp("p1", 150)
+
+    def test_evicted_player_keeps_progress_with_the_memory_store(self):
+        self.assertTrue(self.manager.evict("p1"))
+        self.assertEqual(self.manager.flush_spilled(), 1)
+        self.assertNotIn("p1", self.manager.players)
+        self.assertEqual(self.store.records["p1"]["xp"], 150)
+
+        player = self.manager.get_player("p1")
+        self.assertEqual((player["xp"], player["level"]), (150, 2))
+        # Loaded again, so the store no longer holds a second copy
+        self.assertEqual(self.store.records, {})
+
+    def test_player_evicted_before_the_flush_is_reloaded_from_the_spill(self):
+        self.manager.evict("p1")
+        self.assertEqual(self.manager.get_player("p1")["xp"], 150)
+        self.assertEqual(self.manager.flush_spilled(), 0)
+        self.assertEqual(self.store.records, {})
+
+    def test_evicted_players_stay_on_the_leaderboard(self):
+        self.manager.create_player("p2", next(iter(CHARACTERS)))
+        self.manager.evict("p1")
+        self.assertEqual(sorted(player["id"] for player in self.manager.all_players()), ["p1", "p2"])
+        self.manager.flush_spilled()
+        self.assertEqual(sorted(player["id"] for player in self.manager.all_players()), ["p1", "p2"])
+
+if __name__ == "__main__":
+    unittest.main()
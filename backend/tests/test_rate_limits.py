@@ -0,0 +1,72 @@
+import multiprocessing
+import os
+import tempfile
+import time
+import unittest
+from limits import parse
+from limits.storage import storage_from_string
+from limits.strategies import FixedWindowRateLimiter
+from game.rate_limits import SQLiteRateLimitStorage
+
+def hit_from_another_process(uri: str, hits: int):
+    storage = storage_from_string(uri)
+    for _ in range(hits):
+        storage.incr("shared", 60)
+
+class SQLiteRateLimitStorageTest(unittest.TestCase):
+    def setUp(self):
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        self.uri = f"sqlite://{os.path.join(directory.name, 'rate_limits.sqlite')}"
+
+    def test_scheme_is_registered(self):
+        self.assertIsInstance(storage_from_string(self.uri), SQLiteRateLimitStorage)
+
+    def test_counts_within_a_window_and_restarts_after_it(self):
+        storage = storage_from_string(self.uri)
+        self.assertEqual(storage.incr("k", 1), 1)
+        self.assertEqual(storage.incr("k", 1, amount=2), 3)
+        self.assertEqual(storage.get("k"), 3)
+        self.assertGreater(storage.get_expiry("k"), time.time())
+
+        time.sleep(1.05)
+        self.assertEqual(storage.get("k"), 0)
+        self.assertEqual(storage.incr("k", 1), 1)
+
+    def test_counters_are_shared_by_every_connection(self):
+        first, second = storage_from_string(self.uri), storage_from_string(self.uri)
+        first.incr("k", 60)
+        second.incr("k", 60)
+        self.assertEqual(first.get("k"), 2)
+
+        second.clear("k")
+        self.assertEqual(first.get("k"), 0)
+
+    def test_concurrent_processes_never_lose_a_hit(self):
+        storage_from_string(self.uri)  # create the table before the workers race for it
+        context = multiprocessing.get_context("spawn")
+        workers = [context.Process(target=hit_from_another_process, args=(self.uri, 200)) for _ in range(4)]
+        for worker in workers:
+            worker.start()
+        for worker in workers:
+            worker.join()
+            self.assertEqual(worker.exitcode, 0)
+
+        self.assertEqual(storage_from_string(self.uri).get("shared"), 800)
+
+    def test_fixed_window_limiter(self):
+        limiter = FixedWindowRateLimiter(storage_from_string(self.uri))
+        limit = parse("3 per minute")
+        self.assertTrue(all(limiter.hit(limit, "10.0.0.1") for _ in range(3)))
+        self.assertFalse(limiter.hit(limit, "10.0.0.1"))
+        self.assertTrue(limiter.hit(limit, "10.0.0.2"))
+
+    def test_expired_windows_are_purged(self):
+        storage = SQLiteRateLimitStorage(self.uri, purge_every=2)
+        storage.incr("old", 0.01)
+        time.sleep(0.02)
+        storage.incr("new", 60)
+        self.assertEqual(storage.reset(), 1)
+
+if __name__ == "__main__":
+    unittest.main()
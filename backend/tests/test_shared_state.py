@@ -0,0 +1,135 @@
+import os
+import tempfile
+import time
+import unittest
+from game.combat import CombatSystem
+from game.config import CHARACTERS, SHARED_STATE_CONFIG, WORLD_ENEMY_CONFIG
+from game.movement import create_legacy_enemy
+from game.player import PlayerManager
+from game.shared_state import SharedCombats, SharedGameState, SharedWorldEnemies
+from game.storage import SQLitePlayerStore
+from game.world_enemies import WorldEnemyRegistry, world_enemies
+
+def poi_enemy(lat: float, lon: float):
+    enemy = create_legacy_enemy()
+    enemy["location"] = {"lat": lat, "lon": lon, "poi_name": "Fountain", "poi_type": "tourism"}
+    return enemy
+
+class SharedStoreTest(unittest.TestCase):
+    def setUp(self):
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        self.directory = directory.name
+        self.path = os.path.join(self.directory, "players.sqlite")
+
+class SharedWorldEnemiesTest(SharedStoreTest):
+    def worker_registry(self):
+        """A world enemy registry of one worker process"""
+        registry = WorldEnemyRegistry(WORLD_ENEMY_CONFIG)
+        registry.shared = SharedWorldEnemies(self.path)
+        return registry
+
+    def sync(self, registry, version):
+        changes, version = registry.shared.changes_since(version)
+        for template, engaged_by in changes:
+            registry.apply(template, engaged_by)
+        return version
+
+    def test_enemies_and_engagements_reach_other_workers(self):
+        first, second = self.worker_registry(), self.worker_registry()
+        world_enemy_id = first.register(poi_enemy(14.6, 121.0))
+
+        version = self.sync(second, 0)
+        self.assertEqual([enemy["world_enemy_id"] for enemy in second.find_nearby(14.6, 121.0)], [world_enemy_id])
+
+        # Engaging in one worker hides the enemy from that player in every worker
+        self.assertIsNotNone(second.engage(world_enemy_id, "p1"))
+        self.sync(first, 0)
+        self.assertEqual(first.find_nearby(14.6, 121.0, exclude_player="p1"), [])
+        self.assertEqual(len(first.find_nearby(14.6, 121.0, exclude_player="p2")), 1)
+        self.assertEqual(self.sync(second, version), version + 1)
+
+    def test_expired_rows_are_purged_but_versions_keep_increasing(self):
+        registry = self.worker_registry()
+        registry.register(poi_enemy(14.6, 121.0))
+        registry.register(poi_enemy(14.7, 121.0))
+        _, version = registry.shared.changes_since(0)
+
+        self.assertEqual(registry.shared.purge_expired(time.time() + registry.ttl + 1), 1)
+        registry.register(poi_enemy(14.8, 121.0))
+        changes, latest = registry.shared.changes_since(version)
+        self.assertEqual(len(changes), 1)
+        self.assertGreater(latest, version)
+
+class SharedCombatsTest(SharedStoreTest):
+    def test_tombstones_are_purged_after_ttl(self):
+        combats = SharedCombats(self.path)
+        for player_id in ("p1", "p2", "p3"):
+            combats.put(player_id, {"enemy": create_legacy_enemy()})
+        combats.put("p1", None)
+        combats.put("p2", None)
+        now = time.time()
+
+        # The first sweep only records the current version
+        self.assertEqual(combats.purge_tombstones(now, 600), 0)
+        self.assertEqual(combats.purged_through(), 0)
+
+        # The newest tombstone stays, so the next change still gets a higher version
+        self.assertEqual(combats.purge_tombstones(now + 601, 600), 1)
+        live, version = combats.snapshot()
+        self.assertEqual(list(live), ["p3"])
+        self.assertEqual(combats.purged_through(), version)
+        combats.put("p4", {"enemy": create_legacy_enemy()})
+        self.assertEqual(combats.changes_since(version)[1], version + 1)
+
+class SharedGameStateTest(SharedStoreTest):
+    def worker(self):
+        """Shared state, players and combats of one worker process"""
+        state = SharedGameState(dict(SHARED_STATE_CONFIG, enabled=True, lock_path=os.path.join(self.directory, "lock")))
+        state.start(PlayerManager(SQLitePlayerStore(self.path)), CombatSystem())
+        self.addCleanup(setattr, world_enemies, "shared", None)
+        return state
+
+    def fight(self, state, player_id):
+        with state.session(player_id):
+            if player_id not in state.player_manager.players:
+                state.player_manager.create_player(player_id, next(iter(CHARACTERS)))
+            state.combat_system.start_combat(player_id, create_legacy_enemy())
+
+    def test_abandoned_combats_are_ended_in_every_worker(self):
+        first, second = self.worker(), self.worker()
+        self.fight(first, "idle")
+        self.fight(first, "active")
+        second.sync_combats()
+        self.assertEqual(set(second.combat_system.active_combats), {"idle", "active"})
+
+        later = time.time() + 601
+        # The active player's requests keep their record fresh
+        first.player_manager.store._conn.execute("UPDATE players SET updated_at = ? WHERE id = 'active'", (later,))
+        first.player_manager.store._conn.commit()
+
+        self.assertEqual(second.end_idle_combats(later, 600), 1)
+        self.assertEqual(set(second.combat_system.active_combats), {"active"})
+        first.sync_combats()
+        self.assertEqual(set(first.combat_system.active_combats), {"active"})
+
+    def test_worker_behind_the_purge_reloads_every_combat(self):
+        first, second = self.worker(), self.worker()
+        self.fight(first, "p1")
+        second.sync_combats()
+        self.assertIn("p1", second.combat_system.active_combats)
+
+        # p1's fight ends and a new one starts, then the tombstone is purged before the second worker syncs
+        with first.session("p1"):
+            first.combat_system.end_combat("p1")
+        self.fight(first, "p2")
+        now = time.time()
+        first.purge(now)
+        self.assertEqual(first.purge(now + first.tombstone_ttl + 1), 1)
+
+        second.sync_combats()
+        self.assertEqual(second.combat_resyncs, 1)
+        self.assertEqual(set(second.combat_system.active_combats), {"p2"})
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,55 @@
+import threading
+import time
+import unittest
+from game.spawn_tasks import SpawnTaskQueue
+
+class SpawnTaskQueueTest(unittest.TestCase):
+    def setUp(self):
+        self.queue = SpawnTaskQueue(workers=4, max_queue=1000, result_ttl=60)
+
+    def test_detached_result_is_never_delivered(self):
+        # Detach right as the job finishes, many times, to hit the window between filing and done
+        for i in range(500):
+            job = self.queue.submit("p1", "spawn", lambda n: {"n": n}, i)
+            job.wait(0.0001 * (i % 3))
+            self.queue.detach(job)
+            job.wait()
+            self.assertIsNone(self.queue.pop_result("p1", "spawn"), f"detached result {i} was delivered")
+
+    def test_detached_job_is_not_reused_for_a_new_fix(self):
+        release = threading.Event()
+
+        def resolve(lat, lon):
+            release.wait()
+            return (lat, lon)
+
+        old = self.queue.submit("p1", "spawn", resolve, 1.0, 2.0)
+        self.queue.detach(old)
+        new = self.queue.submit("p1", "spawn", resolve, 3.0, 4.0)
+        self.assertIsNot(new, old)
+        release.set()
+        self.assertTrue(new.wait(5))
+        self.assertEqual(new.result, (3.0, 4.0))
+        self.assertEqual(self.queue.pop_result("p1", "spawn"), (3.0, 4.0))
+        self.assertTrue(old.wait(5))
+        self.assertIsNone(self.queue.pop_result("p1", "spawn"))
+
+    def test_detached_job_is_reused_for_the_same_lookup(self):
+        release = threading.Event()
+        job = self.queue.submit("p1", "spawn", lambda lat: release.wait() and lat, 1.0)
+        self.queue.detach(job)
+        self.assertIs(self.queue.submit("p1", "spawn", lambda lat: lat, 1.0), job)
+        release.set()
+        job.wait(5)
+        self.assertEqual(self.queue.pop_result("p1", "spawn"), 1.0)
+
+    def test_uncollected_results_are_purged(self):
+        jobs = [self.queue.submit(f"p{i}", "test_spawn", lambda i: i, i) for i in range(20)]
+        for job in jobs:
+            job.wait(5)
+        self.assertEqual(self.queue.purge_expired(time.time()), 0)
+        self.assertEqual(self.queue.purge_expired(time.time() + 61), 20)
+        self.assertEqual(self.queue.stats()["undelivered"], 0)
+
+if __name__ == "__main__":
+    unittest.main()
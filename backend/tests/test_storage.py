@@ -0,0 +1,36 @@
+import os
+import tempfile
+import unittest
+from game.storage import MemoryPlayerStore, PlayerStore, SQLitePlayerStore
+
+class PlayerStoreTest(unittest.TestCase):
+    def test_backends_must_implement_every_operation(self):
+        class LoadOnlyStore(PlayerStore):
+            def load(self, player_id):
+                return None
+
+        with self.assertRaises(TypeError):
+            LoadOnlyStore()
+
+    def check_round_trip(self, store: PlayerStore):
+        store.save_many([("p1", {"id": "p1", "xp": 10}), ("p2", {"id": "p2", "xp": 20})])
+        self.assertEqual(store.load("p1"), {"id": "p1", "xp": 10})
+        self.assertEqual(set(store.load_all()), {"p1", "p2"})
+
+        store.save_many([("p1", {"id": "p1", "xp": 15})])
+        store.delete("p2")
+        self.assertEqual(store.load_all(), {"p1": {"id": "p1", "xp": 15}})
+        self.assertIsNone(store.load("p2"))
+
+    def test_memory_store(self):
+        self.check_round_trip(MemoryPlayerStore())
+
+    def test_sqlite_store(self):
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        store = SQLitePlayerStore(os.path.join(directory.name, "players.sqlite"))
+        self.addCleanup(store.close)
+        self.check_round_trip(store)
+
+if __name__ == "__main__":
+    unittest.main()